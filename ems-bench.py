@@ -0,0 +1,211 @@
+import argparse
+import importlib.util
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Sheets whose size follows the scale, with the rows each one has at scale=1
+# (Onboarding_Tasks averages 10 tasks for each of the 20 base employees)
+SCALED_SHEETS = {
+    'Employees': 20,
+    'Training_Status': 50,
+    'One_on_Ones': 30,
+    'Projects': 15,
+    'Onboarding_Tasks': 200,
+}
+FIXED_SHEETS = ['Training_Processes', 'Lookup_Values']
+
+def load_generator_module():
+    """Import ems-gen.py, whose hyphenated name rules out a plain import"""
+    spec = importlib.util.spec_from_file_location("ems_gen", os.path.join(HERE, "ems-gen.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def available_formats():
+    """Output formats whose writer's optional dependency (pyarrow for parquet and feather) can be imported"""
+    writers = load_generator_module().WRITERS
+    return [fmt for fmt, writer in writers.items()
+            if writer.requires is None or importlib.util.find_spec(writer.requires) is not None]
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def output_bytes(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+def run_builder_case(sheet_name, rows, chunk_size):
+    """Time building one sheet at the requested row count, chunk by chunk as generation does"""
+    gen_module = load_generator_module()
+    scale = rows / SCALED_SHEETS[sheet_name] if sheet_name in SCALED_SHEETS else 1
+    generator = gen_module.EmployeeManagementSystemGenerator(
+        scale=scale, seed=0, chunk_size=chunk_size, formats=(), generate=False)
+
+    baseline_rss = peak_rss_mb()
+    built = 0
+    start = time.perf_counter()
+    for df in generator.iter_table_chunks(sheet_name):
+        built += len(df)
+    seconds = time.perf_counter() - start
+    return {'rows': built, 'seconds': seconds, 'baseline_rss_mb': baseline_rss, 'peak_rss_mb': peak_rss_mb()}
+
+def run_writer_case(fmt, rows, chunk_size, sheet_name='Employees'):
+    """Time only the writer's share of streaming one sheet (Employees, which has no foreign keys) to disk"""
+    gen_module = load_generator_module()
+    generator = gen_module.EmployeeManagementSystemGenerator(
+        scale=rows / SCALED_SHEETS[sheet_name], seed=0, chunk_size=chunk_size, formats=(), generate=False)
+
+    baseline_rss = peak_rss_mb()
+    with tempfile.TemporaryDirectory() as tmp:
+        generator.file_path = os.path.join(tmp, 'bench.xlsx')
+        path = generator.output_path(fmt)
+        writer = gen_module.WRITERS[fmt](path, timestamp=generator.as_of)
+
+        written = 0
+        seconds = 0.0
+        for df in generator.iter_table_chunks(sheet_name):
+            start = time.perf_counter()
+            writer.write_chunk(sheet_name, df)
+            seconds += time.perf_counter() - start
+            written += len(df)
+        start = time.perf_counter()
+        writer.close()
+        seconds += time.perf_counter() - start
+        size = output_bytes(path)
+
+    return {'rows': written, 'seconds': seconds, 'bytes': size,
+            'baseline_rss_mb': baseline_rss, 'peak_rss_mb': peak_rss_mb()}
+
+def case_worker(connection, function, args):
+    try:
+        connection.send(('ok', function(*args)))
+    except Exception as e:
+        connection.send(('error', f"{type(e).__name__}: {e}"))
+    connection.close()
+
+def run_isolated(function, *args):
+    """Run one case in a fresh process, so its peak RSS isn't inflated by earlier cases"""
+    context = multiprocessing.get_context('spawn')
+    parent, child = context.Pipe(duplex=False)
+    process = context.Process(target=case_worker, args=(child, function, args))
+    process.start()
+    child.close()
+    status, result = parent.recv()
+    process.join()
+    if status != 'ok':
+        raise RuntimeError(result)
+    return result
+
+def run_benchmarks(row_counts, sheets, formats, chunk_size, repeat):
+    cases = []
+    for sheet_name in sheets:
+        for rows in ([None] if sheet_name in FIXED_SHEETS else row_counts):
+            cases.append(('builder', sheet_name, run_builder_case, (sheet_name, rows, chunk_size)))
+    for fmt in formats:
+        for rows in row_counts:
+            cases.append(('writer', fmt, run_writer_case, (fmt, rows, chunk_size)))
+
+    results = []
+    for kind, name, function, args in cases:
+        # A failing case is recorded with its error, so the cases before and after it still count
+        try:
+            runs = [run_isolated(function, *args) for _ in range(repeat)]
+        except RuntimeError as e:
+            results.append({'kind': kind, 'name': name, 'target_rows': args[1], 'error': str(e)})
+            print(f"  {kind:<8} {name:<20} failed: {e}")
+            continue
+        # Keep the fastest of the repeats: the least disturbed by other load on the machine
+        best = min(runs, key=lambda run: run['seconds'])
+        best['peak_rss_mb'] = max(run['peak_rss_mb'] for run in runs)
+        best['rows_per_sec'] = best['rows'] / best['seconds'] if best['seconds'] else None
+        result = {'kind': kind, 'name': name, 'target_rows': args[1], **best}
+        results.append(result)
+        print(f"  {kind:<8} {name:<20} {result['rows']:>10,} rows  {result['seconds']:9.3f} s  "
+              f"{result['rows_per_sec'] or 0:>12,.0f} rows/s  {result['peak_rss_mb']:8.1f} MB")
+    return results
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Return a message per result that is slower or larger than the baseline by more than tolerance"""
+    previous = {(r['kind'], r['name'], r['target_rows']): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        old = previous.get((result['kind'], result['name'], result['target_rows']))
+        if old is None or 'error' in result or 'error' in old:
+            continue
+        label = f"{result['kind']} {result['name']} @ {result['target_rows'] or 'fixed'} rows"
+        # rows_per_sec is None for a case too quick to time
+        if (old.get('rows_per_sec') and result['rows_per_sec'] is not None
+                and result['rows_per_sec'] < old['rows_per_sec'] * (1 - tolerance)):
+            regressions.append(f"{label}: {result['rows_per_sec']:,.0f} rows/s vs baseline {old['rows_per_sec']:,.0f}")
+        if result['peak_rss_mb'] > old['peak_rss_mb'] * (1 + tolerance):
+            regressions.append(f"{label}: peak RSS {result['peak_rss_mb']:.1f} MB vs baseline {old['peak_rss_mb']:.1f} MB")
+    return regressions
+
+def parse_list(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Employee Management System generator")
+    parser.add_argument("--rows", default="1e3,1e4,1e5,1e6",
+                        help="comma-separated row counts per scaled table (up to 1e7)")
+    parser.add_argument("--tables", default=",".join(list(SCALED_SHEETS) + FIXED_SHEETS),
+                        help="comma-separated sheets whose builders to time")
+    parser.add_argument("--formats",
+                        help="comma-separated output writers to time ('' for none); default all whose "
+                             "dependencies are installed")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="rows generated per chunk")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case; the fastest is kept")
+    parser.add_argument("--out", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed fractional slowdown or memory growth before failing (default 0.2)")
+    args = parser.parse_args()
+
+    row_counts = [int(float(rows)) for rows in parse_list(args.rows)]
+    print(f"⏱  Benchmarking generator at {', '.join(f'{rows:,}' for rows in row_counts)} rows...")
+    formats = available_formats() if args.formats is None else parse_list(args.formats)
+    results = run_benchmarks(row_counts, parse_list(args.tables), formats, args.chunk_size, args.repeat)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'chunk_size': args.chunk_size,
+        },
+        'results': results,
+    }
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Results written to {args.out}")
+
+    failed = [result for result in results if 'error' in result]
+    if failed:
+        names = ", ".join(f"{result['kind']} {result['name']}" for result in failed)
+        print(f"❌ {len(failed)} case(s) failed: {names}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%} of {args.baseline}:")
+            for message in regressions:
+                print(f"   • {message}")
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.tolerance:.0%} of {args.baseline}")
+    if failed:
+        sys.exit(1)
@@ -1,281 +1,3630 @@
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-import openpyxl
-from openpyxl.utils import get_column_letter
-from datetime import datetime
-import os
-
-class EmployeeManagementUpdater:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Employee Management System Updater")
-        self.root.geometry("1000x700")
-        
-        self.file_path = ""
-        self.workbook = None
-        self.sheets = {}
-        self.current_sheet = ""
-        
-        self.create_widgets()
-        
-    def create_widgets(self):
-        # File selection frame
-        file_frame = ttk.LabelFrame(self.root, text="Excel File", padding=10)
-        file_frame.pack(fill=tk.X, padx=10, pady=5)
-        
-        self.file_entry = ttk.Entry(file_frame, width=50)
-        self.file_entry.pack(side=tk.LEFT, padx=5, expand=True, fill=tk.X)
-        
-        browse_btn = ttk.Button(file_frame, text="Browse", command=self.browse_file)
-        browse_btn.pack(side=tk.LEFT, padx=5)
-        
-        load_btn = ttk.Button(file_frame, text="Load", command=self.load_workbook)
-        load_btn.pack(side=tk.LEFT, padx=5)
-        
-        # Sheet selection
-        sheet_frame = ttk.LabelFrame(self.root, text="Select Sheet", padding=10)
-        sheet_frame.pack(fill=tk.X, padx=10, pady=5)
-        
-        self.sheet_combobox = ttk.Combobox(sheet_frame, state="readonly")
-        self.sheet_combobox.pack(fill=tk.X, padx=5, pady=5)
-        self.sheet_combobox.bind("<<ComboboxSelected>>", self.load_sheet_data)
-        
-        # Data display frame
-        data_frame = ttk.LabelFrame(self.root, text="Sheet Data", padding=10)
-        data_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-        
-        # Treeview for displaying data
-        self.tree = ttk.Treeview(data_frame)
-        self.tree.pack(fill=tk.BOTH, expand=True)
-        
-        # Scrollbars
-        y_scroll = ttk.Scrollbar(data_frame, orient="vertical", command=self.tree.yview)
-        y_scroll.pack(side=tk.RIGHT, fill=tk.Y)
-        x_scroll = ttk.Scrollbar(data_frame, orient="horizontal", command=self.tree.xview)
-        x_scroll.pack(side=tk.BOTTOM, fill=tk.X)
-        self.tree.configure(yscrollcommand=y_scroll.set, xscrollcommand=x_scroll.set)
-        
-        # Edit frame
-        edit_frame = ttk.LabelFrame(self.root, text="Edit Data", padding=10)
-        edit_frame.pack(fill=tk.X, padx=10, pady=5)
-        
-        self.edit_btn = ttk.Button(edit_frame, text="Edit Selected", command=self.edit_selected)
-        self.edit_btn.pack(side=tk.LEFT, padx=5)
-        
-        self.add_btn = ttk.Button(edit_frame, text="Add New", command=self.add_new)
-        self.add_btn.pack(side=tk.LEFT, padx=5)
-        
-        self.delete_btn = ttk.Button(edit_frame, text="Delete Selected", command=self.delete_selected)
-        self.delete_btn.pack(side=tk.LEFT, padx=5)
-        
-        self.save_btn = ttk.Button(edit_frame, text="Save Changes", command=self.save_changes)
-        self.save_btn.pack(side=tk.RIGHT, padx=5)
-        
-        # Status bar
-        self.status_var = tk.StringVar()
-        self.status_var.set("Ready")
-        status_bar = ttk.Label(self.root, textvariable=self.status_var, relief=tk.SUNKEN)
-        status_bar.pack(fill=tk.X, padx=10, pady=5)
-        
-        # Disable buttons until file is loaded
-        self.toggle_buttons(False)
-    
-    def toggle_buttons(self, enabled):
-        state = tk.NORMAL if enabled else tk.DISABLED
-        self.sheet_combobox.config(state=tk.NORMAL if enabled else tk.DISABLED)
-        self.edit_btn.config(state=state)
-        self.add_btn.config(state=state)
-        self.delete_btn.config(state=state)
-        self.save_btn.config(state=state)
-    
-    def browse_file(self):
-        file_path = filedialog.askopenfilename(
-            title="Select Excel File",
-            filetypes=[("Excel Files", "*.xlsx"), ("All Files", "*.*")]
-        )
-        if file_path:
-            self.file_entry.delete(0, tk.END)
-            self.file_entry.insert(0, file_path)
-    
-    def load_workbook(self):
-        file_path = self.file_entry.get()
-        if not file_path:
-            messagebox.showerror("Error", "Please select an Excel file first.")
-            return
-        
-        try:
-            self.workbook = openpyxl.load_workbook(file_path)
-            self.file_path = file_path
-            self.sheets = {sheet.title: sheet for sheet in self.workbook.worksheets}
-            
-            # Update sheet combobox
-            self.sheet_combobox["values"] = list(self.sheets.keys())
-            if self.sheets:
-                self.sheet_combobox.current(0)
-                self.load_sheet_data()
-            
-            self.toggle_buttons(True)
-            self.status_var.set(f"Loaded: {os.path.basename(file_path)}")
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load workbook:\n{str(e)}")
-            self.status_var.set("Error loading file")
-    
-    def load_sheet_data(self, event=None):
-        sheet_name = self.sheet_combobox.get()
-        if not sheet_name or sheet_name not in self.sheets:
-            return
-        
-        self.current_sheet = sheet_name
-        sheet = self.sheets[sheet_name]
-        
-        # Clear the treeview
-        self.tree.delete(*self.tree.get_children())
-        
-        # Get headers from first row
-        headers = []
-        for cell in sheet[1]:
-            headers.append(cell.value)
-        
-        # Configure treeview columns
-        self.tree["columns"] = headers
-        self.tree.column("#0", width=0, stretch=tk.NO)  # Hide first empty column
-        
-        for header in headers:
-            self.tree.column(header, width=100, anchor=tk.W)
-            self.tree.heading(header, text=header, anchor=tk.W)
-        
-        # Add data rows
-        for row in sheet.iter_rows(min_row=2, values_only=True):
-            self.tree.insert("", tk.END, values=row)
-        
-        self.status_var.set(f"Displaying: {sheet_name}")
-    
-    def edit_selected(self):
-        selected = self.tree.focus()
-        if not selected:
-            messagebox.showwarning("Warning", "Please select a row to edit.")
-            return
-        
-        # Get selected item data
-        item_data = self.tree.item(selected, "values")
-        headers = self.tree["columns"]
-        
-        # Create edit window
-        edit_win = tk.Toplevel(self.root)
-        edit_win.title("Edit Record")
-        edit_win.grab_set()
-        
-        # Create entry widgets for each column
-        entries = {}
-        for i, header in enumerate(headers):
-            ttk.Label(edit_win, text=header).grid(row=i, column=0, padx=5, pady=2, sticky=tk.E)
-            entry = ttk.Entry(edit_win)
-            entry.grid(row=i, column=1, padx=5, pady=2, sticky=tk.W+tk.E)
-            
-            # Pre-fill with current value
-            if i < len(item_data):
-                entry.insert(0, str(item_data[i]) if item_data[i] is not None else "")
-            
-            entries[header] = entry
-        
-        # Save button
-        save_btn = ttk.Button(
-            edit_win, 
-            text="Save Changes",
-            command=lambda: self.save_edit(selected, entries, edit_win)
-        )
-        save_btn.grid(row=len(headers), column=0, columnspan=2, pady=10)
-    
-    def save_edit(self, item_id, entries, window):
-        # Get new values from entries
-        new_values = []
-        for header in self.tree["columns"]:
-            new_values.append(entries[header].get())
-        
-        # Update treeview
-        self.tree.item(item_id, values=new_values)
-        
-        # Close edit window
-        window.destroy()
-        self.status_var.set("Changes saved to memory (not file). Click 'Save Changes' to update file.")
-    
-    def add_new(self):
-        headers = self.tree["columns"]
-        
-        # Create add window
-        add_win = tk.Toplevel(self.root)
-        add_win.title("Add New Record")
-        add_win.grab_set()
-        
-        # Create entry widgets for each column
-        entries = {}
-        for i, header in enumerate(headers):
-            ttk.Label(add_win, text=header).grid(row=i, column=0, padx=5, pady=2, sticky=tk.E)
-            entry = ttk.Entry(add_win)
-            entry.grid(row=i, column=1, padx=5, pady=2, sticky=tk.W+tk.E)
-            entries[header] = entry
-        
-        # Add button
-        add_btn = ttk.Button(
-            add_win, 
-            text="Add Record",
-            command=lambda: self.save_new(entries, add_win)
-        )
-        add_btn.grid(row=len(headers), column=0, columnspan=2, pady=10)
-    
-    def save_new(self, entries, window):
-        # Get new values from entries
-        new_values = []
-        for header in self.tree["columns"]:
-            new_values.append(entries[header].get())
-        
-        # Add to treeview
-        self.tree.insert("", tk.END, values=new_values)
-        
-        # Close add window
-        window.destroy()
-        self.status_var.set("New record added to memory (not file). Click 'Save Changes' to update file.")
-    
-    def delete_selected(self):
-        selected = self.tree.selection()
-        if not selected:
-            messagebox.showwarning("Warning", "Please select one or more rows to delete.")
-            return
-        
-        if messagebox.askyesno("Confirm", "Are you sure you want to delete the selected records?"):
-            for item in selected:
-                self.tree.delete(item)
-            self.status_var.set("Records deleted from memory (not file). Click 'Save Changes' to update file.")
-    
-    def save_changes(self):
-        if not self.workbook or not self.current_sheet:
-            messagebox.showerror("Error", "No workbook or sheet loaded.")
-            return
-        
-        try:
-            sheet = self.workbook[self.current_sheet]
-            
-            # Clear existing data (keep headers)
-            sheet.delete_rows(2, sheet.max_row)
-            
-            # Get headers
-            headers = self.tree["columns"]
-            
-            # Add data from treeview
-            for item in self.tree.get_children():
-                values = self.tree.item(item, "values")
-                sheet.append(values)
-            
-            # Save the workbook
-            self.workbook.save(self.file_path)
-            self.status_var.set(f"Changes saved to {os.path.basename(self.file_path)}")
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save changes:\n{str(e)}")
-            self.status_var.set("Error saving changes")
-
-if __name__ == "__main__":
-    root = tk.Tk()
-    app = EmployeeManagementUpdater(root)
-    root.mainloop()
\ No newline at end of file
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+import itertools
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.reader.excel import ExcelReader
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_datetime
+from openpyxl.styles.stylesheet import apply_stylesheet
+from openpyxl.utils import column_index_from_string, get_column_letter
+from openpyxl.utils.datetime import from_excel, to_excel
+from openpyxl.worksheet._reader import WorkSheetParser
+from openpyxl.xml.constants import ARC_STYLE, SHARED_STRINGS
+from collections import OrderedDict, deque
+from datetime import date, datetime, timedelta
+from datetime import time as time_of_day
+from xml.sax.saxutils import escape
+from zipfile import ZipFile, ZipInfo
+import argparse
+import bisect
+import csv
+import functools
+import hashlib
+import html
+import json
+import os
+import queue
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+# Shared with ems-gen.py: the lookup columns and the aggregation engine, so its summary JSON and
+# the summary panel agree, and the phase timer, so traces of both scripts read the same
+from ems_common import LOOKUP_COLUMNS, SheetSummary
+from ems_trace import NO_TRACE, TraceRecorder
+
+class VirtualTreeview:
+    """A Treeview showing a scrolling window onto a row sequence of any length, addressed by row index"""
+    BUFFER_ROWS = 2
+    
+    def __init__(self, parent, on_heading=None):
+        self.rows = []
+        self.on_heading = on_heading
+        self.first = 0
+        self.selected = set()
+        self.focused = None
+        self.anchor = None
+        
+        y_scroll = ttk.Scrollbar(parent, orient="vertical", command=self.yview)
+        y_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        x_scroll = ttk.Scrollbar(parent, orient="horizontal")
+        x_scroll.pack(side=tk.BOTTOM, fill=tk.X)
+        self.y_scroll = y_scroll
+        
+        # The vertical scrollbar is driven from the row sequence, not from the Treeview's items
+        self.tree = ttk.Treeview(parent, show="headings", selectmode="extended")
+        self.tree.pack(fill=tk.BOTH, expand=True)
+        self.tree.configure(xscrollcommand=x_scroll.set)
+        x_scroll.configure(command=self.tree.xview)
+        
+        self.tree.bind("<Configure>", lambda event: self.render())
+        self.tree.bind("<MouseWheel>", self.on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll_by(3))
+        self.tree.bind("<Button-1>", self.on_click)
+        self.tree.bind("<Control-Button-1>", lambda event: self.on_click(event, toggle=True))
+        self.tree.bind("<Shift-Button-1>", lambda event: self.on_click(event, extend=True))
+        self.tree.bind("<ButtonRelease-1>", self.on_heading_click)
+        self.tree.bind("<Shift-ButtonRelease-1>", lambda event: self.on_heading_click(event, extend=True))
+        for key, step in (("<Up>", -1), ("<Down>", 1), ("<Prior>", "page_up"), ("<Next>", "page_down"),
+                          ("<Home>", "home"), ("<End>", "end")):
+            self.tree.bind(key, lambda event, step=step: self.on_key(step))
+    
+    def set_rows(self, columns, rows):
+        """Show rows (any sequence of value sequences) under the given column headers"""
+        self.tree.delete(*self.tree.get_children())
+        # Columns are named by position, so repeated or blank headers still get their own column
+        self.tree["columns"] = [str(index) for index in range(len(columns))]
+        for index, column in enumerate(columns):
+            self.tree.column(str(index), width=100, anchor=tk.W)
+            self.tree.heading(str(index), text=column, anchor=tk.W)
+        self.replace_rows(rows)
+    
+    def replace_rows(self, rows):
+        """Show a different row sequence under the same columns, from the top, with nothing selected"""
+        self.rows = rows
+        self.first = 0
+        self.selected = set()
+        self.focused = self.anchor = None
+        self.render()
+    
+    def set_headings(self, labels):
+        for index, label in enumerate(labels):
+            self.tree.heading(str(index), text=label)
+    
+    def page_size(self):
+        """Number of whole rows that fit in the visible area (below the heading)"""
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        return max(1, self.tree.winfo_height() // row_height - 1)
+    
+    def render(self):
+        """Fill the recycled items with the rows from self.first onward and sync selection and scrollbar"""
+        total = len(self.rows)
+        page = self.page_size()
+        self.first = max(0, min(self.first, total - page))
+        
+        # Grow or shrink the item pool to the window height; items are named by their slot
+        slots = min(page + self.BUFFER_ROWS, total - self.first)
+        items = self.tree.get_children()
+        if len(items) > slots:
+            self.tree.delete(*items[slots:])
+        for slot in range(len(items), slots):
+            self.tree.insert("", tk.END, iid=str(slot))
+        
+        for slot in range(slots):
+            row = self.rows[self.first + slot]
+            self.tree.item(str(slot), values=["" if value is None else value for value in row])
+        
+        self.tree.selection_set([str(index - self.first) for index in self.selected
+                                 if self.first <= index < self.first + slots])
+        if self.focused is not None and self.first <= self.focused < self.first + slots:
+            self.tree.focus(str(self.focused - self.first))
+        self.tree.yview_moveto(0)
+        
+        if total:
+            self.y_scroll.set(self.first / total, min(1.0, (self.first + page) / total))
+        else:
+            self.y_scroll.set(0, 1)
+    
+    def refresh(self):
+        """Redraw after the row sequence changed (edits, inserts or deletes)"""
+        self.selected = {index for index in self.selected if index < len(self.rows)}
+        if self.focused is not None and self.focused >= len(self.rows):
+            self.focused = None
+        self.render()
+    
+    def yview(self, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units' | 'pages')"""
+        if args[0] == "moveto":
+            self.first = int(float(args[1]) * len(self.rows))
+            self.render()
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self.page_size() if args[2] == "pages" else 1)
+            self.scroll_by(step)
+    
+    def scroll_by(self, rows):
+        self.first += rows
+        self.render()
+        return "break"
+    
+    def on_mousewheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS small raw deltas
+        notches = event.delta / 120 if abs(event.delta) >= 120 else event.delta
+        return self.scroll_by(-int(notches) * 3)
+    
+    def see(self, index):
+        """Scroll so that row index is visible"""
+        page = self.page_size()
+        if index < self.first:
+            self.first = index
+        elif index >= self.first + page:
+            self.first = index - page + 1
+        self.render()
+    
+    def row_at(self, y):
+        """Row index under a y coordinate in the tree, or None"""
+        item = self.tree.identify_row(y)
+        return self.first + int(item) if item else None
+    
+    def on_click(self, event, toggle=False, extend=False):
+        # Headings and column separators keep the Treeview's own handling (sorting, resizing)
+        if self.tree.identify_region(event.x, event.y) not in ("cell", "tree"):
+            return None
+        index = self.row_at(event.y)
+        if index is None:
+            return "break"
+        if extend and self.anchor is not None:
+            low, high = sorted((self.anchor, index))
+            self.selected = set(range(low, high + 1))
+        elif toggle:
+            self.selected ^= {index}
+            self.anchor = index
+        else:
+            self.selected = {index}
+            self.anchor = index
+        self.focused = index
+        self.tree.focus_set()
+        self.render()
+        return "break"
+    
+    def on_heading_click(self, event, extend=False):
+        """Report a click on a column heading (not on a separator being dragged) to on_heading"""
+        if self.on_heading is None or self.tree.identify_region(event.x, event.y) != "heading":
+            return None
+        column = self.tree.identify_column(event.x)
+        if column:
+            self.on_heading(int(column[1:]) - 1, extend)
+        return None
+    
+    def on_key(self, step):
+        if not self.rows:
+            return "break"
+        current = self.focused if self.focused is not None else self.first
+        if step == "home":
+            index = 0
+        elif step == "end":
+            index = len(self.rows) - 1
+        elif step in ("page_up", "page_down"):
+            index = current + (self.page_size() if step == "page_down" else -self.page_size())
+        else:
+            index = current + step
+        index = max(0, min(index, len(self.rows) - 1))
+        self.selected = {index}
+        self.focused = self.anchor = index
+        self.see(index)
+        return "break"
+    
+    def focus_row(self):
+        return self.focused
+    
+    def selected_rows(self):
+        return sorted(self.selected)
+
+class OpenpyxlInternals:
+    """The private openpyxl attributes and parser the xlsx readers rely on, kept in one place"""
+    # The openpyxl release series these are tested with (tests/test_openpyxl_internals.py)
+    TESTED_RELEASE = "3.1"
+    
+    @staticmethod
+    def date_styles(workbook):
+        """Cell style indexes whose number format shows a date, time or duration"""
+        return workbook._date_formats
+    
+    @staticmethod
+    def timedelta_styles(workbook):
+        """Cell style indexes whose number format shows a duration ([h]:mm:ss)"""
+        return workbook._timedelta_formats
+    
+    @staticmethod
+    def number_format(workbook, style):
+        """Number format code of the workbook's cell style index style"""
+        format_id = workbook._cell_styles[style].numFmtId
+        if format_id in BUILTIN_FORMATS:
+            return BUILTIN_FORMATS[format_id]
+        return workbook._number_formats[format_id - 164]
+    
+    @staticmethod
+    def worksheet_parser(workbook, source, shared_strings):
+        """openpyxl's streaming parser over a worksheet part, typing cells by the workbook's styles"""
+        return WorkSheetParser(source, shared_strings, epoch=workbook.epoch,
+                               date_formats=workbook._date_formats,
+                               timedelta_formats=workbook._timedelta_formats)
+
+class XlsxPackage:
+    """Read-only access to an .xlsx file's sheets, parsed one worksheet part at a time"""
+    CHUNK_BYTES = 1 << 20
+    # A row's body runs to its closing tag; matched a tag at a time rather than with a lazy .*?, which
+    # retries the closing tag after every byte
+    ROW_RE = re.compile(rb'<row\b(?P<attrs>[^>]*?)(?:/>|>(?P<body>[^<]*(?:<(?!/row>)[^<]*)*)</row>)')
+    # Plain cells: a column reference, optional style and type, then nothing, a value or an inline string
+    ROW_NUMBER_RE = re.compile(rb'\br="(\d+)"')
+    CELL_RE = re.compile(rb'<c r="([A-Z]+)\d+"(?: s="(\d+)")?(?: t="(\w+)")?\s*'
+                         rb'(?:/>|>(?:<v>([^<]*)</v>|<is><t(?: xml:space="preserve")?>([^<]*)</t></is>)?</c>)')
+    def __init__(self, file_path):
+        reader = ExcelReader(file_path, read_only=True)
+        try:
+            reader.read_manifest()
+            reader.read_strings()
+            reader.read_workbook()
+            apply_stylesheet(reader.archive, reader.wb)
+        except Exception:
+            reader.archive.close()
+            raise
+        self.file_path = file_path
+        self.archive = reader.archive
+        self.shared_strings = reader.shared_strings
+        self.workbook = reader.wb
+        self.sheet_parts = {sheet.name: rel.target for sheet, rel in reader.parser.find_sheets()
+                            if rel.target in reader.valid_files and "chartsheet" not in rel.Type}
+        self.source = None
+    
+    @property
+    def sheetnames(self):
+        return list(self.sheet_parts)
+    
+    def part_size(self, sheet_name):
+        """Uncompressed size of a sheet's XML, the unit parse progress is measured in"""
+        return self.archive.getinfo(self.sheet_parts[sheet_name]).file_size
+    
+    def position(self):
+        """Bytes of the sheet being parsed by iter_rows consumed so far"""
+        return self.source.tell() if self.source is not None else 0
+    
+    def iter_rows(self, sheet_name):
+        """Yield each row of a sheet as a list of values, including blank rows missing from the XML"""
+        self.resume_row = None
+        expected = 1
+        for index, row in itertools.chain(self.scan_rows(sheet_name), self.parse_rows(sheet_name)):
+            if index < expected:
+                continue  # already read by scan_rows before it handed over
+            for _ in range(expected, index):
+                yield []
+            yield row
+            expected = index + 1
+    
+    def scan_rows(self, sheet_name):
+        """Yield (row number, values) from the sheet XML with regexes until a row they can't read (self.resume_row)"""
+        workbook = self.workbook
+        date_styles = {str(style).encode() for style in OpenpyxlInternals.date_styles(workbook)}
+        timedelta_styles = {str(style).encode() for style in OpenpyxlInternals.timedelta_styles(workbook)}
+        dates = {}
+        columns = {}
+        next_row = 1
+        with self.archive.open(self.sheet_parts[sheet_name]) as source:
+            self.source = source
+            tail = b""
+            while True:
+                chunk = source.read(self.CHUNK_BYTES)
+                data = tail + chunk
+                if b":row" in data:
+                    self.resume_row = next_row
+                    return
+                end = data.rfind(b"</row>") + len(b"</row>") if chunk else len(data)
+                if end < len(b"</row>"):
+                    tail = data
+                    continue
+                for match in self.ROW_RE.finditer(data, 0, end):
+                    number = self.ROW_NUMBER_RE.search(match.group("attrs"))
+                    body = match.group("body") or b""
+                    cells = self.CELL_RE.findall(body)
+                    if number is None or len(cells) != body.count(b"<c"):
+                        self.resume_row = int(number.group(1)) if number is not None else next_row
+                        return
+                    row = []
+                    for letters, style, kind, value, text in cells:
+                        column = columns.get(letters)
+                        if column is None:
+                            column = columns[letters] = column_index_from_string(letters.decode()) - 1
+                        if kind == b"inlineStr":
+                            value = text.decode()
+                            if "&" in value:
+                                value = html.unescape(value)
+                        elif not value:
+                            value = None
+                        elif kind in (b"n", b""):
+                            value = float(value) if b"." in value or b"E" in value or b"e" in value else int(value)
+                            if style in date_styles or style in timedelta_styles:
+                                cell = (style, value)
+                                if cell not in dates:
+                                    dates[cell] = from_excel(value, workbook.epoch, timedelta=style in timedelta_styles)
+                                value = dates[cell]
+                        elif kind == b"s":
+                            value = self.shared_strings[int(value)]
+                        elif kind == b"b":
+                            value = bool(int(value))
+                        elif kind in (b"str", b"e"):
+                            value = html.unescape(value.decode())
+                        else:
+                            self.resume_row = int(number.group(1))
+                            return
+                        if column >= len(row):
+                            row.extend([None] * (column + 1 - len(row)))
+                        row[column] = value
+                    next_row = int(number.group(1)) + 1
+                    yield next_row - 1, row
+                if not chunk:
+                    break
+                tail = data[end:]
+        self.source = None
+    
+    def parse_rows(self, sheet_name):
+        """Yield (row number, values) with openpyxl's worksheet parser, when scan_rows has handed over"""
+        if self.resume_row is None:
+            return
+        with self.archive.open(self.sheet_parts[sheet_name]) as source:
+            self.source = source
+            parser = OpenpyxlInternals.worksheet_parser(self.workbook, source, self.shared_strings)
+            for index, cells in parser.parse():
+                row = [None] * (cells[-1]["column"] if cells else 0)
+                for cell in cells:
+                    row[cell["column"] - 1] = cell["value"]
+                yield index, row
+        self.source = None
+    
+    def close(self):
+        self.archive.close()
+
+class WorkbookParts:
+    """Fingerprints of one version of an .xlsx, read from its zip directory without decompressing anything"""
+    def __init__(self, size, mtime_ns, sheets, styles=None, strings=None, strings_digest=None):
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.sheets = sheets
+        self.styles = styles
+        self.strings = strings
+        self.strings_digest = strings_digest
+    
+    @classmethod
+    def read(cls, file_path):
+        stat = os.stat(file_path)
+        reader = ExcelReader(file_path, read_only=True)
+        try:
+            reader.read_manifest()
+            reader.read_workbook()
+            infos = {info.filename: info for info in reader.archive.infolist()}
+            sheets = {sheet.name: cls.fingerprint(infos.get(rel.target)) for sheet, rel in reader.parser.find_sheets()
+                      if rel.target in reader.valid_files and "chartsheet" not in rel.Type}
+            strings_type = reader.package.find(SHARED_STRINGS)
+            strings = cls.fingerprint(infos.get(strings_type.PartName[1:])) if strings_type is not None else None
+            return cls(stat.st_size, stat.st_mtime_ns, sheets, cls.fingerprint(infos.get(ARC_STYLE)), strings)
+        finally:
+            reader.archive.close()
+    
+    @staticmethod
+    def fingerprint(info):
+        return [info.CRC, info.file_size] if info is not None else None
+    
+    @staticmethod
+    def digest_strings(strings):
+        digest = hashlib.sha256()
+        for text in strings:
+            digest.update(str(text).encode("utf-8", "surrogatepass") + b"\0")
+        return [len(strings), digest.hexdigest()]
+    
+    def matches(self, stat):
+        """Whether a file with this os.stat result is (by size and mtime) the version described"""
+        return (stat.st_size, stat.st_mtime_ns) == (self.size, self.mtime_ns)
+    
+    def changed_sheets(self, old, shared_strings=None):
+        """Names of sheets, in either version, that may read differently in this one than in old"""
+        everything = set(self.sheets) | set(old.sheets)
+        if self.styles != old.styles:
+            return everything
+        if self.strings == old.strings:
+            self.strings_digest = self.strings_digest or old.strings_digest
+        elif old.strings is not None:
+            if shared_strings is None or old.strings_digest is None:
+                return everything
+            strings = shared_strings()
+            count = old.strings_digest[0]
+            if len(strings) < count or self.digest_strings(strings[:count]) != old.strings_digest:
+                return everything
+        return {name for name in everything if self.sheets.get(name) != old.sheets.get(name)}
+    
+    def to_json(self):
+        return json.dumps({"size": self.size, "mtime_ns": self.mtime_ns, "sheets": list(self.sheets.items()),
+                           "styles": self.styles, "strings": self.strings, "strings_digest": self.strings_digest})
+    
+    @classmethod
+    def from_json(cls, text):
+        values = json.loads(text)
+        values["sheets"] = dict(values["sheets"])
+        return cls(**values)
+
+class SheetStore:
+    """A sidecar SQLite copy of a workbook's parsed sheets, so reopening an unchanged file skips the xlsx"""
+    VERSION = 2
+    PAGE_ROWS = 5000
+    NATIVE_TYPES = (int, float, str, type(None))
+    # Other values are stored as text tagged with a leading NUL, which can't occur in worksheet text
+    DECODERS = {
+        "b": lambda text: text == "1",
+        "D": datetime.fromisoformat,
+        "d": date.fromisoformat,
+        "T": lambda text: datetime.fromisoformat(f"2000-01-01T{text}").time(),
+        "t": lambda text: timedelta(seconds=float(text)),
+    }
+    
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.path = self.path_for(file_path)
+        self.db = sqlite3.connect(self.path, timeout=30)
+        try:
+            # WAL lets the loader read sheets while a save is updating others
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            with self.db:
+                self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)")
+                self.db.execute("CREATE TABLE IF NOT EXISTS sheets (name TEXT PRIMARY KEY, tbl TEXT, headers TEXT, "
+                                "tagged TEXT, rows INTEGER, complete INTEGER)")
+        except sqlite3.Error:
+            self.db.close()
+            raise
+    
+    @staticmethod
+    def path_for(file_path):
+        directory, name = os.path.split(os.path.abspath(file_path))
+        return os.path.join(directory, f".{name}.ems-store.sqlite")
+    
+    @classmethod
+    def open(cls, file_path, parts, shared_strings=None):
+        """The workbook's store, brought up to date with parts (see validate), or None if it can't be used"""
+        for attempt in range(2):
+            store = None
+            try:
+                store = cls(file_path)
+                store.validate(parts, shared_strings)
+                return store
+            except sqlite3.DatabaseError:
+                # Not a database (or a damaged one): start a new store in its place
+                if store is not None:
+                    store.close()
+                if attempt:
+                    return None
+                try:
+                    os.remove(cls.path_for(file_path))
+                except OSError:
+                    return None
+            except OSError:
+                if store is not None:
+                    store.close()
+                return None
+    
+    @classmethod
+    def attach(cls, file_path, stat):
+        """The existing store if it matches the file as stat describes it, else None; nothing is created or read"""
+        if not os.path.exists(cls.path_for(file_path)):
+            return None
+        try:
+            store = cls(file_path)
+        except sqlite3.Error:
+            return None
+        try:
+            parts = store.parts()
+            if parts is not None and parts.matches(stat):
+                return store
+        except sqlite3.Error:
+            pass
+        store.close()
+        return None
+    
+    def meta(self, key):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else None
+    
+    def set_meta(self, values):
+        self.db.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", values.items())
+    
+    def parts(self):
+        """WorkbookParts of the version the stored sheets were read from, or None for a new or outdated store"""
+        if self.meta("version") != self.VERSION or self.meta("parts") is None:
+            return None
+        return WorkbookParts.from_json(self.meta("parts"))
+    
+    def validate(self, parts, shared_strings=None):
+        """Re-key the store to the workbook version parts, dropping the sheets that may read differently in it"""
+        old = self.parts()
+        if old is not None and (old.size, old.mtime_ns) == (parts.size, parts.mtime_ns):
+            parts.strings_digest = parts.strings_digest or old.strings_digest
+            return
+        with self.db:
+            if old is None:
+                for (table,) in self.db.execute("SELECT tbl FROM sheets").fetchall():
+                    self.db.execute(f"DROP TABLE IF EXISTS {table}")
+                self.db.execute("DELETE FROM sheets")
+                self.db.execute("DELETE FROM meta")
+            else:
+                for sheet_name in parts.changed_sheets(old, shared_strings):
+                    self.drop_sheet(sheet_name)
+            self.set_meta({"version": self.VERSION, "parts": parts.to_json()})
+    
+    def set_parts(self, parts):
+        with self.db:
+            self.set_meta({"parts": parts.to_json()})
+    
+    def sheet_info(self, sheet_name):
+        """(table, headers, tagged columns, row count) of a completely imported sheet, or None"""
+        row = self.db.execute("SELECT tbl, headers, tagged, rows FROM sheets WHERE name = ? AND complete",
+                              (sheet_name,)).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1]), json.loads(row[2]), row[3]
+    
+    def begin_sheet(self, sheet_name, headers):
+        """Start importing a sheet into a fresh table, replacing any earlier (or partial) import"""
+        with self.db:
+            self.drop_sheet(sheet_name)
+            cursor = self.db.execute("INSERT INTO sheets (name, tbl, headers, tagged, rows, complete) "
+                                     "VALUES (?, '', ?, '[]', 0, 0)", (sheet_name, json.dumps(headers, default=str)))
+            table = f"sheet_{cursor.lastrowid}"
+            self.db.execute("UPDATE sheets SET tbl = ? WHERE name = ?", (table, sheet_name))
+            columns = "".join(f", c{column}" for column in range(len(headers)))
+            self.db.execute(f"CREATE TABLE {table} (row_id INTEGER PRIMARY KEY{columns})")
+        return table
+    
+    def drop_sheet(self, sheet_name):
+        row = self.db.execute("SELECT tbl FROM sheets WHERE name = ?", (sheet_name,)).fetchone()
+        if row is not None:
+            if row[0]:
+                self.db.execute(f"DROP TABLE IF EXISTS {row[0]}")
+            self.db.execute("DELETE FROM sheets WHERE name = ?", (sheet_name,))
+    
+    def add_rows(self, table, width, first_row_id, rows, tagged):
+        """Append rows (padded to width) with row ids from first_row_id, adding tagged columns to the set tagged"""
+        placeholders = ", ".join(["?"] * (width + 1))
+        with self.db:
+            self.db.executemany(f"INSERT INTO {table} VALUES ({placeholders})",
+                                self.encode_rows(first_row_id, width, rows, tagged))
+    
+    def finish_sheet(self, sheet_name, rows, tagged):
+        with self.db:
+            self.db.execute("UPDATE sheets SET rows = ?, tagged = ?, complete = 1 WHERE name = ?",
+                            (rows, json.dumps(sorted(tagged)), sheet_name))
+    
+    def encode_rows(self, first_row_id, width, rows, tagged):
+        for row_id, row in enumerate(rows, start=first_row_id):
+            values = [row_id]
+            values.extend(row[:width])
+            for column, value in enumerate(values[1:], start=1):
+                if type(value) not in self.NATIVE_TYPES:
+                    values[column] = self.encode(value)
+                    tagged.add(column - 1)
+            yield values
+    
+    @staticmethod
+    def encode(value):
+        if isinstance(value, bool):
+            return "\0b" + ("1" if value else "0")
+        if isinstance(value, datetime):
+            return "\0D" + value.isoformat()
+        if isinstance(value, date):
+            return "\0d" + value.isoformat()
+        if isinstance(value, timedelta):
+            return "\0t" + repr(value.total_seconds())
+        if hasattr(value, "isoformat"):
+            return "\0T" + value.isoformat()
+        return str(value)
+    
+    def iter_pages(self, sheet_name, first_page_rows=PAGE_ROWS):
+        """Yield a completely imported sheet's rows as lists, a row id range per page, the first page first_page_rows long"""
+        table, headers, tagged, total = self.sheet_info(sheet_name)
+        columns = ", ".join(f"c{column}" for column in range(len(headers))) or "NULL"
+        decoders = self.DECODERS
+        decoded = {}  # tagged text -> value, so repeated dates are decoded (and held) once
+        start = 0
+        size = first_page_rows
+        while start < total:
+            page = self.db.execute(f"SELECT {columns} FROM {table} WHERE row_id >= ? AND row_id < ? ORDER BY row_id",
+                                   (start, start + size)).fetchall()
+            rows = [list(row) for row in page] if headers else [[] for _ in page]
+            for row in rows if tagged else ():
+                for column in tagged:
+                    value = row[column]
+                    if isinstance(value, str) and value[:1] == "\0":
+                        result = decoded.get(value)
+                        if result is None:
+                            result = decoded[value] = decoders[value[1]](value[2:])
+                        row[column] = result
+            yield rows
+            start += size
+            size = self.PAGE_ROWS
+    
+    def apply_changes(self, changes, parts):
+        """Apply SheetModel.changes() snapshots to the stored sheets and re-key the store to the saved file's parts"""
+        old = self.parts()
+        with self.db:
+            for sheet_name in parts.changed_sheets(old) - set(changes):
+                self.drop_sheet(sheet_name)
+            for sheet_name, change in changes.items():
+                info = self.sheet_info(sheet_name)
+                if info is None:
+                    self.drop_sheet(sheet_name)
+                    continue
+                table, headers, tagged, rows = info
+                tagged = set(tagged)
+                width = len(headers)
+                for number, cells in change["updated"].items():
+                    cells = {column: value for column, value in cells.items() if column < width}
+                    if not cells:
+                        continue
+                    encoded = next(self.encode_rows(number - 2, width, [[cells.get(column) for column in range(width)]], tagged))
+                    self.db.execute(f"UPDATE {table} SET {', '.join(f'c{column} = ?' for column in cells)} WHERE row_id = ?",
+                                    [encoded[column + 1] for column in cells] + [number - 2])
+                self.db.executemany(f"DELETE FROM {table} WHERE row_id = ?", [(number - 2,) for number in change["deleted"]])
+                placeholders = ", ".join(["?"] * (width + 1))
+                self.db.executemany(f"INSERT INTO {table} VALUES ({placeholders})",
+                                    self.encode_rows(change["last_row"] - 1, width, change["inserted"], tagged))
+                if change["deleted"]:
+                    # Close the gaps the deleted rows left, so row ids stay 0, 1, ... in sheet order
+                    columns = "".join(f", c{column}" for column in range(width))
+                    self.db.execute(f"CREATE TABLE {table}_new (row_id INTEGER PRIMARY KEY{columns})")
+                    self.db.execute(f"INSERT INTO {table}_new SELECT row_number() OVER (ORDER BY row_id) - 1{columns} "
+                                    f"FROM {table}")
+                    self.db.execute(f"DROP TABLE {table}")
+                    self.db.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+                rows += len(change["inserted"]) - len(change["deleted"])
+                self.db.execute("UPDATE sheets SET rows = ?, tagged = ? WHERE name = ?",
+                                (rows, json.dumps(sorted(tagged)), sheet_name))
+            self.set_meta({"parts": parts.to_json()})
+    
+    def close(self):
+        self.db.close()
+
+def format_value(value):
+    """Text shown for a cell: blank for empty cells, just the date for midnight datetimes"""
+    if value is None:
+        return ""
+    if isinstance(value, datetime) and value.time() == datetime.min.time():
+        return value.date().isoformat()
+    return str(value)
+
+# A duration as str(timedelta) writes it, optionally with days first
+DURATION_RE = re.compile(r"(?:(-?\d+) days?, )?(\d+):(\d{2})(?::(\d{2}(?:\.\d+)?))?")
+
+def parse_duration(text):
+    """A timedelta from its str() form ('7:30:00', '1 day, 2:00:00') or hours past 24 ('31:00')"""
+    match = DURATION_RE.fullmatch(text)
+    if match is None:
+        raise ValueError(f"Invalid duration {text!r}")
+    days, hours, minutes, seconds = match.groups()
+    return timedelta(days=int(days or 0), hours=int(hours), minutes=int(minutes), seconds=float(seconds or 0))
+
+def same_value(a, b):
+    """Equality that also tells 1, 1.0 and True apart, so a change of type counts as a change"""
+    return a == b and type(a) is type(b)
+
+class SheetModel:
+    """One sheet held as typed columns, with a primary-key index, change tracking and undo/redo"""
+    BOOLEAN_TEXT = {"true": True, "yes": True, "1": True, "false": False, "no": False, "0": False}
+    TYPE_LABELS = {"int": "a whole number", "float": "a number", "bool": "true or false",
+                   "datetime": "a date (YYYY-MM-DD)", "time": "a time of day (HH:MM)",
+                   "duration": "a duration (H:MM:SS)", "text": "text"}
+    
+    def __init__(self, headers):
+        self.headers = ["" if header is None else str(header) for header in headers]
+        self.columns = [[] for _ in self.headers]
+        self.types = ["text"] * len(self.headers)
+        # Row ids (positions in the column lists) in display order: loaded rows by file position, row
+        # id + 2 being the sheet row, then inserted rows; deleted rows stay in the lists but leave order
+        self.order = []
+        self.loaded = 0
+        self.complete = False
+        self.nbytes = 0
+        
+        # Sheets keyed by an ID column (Employee_ID, Record_ID, Task_ID...) have it first
+        self.key_column = 0 if self.headers and self.headers[0].endswith("_ID") else None
+        self.key_index = {}
+        # Per-column HashIndex / SortedIndex for filtering and sorting, built on first use
+        self.indexes = {}
+        
+        # Loaded values of changed cells, so the dirty rows are known exactly
+        self.original = {}
+        self.inserted = set()
+        self.deleted = set()
+        self.undo_stack = []
+        self.redo_stack = []
+        # Called as journal(kind, operations) before each step, undo and redo is applied (see EditJournal.attach)
+        self.journal = None
+        # SheetSummary over the rows in the sheet, kept current through edits like the indexes
+        self.summary = None
+    
+    def extend(self, rows):
+        """Append rows parsed from the file (lists at least as wide as the header row)"""
+        start = self.loaded
+        for index, column in enumerate(self.columns):
+            column.extend(row[index] for row in rows)
+        self.loaded += len(rows)
+        self.order.extend(range(start, self.loaded))
+    
+    def finish(self):
+        """Called once every row is parsed: infer column types and index the primary key"""
+        self.types = [self.infer_type(column) for column in self.columns]
+        if self.key_column is not None:
+            for row_id, key in enumerate(self.columns[self.key_column]):
+                if key is not None:
+                    self.key_index.setdefault(key, row_id)
+        self.complete = True
+    
+    @staticmethod
+    def infer_type(values):
+        kinds = {type(value) for value in values} - {type(None)}
+        if not kinds:
+            return "text"
+        if kinds == {bool}:
+            return "bool"
+        if kinds == {int}:
+            return "int"
+        if kinds <= {int, float}:
+            return "float"
+        if kinds <= {datetime, date}:
+            return "datetime"
+        if kinds == {time_of_day}:
+            return "time"
+        if kinds == {timedelta}:
+            return "duration"
+        return "text"
+    
+    def coerce(self, column, text):
+        """Convert text typed into the GUI to the column's type, raising ValueError if it doesn't fit"""
+        kind = self.types[column]
+        if kind != "text":
+            text = text.strip()
+        if text == "":
+            return None
+        try:
+            if kind == "int":
+                return int(text)
+            if kind == "float":
+                return float(text)
+            if kind == "bool":
+                return self.BOOLEAN_TEXT[text.lower()]
+            if kind == "datetime":
+                return datetime.fromisoformat(text)
+            if kind == "time":
+                # fromisoformat wants two-digit hours
+                return time_of_day.fromisoformat("0" + text if text.find(":") == 1 else text)
+            if kind == "duration":
+                return parse_duration(text)
+        except (ValueError, KeyError):
+            raise ValueError(f"{self.headers[column]} must be {self.TYPE_LABELS[kind]}, not {text!r}") from None
+        return text
+    
+    def row(self, row_id):
+        return [column[row_id] for column in self.columns]
+    
+    def iter_rows(self):
+        """Row values in display order"""
+        for row_id in self.order:
+            yield self.row(row_id)
+    
+    def display_row(self, row_id):
+        return [format_value(column[row_id]) for column in self.columns]
+    
+    @property
+    def dirty(self):
+        return bool(self.original or self.inserted or self.deleted)
+    
+    def dirty_rows(self):
+        """Loaded rows, still present, with at least one changed cell"""
+        return {row_id for row_id, _ in self.original} - self.deleted
+    
+    def check_key(self, key, row_id=None):
+        if self.key_column is None or key is None:
+            return
+        owner = self.key_index.get(key)
+        if owner is not None and owner != row_id:
+            raise ValueError(f"{self.headers[self.key_column]} {key!r} already exists")
+    
+    def check_keys(self, updates, inserts, doomed):
+        """Raise ValueError unless a step leaves every key unique"""
+        if self.key_column is None:
+            return
+        claims = [(cells[self.key_column], row_id) for row_id, cells in updates.items()
+                  if self.key_column in cells and row_id not in doomed]
+        claims.extend((values[self.key_column], None) for values in inserts)
+        freed = doomed | {row_id for _, row_id in claims}
+        claimed = set()
+        for key, row_id in claims:
+            if key is None:
+                continue
+            if key in claimed:
+                raise ValueError(f"{self.headers[self.key_column]} {key!r} is used more than once in this edit")
+            owner = self.key_index.get(key)
+            if owner is not None and owner not in freed:
+                raise ValueError(f"{self.headers[self.key_column]} {key!r} already exists")
+            claimed.add(key)
+    
+    def update_row(self, row_id, values):
+        """Replace a row's values (already coerced) as one undoable step"""
+        if self.key_column is not None:
+            self.check_key(values[self.key_column], row_id)
+        self.push([("set", row_id, index, self.columns[index][row_id], value)
+                   for index, value in enumerate(values)
+                   if not same_value(self.columns[index][row_id], value)])
+    
+    def insert_row(self, values):
+        """Append a new row (already coerced) as one undoable step; returns its row id"""
+        if self.key_column is not None:
+            self.check_key(values[self.key_column])
+        row_id = len(self.columns[0]) if self.columns else 0
+        for column, value in zip(self.columns, values):
+            column.append(value)
+        self.push([("insert", row_id, len(self.order))])
+        return row_id
+    
+    def delete_rows(self, row_ids):
+        """Remove rows from the sheet as one undoable step"""
+        doomed = set(row_ids)
+        self.push([("delete", [(position, row_id) for position, row_id in enumerate(self.order) if row_id in doomed])])
+    
+    def edit(self, updates=None, inserts=(), deletes=()):
+        """Set cells ({row id: {column: value}}, already coerced), append rows and remove rows as one all-or-nothing step"""
+        updates = updates or {}
+        inserts = list(inserts)
+        doomed = set(deletes)
+        self.check_keys(updates, inserts, doomed)
+        operations = []
+        if doomed:
+            entries = [(position, row_id) for position, row_id in enumerate(self.order) if row_id in doomed]
+            operations.append(("delete", entries))
+        for row_id, cells in updates.items():
+            operations.extend(("set", row_id, column, self.columns[column][row_id], value)
+                              for column, value in cells.items() if not same_value(self.columns[column][row_id], value))
+        # Deletes are applied first, so the inserted rows go at the end of what is left
+        position = len(self.order) - (len(entries) if doomed else 0)
+        for values in inserts:
+            row_id = len(self.columns[0]) if self.columns else 0
+            for column, value in zip(self.columns, values):
+                column.append(value)
+            operations.append(("insert", row_id, position))
+            position += 1
+        self.push(operations)
+    
+    def push(self, operations):
+        if not operations:
+            return
+        if self.journal is not None:
+            self.journal("do", operations)
+        for operation in operations:
+            self.apply(operation)
+        self.undo_stack.append(operations)
+        self.redo_stack.clear()
+    
+    def undo(self):
+        """Revert the latest step; returns False when there is nothing to undo"""
+        if not self.undo_stack:
+            return False
+        operations = self.undo_stack.pop()
+        if self.journal is not None:
+            self.journal("undo", operations)
+        for operation in reversed(operations):
+            self.apply(operation, reverse=True)
+        self.redo_stack.append(operations)
+        return True
+    
+    def redo(self):
+        if not self.redo_stack:
+            return False
+        operations = self.redo_stack.pop()
+        if self.journal is not None:
+            self.journal("redo", operations)
+        for operation in operations:
+            self.apply(operation)
+        self.undo_stack.append(operations)
+        return True
+    
+    def apply(self, operation, reverse=False):
+        kind = operation[0]
+        if kind == "set":
+            _, row_id, column, old, new = operation
+            self.set_cell(row_id, column, old if reverse else new)
+        elif kind == "insert":
+            _, row_id, position = operation
+            if reverse:
+                del self.order[position]
+                self.inserted.discard(row_id)
+                self.unindex_row(row_id)
+            else:
+                self.order.insert(position, row_id)
+                self.inserted.add(row_id)
+                self.index_row(row_id)
+        elif kind == "delete":
+            entries = operation[1]
+            if reverse:
+                self.restore(entries)
+            else:
+                doomed = {row_id for _, row_id in entries}
+                self.order = [row_id for row_id in self.order if row_id not in doomed]
+                for row_id in doomed:
+                    self.unindex_row(row_id)
+                    if row_id < self.loaded:
+                        self.deleted.add(row_id)
+                    else:
+                        self.inserted.discard(row_id)
+    
+    def restore(self, entries):
+        """Put deleted rows back at their old positions, merging in one pass over self.order"""
+        order = []
+        remaining = iter(self.order)
+        for position, row_id in entries:
+            order.extend(itertools.islice(remaining, position - len(order)))
+            order.append(row_id)
+            self.index_row(row_id)
+            if row_id < self.loaded:
+                self.deleted.discard(row_id)
+            else:
+                self.inserted.add(row_id)
+        order.extend(remaining)
+        self.order = order
+    
+    def set_cell(self, row_id, column, value):
+        values = self.columns[column]
+        if row_id < self.loaded:
+            # Remember the loaded value of a changed cell, and forget it once the cell is changed back
+            cell = (row_id, column)
+            if cell not in self.original:
+                self.original[cell] = values[row_id]
+            elif same_value(self.original[cell], value):
+                del self.original[cell]
+        index = self.indexes.get(column)
+        live = self.is_live(row_id)
+        indexed = index is not None and live
+        if indexed:
+            index.remove(values[row_id], row_id)
+        if self.summary is not None and live:
+            self.summary.remove(self.row(row_id))
+        if column == self.key_column:
+            self.unindex_key(row_id)
+            values[row_id] = value
+            self.index_key(row_id)
+        else:
+            values[row_id] = value
+        if indexed:
+            index.add(value, row_id)
+        if self.summary is not None and live:
+            self.summary.add(self.row(row_id))
+    
+    def is_live(self, row_id):
+        """Whether a row id is currently in the sheet (not deleted, nor an undone insert)"""
+        return row_id not in self.deleted if row_id < self.loaded else row_id in self.inserted
+    
+    def index_row(self, row_id):
+        self.index_key(row_id)
+        for column, index in self.indexes.items():
+            index.add(self.columns[column][row_id], row_id)
+        if self.summary is not None:
+            self.summary.add(self.row(row_id))
+    
+    def unindex_row(self, row_id):
+        self.unindex_key(row_id)
+        for column, index in self.indexes.items():
+            index.remove(self.columns[column][row_id], row_id)
+        if self.summary is not None:
+            self.summary.remove(self.row(row_id))
+    
+    def index_key(self, row_id):
+        if self.key_column is not None:
+            key = self.columns[self.key_column][row_id]
+            if key is not None:
+                self.key_index[key] = row_id
+    
+    def unindex_key(self, row_id):
+        if self.key_column is not None:
+            key = self.columns[self.key_column][row_id]
+            if self.key_index.get(key) == row_id:
+                del self.key_index[key]
+    
+    def column_index(self, column):
+        """The column's index over the rows in the sheet, built the first time a filter or sort needs it"""
+        index = self.indexes.get(column)
+        if index is None:
+            kind = SortedIndex if self.types[column] in ("int", "float", "datetime", "time", "duration") else HashIndex
+            index = self.indexes[column] = kind(self.columns[column], self.order)
+        return index
+    
+    def changes(self):
+        """Snapshot of the unsaved changes in sheet-row numbers (data row id + 2), for XlsxPatcher"""
+        updated = {}
+        for row_id, column in self.original:
+            if row_id not in self.deleted:
+                updated.setdefault(row_id + 2, {})[column] = self.columns[column][row_id]
+        return {
+            "updated": updated,
+            "deleted": sorted(row_id + 2 for row_id in self.deleted),
+            "inserted": [self.row(row_id) for row_id in self.order if row_id >= self.loaded],
+            "last_row": self.loaded + 1,
+            "width": len(self.headers),
+        }
+    
+    def mark_saved(self):
+        """Make the current rows the new baseline after a save: renumber them in display order and drop the history"""
+        self.columns = [[column[row_id] for row_id in self.order] for column in self.columns]
+        self.loaded = len(self.order)
+        self.order = list(range(self.loaded))
+        self.original.clear()
+        self.inserted.clear()
+        self.deleted.clear()
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.key_index = {}
+        self.indexes = {}
+        # The same rows stay in the sheet, so the summary is still right
+        summary, self.summary = self.summary, None
+        for row_id in self.order:
+            self.index_row(row_id)
+        self.summary = summary
+    
+    def estimate_nbytes(self, sample_size=200):
+        """Approximate memory held by the columns, extrapolated from an even sample of rows"""
+        total = sum(sys.getsizeof(column) for column in self.columns)
+        count = len(self.columns[0]) if self.columns else 0
+        if count:
+            sample = range(0, count, max(1, count // sample_size))
+            per_row = sum(sys.getsizeof(column[row_id]) for column in self.columns for row_id in sample) / len(sample)
+            total += int(per_row * count)
+        return total
+
+class HashIndex:
+    """Row ids grouped by value for one column: equality and substring filters on IDs and labels"""
+    def __init__(self, values, row_ids):
+        self.rows = {}
+        for row_id in row_ids:
+            self.rows.setdefault(values[row_id], set()).add(row_id)
+        self.ranks = None
+    
+    def add(self, value, row_id):
+        self.rows.setdefault(value, set()).add(row_id)
+        self.ranks = None
+    
+    def remove(self, value, row_id):
+        rows = self.rows.get(value)
+        if rows is not None:
+            rows.discard(row_id)
+            if not rows:
+                del self.rows[value]
+        self.ranks = None
+    
+    def equal(self, value):
+        return set(self.rows.get(value, ()))
+    
+    def matching(self, predicate):
+        """Row ids whose value satisfies predicate, testing each distinct value once"""
+        matched = set()
+        for value, rows in self.rows.items():
+            if predicate(value):
+                matched |= rows
+        return matched
+    
+    def sort_key(self, size):
+        """Key function giving each row id the rank of its value in (case-insensitive) text order"""
+        if self.ranks is None:
+            self.ranks = [0] * size
+            ordered = sorted(self.rows, key=lambda value: (value is not None, format_value(value).lower()))
+            for rank, value in enumerate(ordered):
+                for row_id in self.rows[value]:
+                    self.ranks[row_id] = rank
+        return self.ranks.__getitem__
+
+class SortedIndex:
+    """(value, row id) pairs in value order for one number or date column: range filters and sorting"""
+    def __init__(self, values, row_ids):
+        self.pairs = sorted((self.key(values[row_id]), row_id) for row_id in row_ids if values[row_id] is not None)
+        self.empty = {row_id for row_id in row_ids if values[row_id] is None}
+        self.ranks = None
+    
+    @staticmethod
+    def key(value):
+        # Plain dates and datetimes can share a column but don't compare with each other
+        if isinstance(value, date) and not isinstance(value, datetime):
+            return datetime.combine(value, datetime.min.time())
+        return value
+    
+    def add(self, value, row_id):
+        if value is None:
+            self.empty.add(row_id)
+        else:
+            bisect.insort(self.pairs, (self.key(value), row_id))
+        self.ranks = None
+    
+    def remove(self, value, row_id):
+        if value is None:
+            self.empty.discard(row_id)
+        else:
+            pair = (self.key(value), row_id)
+            position = bisect.bisect_left(self.pairs, pair)
+            if position < len(self.pairs) and self.pairs[position] == pair:
+                del self.pairs[position]
+        self.ranks = None
+    
+    def between(self, low=None, high=None, include_high=True):
+        """Row ids with low <= value <= high (or < high), either bound optional"""
+        start = 0 if low is None else bisect.bisect_left(self.pairs, (self.key(low),))
+        if high is None:
+            stop = len(self.pairs)
+        elif include_high:
+            stop = bisect.bisect_right(self.pairs, (self.key(high), float("inf")))
+        else:
+            stop = bisect.bisect_left(self.pairs, (self.key(high),))
+        return {row_id for _, row_id in itertools.islice(self.pairs, start, stop)}
+    
+    def equal(self, value):
+        return set(self.empty) if value is None else self.between(value, value)
+    
+    def sort_key(self, size):
+        """Key function giving each row id the rank of its value, blanks first and equal values tied"""
+        if self.ranks is None:
+            self.ranks = [0] * size
+            rank = 0
+            previous = object()
+            for value, row_id in self.pairs:
+                if value != previous:
+                    rank += 1
+                    previous = value
+                self.ranks[row_id] = rank
+        return self.ranks.__getitem__
+
+class SheetQuery:
+    """The filters and sort order applied to one sheet's view, answered from the model's column indexes"""
+    def __init__(self):
+        # Filter text by column, and (column, descending) sort keys, most significant first
+        self.filters = {}
+        self.sort_keys = []
+    
+    @property
+    def active(self):
+        return bool(self.filters or self.sort_keys)
+    
+    def set_filter(self, column, text):
+        if text.strip():
+            self.filters[column] = text.strip()
+        else:
+            self.filters.pop(column, None)
+    
+    def toggle_sort(self, column, extend=False):
+        """Cycle a column through ascending, descending and unsorted; extend keeps the other sort keys"""
+        keys = dict(self.sort_keys)
+        if not extend:
+            keys = {column: keys[column]} if column in keys else {}
+        if column not in keys:
+            keys[column] = False
+        elif not keys[column]:
+            keys[column] = True
+        else:
+            del keys[column]
+        self.sort_keys = [(key, keys[key]) for key in dict.fromkeys([key for key, _ in self.sort_keys] + [column])
+                          if key in keys]
+    
+    def row_ids(self, model):
+        """Row ids to show in view order, None for all of model.order; ValueError if a filter doesn't parse"""
+        if not self.active:
+            return None
+        matched = None
+        for column, text in self.filters.items():
+            rows = self.matches(model, column, text)
+            matched = rows if matched is None else matched & rows
+            if not matched:
+                break
+        # Row ids grow along model.order (loaded rows in file order, then inserts), so sorting ids restores it
+        row_ids = sorted(matched) if matched is not None else list(model.order)
+        size = len(model.columns[0]) if model.columns else 0
+        for column, descending in reversed(self.sort_keys):
+            row_ids.sort(key=model.column_index(column).sort_key(size), reverse=descending)
+        return row_ids
+    
+    def matches(self, model, column, text):
+        index = model.column_index(column)
+        kind = model.types[column]
+        if kind == "text":
+            if text.startswith("="):
+                return index.equal(text[1:])
+            needle = text.lower()
+            return index.matching(lambda value: needle in format_value(value).lower())
+        if kind == "bool":
+            return index.equal(model.coerce(column, text.lstrip("=")))
+        
+        low_text, dots, high_text = text.lstrip("=").partition("..")
+        low, high = model.coerce(column, low_text), model.coerce(column, high_text)
+        if not dots:
+            high = low
+        if kind == "datetime" and high is not None and high.time() == datetime.min.time():
+            return index.between(low, high + timedelta(days=1), include_high=False)
+        return index.between(low, high)
+
+class BulkEdit:
+    """One change to many rows of a SheetModel, worked out column by column and applied as one undoable step"""
+    TOKEN_RE = re.compile(r"""\s*(?:(?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")|(?P<op>==|!=|<=|>=|<|>|=|,)|(?P<word>[^\s=!<>,'"]+))""")
+    OPERATORS = {"==", "!=", "<", "<=", ">", ">="}
+    
+    def __init__(self, model, assignments=(), conditions=(), replace=None):
+        self.model = model
+        # (column, value) pairs, (column, operator, value) triples and (column, find, replacement)
+        self.assignments = list(assignments)
+        self.conditions = list(conditions)
+        self.replace = replace
+    
+    @classmethod
+    def set_value(cls, model, column, text):
+        return cls(model, assignments=[(column, model.coerce(column, text))])
+    
+    @classmethod
+    def find_replace(cls, model, column, find, replacement):
+        if not find:
+            raise ValueError("Enter the text to find")
+        return cls(model, replace=(column, find, replacement))
+    
+    @classmethod
+    def parse(cls, model, text):
+        tokens = cls.tokenize(text)
+        position = 0
+        
+        def take(kind=None, word=None):
+            nonlocal position
+            if position >= len(tokens):
+                raise ValueError(f"Expression ends early: {text!r}")
+            token_kind, token = tokens[position]
+            if kind is not None and token_kind != kind or word is not None and token.lower() != word:
+                raise ValueError(f"Unexpected {token!r} in the expression")
+            position += 1
+            return token_kind, token
+        
+        def at_word(word):
+            return position < len(tokens) and tokens[position][0] == "word" and tokens[position][1].lower() == word
+        
+        def value(column):
+            kind, token = take()
+            if kind == "op":
+                raise ValueError(f"Expected a value for {model.headers[column]}, not {token!r}")
+            return model.coerce(column, token)
+        
+        assignments = []
+        while True:
+            column = cls.column(model, take("word")[1])
+            take("op", "=")
+            assignments.append((column, value(column)))
+            if position < len(tokens) and tokens[position] == ("op", ","):
+                position += 1
+                continue
+            break
+        conditions = []
+        if at_word("where"):
+            position += 1
+            while True:
+                column = cls.column(model, take("word")[1])
+                _, operator = take("op")
+                if operator not in cls.OPERATORS:
+                    raise ValueError(f"Conditions compare with {', '.join(sorted(cls.OPERATORS))}, not {operator!r}")
+                conditions.append((column, operator, value(column)))
+                if not at_word("and"):
+                    break
+                position += 1
+        if position < len(tokens):
+            raise ValueError(f"Unexpected {tokens[position][1]!r} in the expression")
+        return cls(model, assignments, conditions)
+    
+    @classmethod
+    def tokenize(cls, text):
+        """(kind, text) pairs: 'string' (unquoted), 'op' or 'word'"""
+        tokens = []
+        position = 0
+        text = text.rstrip()
+        while position < len(text):
+            match = cls.TOKEN_RE.match(text, position)
+            if match is None or match.end() == position:
+                raise ValueError(f"Can't read the expression from {text[position:]!r}")
+            kind = match.lastgroup
+            token = match.group(kind)
+            if kind == "string":
+                token = re.sub(r"\\(.)", r"\1", token[1:-1])
+            tokens.append((kind, token))
+            position = match.end()
+        if not tokens:
+            raise ValueError("Enter an expression")
+        return tokens
+    
+    @staticmethod
+    def column(model, name):
+        """A column's index by header, ignoring case when no header matches exactly"""
+        if name in model.headers:
+            return model.headers.index(name)
+        folded = [header.lower() for header in model.headers]
+        if name.lower() in folded:
+            return folded.index(name.lower())
+        raise ValueError(f"No column named {name!r}")
+    
+    def matching(self, column, operator, value):
+        """Row ids in the sheet whose value in column compares with value as operator says"""
+        model = self.model
+        index = model.column_index(column)
+        if operator in ("==", "!="):
+            equal = index.equal(value)
+            return equal if operator == "==" else set(model.order) - equal
+        if value is None:
+            raise ValueError(f"{model.headers[column]} can't be compared with a blank using {operator}")
+        if isinstance(index, SortedIndex):
+            if operator in ("<", "<="):
+                return index.between(None, value, include_high=operator == "<=")
+            above = index.between(value)
+            return above - index.equal(value) if operator == ">" else above
+        compare = {"<": lambda a, b: a < b, "<=": lambda a, b: a <= b,
+                   ">": lambda a, b: a > b, ">=": lambda a, b: a >= b}[operator]
+        
+        def predicate(cell):
+            try:
+                return cell is not None and compare(cell, value)
+            except TypeError:
+                return False
+        return index.matching(predicate)
+    
+    def updates(self, row_ids):
+        """{row id: {column: value}} for the cells among row_ids that the edit changes, raising ValueError if it can't"""
+        model = self.model
+        if self.conditions:
+            matched = None
+            for condition in self.conditions:
+                rows = self.matching(*condition)
+                matched = rows if matched is None else matched & rows
+            row_ids = [row_id for row_id in row_ids if row_id in matched]
+        
+        updates = {}
+        for column, value in self.assignments:
+            values = model.columns[column]
+            for row_id in row_ids:
+                if not same_value(values[row_id], value):
+                    updates.setdefault(row_id, {})[column] = value
+        if self.replace is not None:
+            column, find, replacement = self.replace
+            values = model.columns[column]
+            for row_id in row_ids:
+                text = format_value(values[row_id])
+                if find in text:
+                    value = model.coerce(column, text.replace(find, replacement))
+                    if not same_value(values[row_id], value):
+                        updates.setdefault(row_id, {})[column] = value
+        
+        # SheetModel.edit checks new IDs against the other rows; repeats within the edit are caught here
+        key_column = model.key_column
+        keys = [cells[key_column] for cells in updates.values() if cells.get(key_column) is not None]
+        if len(keys) != len(set(keys)):
+            raise ValueError(f"{model.headers[key_column]} values must stay unique; this edit would repeat some")
+        return updates
+
+class ModelRows:
+    """A SheetModel's rows as display strings, in display order or the order of row_ids"""
+    def __init__(self, model, row_ids=None):
+        self.model = model
+        self.row_ids = row_ids
+    
+    def ids(self):
+        return self.model.order if self.row_ids is None else self.row_ids
+    
+    def row_id(self, index):
+        return self.ids()[index]
+    
+    def position(self, row_id):
+        """View index of a row id, or None when it is filtered out"""
+        try:
+            return self.ids().index(row_id)
+        except ValueError:
+            return None
+    
+    def __len__(self):
+        return len(self.ids())
+    
+    def __getitem__(self, index):
+        return self.model.display_row(self.ids()[index])
+
+class SheetJoins:
+    """The joined view of one sheet: its foreign keys followed by columns of the rows they point at"""
+    FOREIGN_KEYS = {
+        "Employee_ID": ("Employees", ("Employee_Name", "Department")),
+        "Process_ID": ("Training_Processes", ("Process_Name",)),
+    }
+    
+    def __init__(self, model):
+        # Per view column: a model column number, or (foreign key column, parent sheet, parent header)
+        self.columns = []
+        for column, header in enumerate(model.headers):
+            self.columns.append(column)
+            parent = self.FOREIGN_KEYS.get(header)
+            if parent is not None and column != model.key_column:
+                self.columns.extend((column, parent[0], parent_header) for parent_header in parent[1])
+        self.parents = {column[1] for column in self.columns if isinstance(column, tuple)}
+        self.model = model
+    
+    def headers(self):
+        return [self.model.headers[column] if isinstance(column, int) else f"{column[2]} ({column[1]})"
+                for column in self.columns]
+    
+    def model_column(self, view_column):
+        """The model column shown in a view column, or None for a joined column"""
+        column = self.columns[view_column]
+        return column if isinstance(column, int) else None
+
+class JoinedRows(ModelRows):
+    """ModelRows with SheetJoins' joined columns, looked up in parents (sheet name -> SheetModel, None while loading)"""
+    LOADING = "…"
+    
+    def __init__(self, model, joins, parents, row_ids=None):
+        super().__init__(model, row_ids)
+        self.joins = joins
+        self.parents = parents
+        self.parent_columns = {}
+    
+    def __getitem__(self, index):
+        row_id = self.ids()[index]
+        columns = self.model.columns
+        return [format_value(columns[column][row_id]) if isinstance(column, int) else self.lookup(row_id, *column)
+                for column in self.joins.columns]
+    
+    def lookup(self, row_id, key_column, sheet_name, header):
+        if sheet_name not in self.parents:
+            return ""
+        parent = self.parents[sheet_name]
+        if parent is None:
+            return self.LOADING
+        parent_row = parent.key_index.get(self.model.columns[key_column][row_id])
+        column = self.parent_columns.get((sheet_name, header))
+        if column is None:
+            column = self.parent_columns[(sheet_name, header)] = (
+                parent.headers.index(header) if header in parent.headers else -1)
+        if parent_row is None or column < 0:
+            return ""
+        return format_value(parent.columns[column][parent_row])
+
+class SheetCache:
+    """Parsed sheets by name, evicting the least recently viewed beyond a memory budget; edited sheets are pinned"""
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.sheets = OrderedDict()
+    
+    def __contains__(self, sheet_name):
+        return sheet_name in self.sheets
+    
+    def get(self, sheet_name):
+        """The cached sheet, now the most recently viewed, or None"""
+        sheet = self.sheets.get(sheet_name)
+        if sheet is not None:
+            self.sheets.move_to_end(sheet_name)
+        return sheet
+    
+    def put(self, sheet_name, sheet, keep=()):
+        sheet.nbytes = sheet.estimate_nbytes()
+        self.sheets[sheet_name] = sheet
+        self.sheets.move_to_end(sheet_name)
+        self.evict(keep)
+    
+    def total_bytes(self):
+        return sum(sheet.nbytes for sheet in self.sheets.values())
+    
+    def evict(self, keep=()):
+        """Drop least recently viewed sheets until within budget, sparing dirty ones and those in keep"""
+        total = self.total_bytes()
+        for sheet_name in list(self.sheets):
+            if total <= self.budget_bytes:
+                break
+            sheet = self.sheets[sheet_name]
+            if sheet.dirty or sheet_name in keep:
+                continue
+            del self.sheets[sheet_name]
+            total -= sheet.nbytes
+    
+    def dirty_sheets(self):
+        return {name: sheet for name, sheet in self.sheets.items() if sheet.dirty}
+    
+    def discard(self, sheet_name):
+        """Drop a sheet whatever its state; returns it, or None if it wasn't cached"""
+        return self.sheets.pop(sheet_name, None)
+
+class SheetMerge:
+    """Unsaved edits of a sheet (local) replayed by ID onto a newer version of it read from disk (incoming)"""
+    def __init__(self, local, incoming):
+        self.local = local
+        self.incoming = incoming
+        self.updates = {}
+        self.inserts = []
+        self.deletes = set()
+        # (description, (updates, inserts, deletes) to apply if the local side is kept, or None)
+        self.conflicts = []
+        if local.key_column is None or local.headers != incoming.headers:
+            count = len(local.dirty_rows()) + len(local.inserted) + len(local.deleted)
+            self.conflicts.append((f"{count:,} edited row(s) can't be matched to the new version", None))
+            return
+        
+        edited = {}
+        for row_id, column in local.original:
+            if row_id not in local.deleted:
+                edited.setdefault(row_id, []).append(column)
+        for row_id, columns in edited.items():
+            self.merge_row(row_id, columns)
+        for row_id in local.deleted:
+            self.merge_delete(row_id)
+        for row_id in local.order:
+            if row_id >= local.loaded:
+                self.merge_insert(row_id)
+    
+    def loaded_value(self, row_id, column):
+        return self.local.original.get((row_id, column), self.local.columns[column][row_id])
+    
+    def describe(self, key, column, mine, theirs):
+        return (f"{key} {self.local.headers[column]}: yours {format_value(mine) or '(blank)'}, "
+                f"on disk {format_value(theirs) or '(blank)'}")
+    
+    def merge_row(self, row_id, columns):
+        local, incoming = self.local, self.incoming
+        key = self.loaded_value(row_id, local.key_column)
+        target = incoming.key_index.get(key)
+        if target is None:
+            self.conflicts.append((f"{key}: edited here, deleted on disk", ([], [local.row(row_id)], [])))
+            return
+        for column in columns:
+            base, mine, theirs = self.loaded_value(row_id, column), local.columns[column][row_id], incoming.columns[column][target]
+            if same_value(theirs, base) or same_value(theirs, mine):
+                self.updates.setdefault(target, {})[column] = mine
+            else:
+                self.conflicts.append((self.describe(key, column, mine, theirs), ([(target, column, mine)], [], [])))
+    
+    def merge_delete(self, row_id):
+        local, incoming = self.local, self.incoming
+        key = self.loaded_value(row_id, local.key_column)
+        target = incoming.key_index.get(key)
+        if target is None:
+            return  # deleted on both sides
+        if all(same_value(self.loaded_value(row_id, column), incoming.columns[column][target])
+               for column in range(len(local.headers))):
+            self.deletes.add(target)
+        else:
+            self.conflicts.append((f"{key}: deleted here, changed on disk", ([], [], [target])))
+    
+    def merge_insert(self, row_id):
+        local, incoming = self.local, self.incoming
+        values = local.row(row_id)
+        target = incoming.key_index.get(values[local.key_column])
+        if target is None:
+            self.inserts.append(values)
+        else:
+            cells = [(target, column, value) for column, value in enumerate(values)
+                     if not same_value(incoming.columns[column][target], value)]
+            self.conflicts.append((f"{values[local.key_column]}: added here, also added on disk", (cells, [], [])))
+    
+    @property
+    def keepable(self):
+        """Conflicts the local side can win"""
+        return [conflict for conflict in self.conflicts if conflict[1] is not None]
+    
+    def apply(self, keep_local=False):
+        updates = {row_id: dict(cells) for row_id, cells in self.updates.items()}
+        inserts = list(self.inserts)
+        deletes = set(self.deletes)
+        for _, resolution in self.keepable if keep_local else ():
+            cells, rows, doomed = resolution
+            for row_id, column, value in cells:
+                updates.setdefault(row_id, {})[column] = value
+            inserts.extend(rows)
+            deletes.update(doomed)
+        for row_id in deletes:
+            updates.pop(row_id, None)
+        self.incoming.edit(updates, inserts, deletes)
+
+class EditJournal:
+    """A write-ahead log of the unsaved edits to a workbook's sheets, for recovery after a crash"""
+    # One JSON record per line: the WorkbookParts the edits were made against, then ["open", sheet],
+    # ["do", sheet, operations], ["undo", sheet] and ["redo", sheet]; values are tagged as in SheetStore
+    VERSION = 1
+    
+    def __init__(self, file_path):
+        self.path = self.path_for(file_path)
+        self.parts = None
+        self.handle = None
+        # Sheets whose records since their last "open" describe the copy being edited now
+        self.opened = set()
+        self.last_write = time.monotonic()
+        self.error = None
+    
+    @staticmethod
+    def path_for(file_path):
+        directory, name = os.path.split(os.path.abspath(file_path))
+        return os.path.join(directory, f".{name}.ems-journal")
+    
+    def read(self):
+        """(WorkbookParts, {sheet name: records from its last "open" on}) of the journal left on disk, or None"""
+        try:
+            with open(self.path, "rb") as handle:
+                lines = handle.read().split(b"\n")
+        except OSError:
+            return None
+        try:
+            header = json.loads(lines[0])
+            if header.get("journal") != self.VERSION:
+                return None
+            parts = WorkbookParts.from_json(header["parts"])
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return None
+        sheets = {}
+        # The last piece is empty after a complete record, and a torn one otherwise
+        for line in lines[1:-1]:
+            try:
+                record = json.loads(line)
+                kind, sheet_name = record[0], record[1]
+            except (ValueError, IndexError, KeyError, TypeError):
+                break
+            if kind == "open":
+                sheets[sheet_name] = [record]
+            elif sheet_name in sheets:
+                sheets[sheet_name].append(record)
+        return parts, {sheet_name: records for sheet_name, records in sheets.items() if len(records) > 1}
+    
+    @staticmethod
+    def count_steps(records):
+        return sum(record[0] == "do" for record in records)
+    
+    def rewrite(self, parts, sheets=(), carried=None):
+        """Start the journal over against the workbook version parts, keeping each sheet's history and carried"""
+        self.close()
+        self.parts = parts
+        self.opened = set()
+        lines = [{"journal": self.VERSION, "parts": parts.to_json()}]
+        for sheet_name, records in (carried or {}).items():
+            lines.extend(records)
+            self.opened.add(sheet_name)
+        for sheet_name, model in sheets:
+            if not model.undo_stack and not model.redo_stack:
+                continue
+            # Every step is done again in order, then the ones undone are undone, newest last
+            lines.append(["open", sheet_name])
+            for operations in model.undo_stack + model.redo_stack[::-1]:
+                lines.append(["do", sheet_name, self.encode_operations(model, operations)])
+            lines.extend(["undo", sheet_name] for _ in model.redo_stack)
+            self.opened.add(sheet_name)
+        
+        directory, name = os.path.split(self.path)
+        try:
+            handle, temp_path = tempfile.mkstemp(prefix=f"{name}.", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(handle, "wb") as target:
+                    target.write("".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines).encode("utf-8"))
+                    target.flush()
+                    os.fsync(target.fileno())
+                os.replace(temp_path, self.path)
+            except BaseException:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                raise
+            self.handle = os.open(self.path, os.O_WRONLY | os.O_APPEND | getattr(os, "O_BINARY", 0))
+        except OSError as e:
+            self.error = e
+    
+    def attach(self, sheet_name, model, fresh=True):
+        """Journal model's steps from now on; a fresh copy (just read from disk) makes the sheet's earlier records obsolete"""
+        model.journal = functools.partial(self.record, sheet_name, model)
+        if fresh:
+            self.opened.discard(sheet_name)
+    
+    def record(self, sheet_name, model, kind, operations):
+        if sheet_name not in self.opened:
+            self.append(["open", sheet_name])
+            self.opened.add(sheet_name)
+        if kind == "do":
+            self.append(["do", sheet_name, self.encode_operations(model, operations)])
+        else:
+            self.append([kind, sheet_name])
+    
+    def append(self, record):
+        if self.handle is None:
+            return
+        data = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+        try:
+            while data:
+                data = data[os.write(self.handle, data):]
+            os.fsync(self.handle)
+        except OSError as e:
+            # The edit goes ahead in memory; the updater reports that the journal stopped
+            self.error = e
+            self.close()
+        self.last_write = time.monotonic()
+    
+    @classmethod
+    def encode_operations(cls, model, operations):
+        encoded = []
+        for operation in operations:
+            kind = operation[0]
+            if kind == "set":
+                _, row_id, column, old, new = operation
+                encoded.append(["set", row_id, column, cls.encode(old), cls.encode(new)])
+            elif kind == "insert":
+                _, row_id, position = operation
+                encoded.append(["insert", row_id, position, [cls.encode(value) for value in model.row(row_id)]])
+            else:
+                encoded.append(["delete", operation[1]])
+        return encoded
+    
+    @classmethod
+    def decode_operations(cls, model, operations):
+        decoded = []
+        for operation in operations:
+            kind = operation[0]
+            if kind == "set":
+                _, row_id, column, old, new = operation
+                if not 0 <= row_id < len(model.columns[column]):
+                    raise ValueError(f"row {row_id} is not in the sheet")
+                decoded.append(("set", row_id, column, cls.decode(old), cls.decode(new)))
+            elif kind == "insert":
+                _, row_id, position, values = operation
+                cls.place_row(model, row_id, [cls.decode(value) for value in values])
+                decoded.append(("insert", row_id, position))
+            elif kind == "delete":
+                decoded.append(("delete", [tuple(entry) for entry in operation[1]]))
+            else:
+                raise ValueError(f"unknown operation {kind!r}")
+        return decoded
+    
+    @staticmethod
+    def place_row(model, row_id, values):
+        """Put an inserted row's values at row_id, which an insert undone before the journal was compacted may have skipped"""
+        if row_id < model.loaded:
+            raise ValueError(f"row {row_id} was loaded from the file, not inserted")
+        for index, column in enumerate(model.columns):
+            value = values[index] if index < len(values) else None
+            column.extend([None] * (row_id - len(column)))
+            if row_id < len(column):
+                column[row_id] = value
+            else:
+                column.append(value)
+    
+    @staticmethod
+    def encode(value):
+        return value if type(value) in SheetStore.NATIVE_TYPES else SheetStore.encode(value)
+    
+    @staticmethod
+    def decode(value):
+        if isinstance(value, str) and value[:1] == "\0":
+            return SheetStore.DECODERS[value[1]](value[2:])
+        return value
+    
+    @classmethod
+    def replay(cls, model, records):
+        """Redo a sheet's records (from read()) on the freshly read version of it they were made against"""
+        for record in records[1:]:
+            kind = record[0]
+            if kind == "do":
+                model.push(cls.decode_operations(model, record[2]))
+            elif not (model.undo() if kind == "undo" else model.redo()):
+                raise ValueError(f"nothing to {kind}")
+    
+    def close(self):
+        if self.handle is not None:
+            os.close(self.handle)
+            self.handle = None
+    
+    def discard(self):
+        """Close and delete the journal, once nothing in it is needed"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+class XlsxPatcher:
+    """Write a copy of an .xlsx with SheetModel.changes() snapshots (by sheet name) applied to its rows"""
+    # Only the changed rows of edited sheets are rebuilt; as with openpyxl's delete_rows, formulas, merged
+    # ranges and tables that point at moved rows are not adjusted
+    CHUNK_BYTES = 1 << 20
+    ROW_RE = re.compile(rb'<(?P<prefix>(?:\w+:)?)row\b(?P<attrs>[^>]*?)'
+                        rb'(?:/>|>(?P<body>[^<]*(?:<(?!/(?P=prefix)row>)[^<]*)*)</(?P=prefix)row>)')
+    # A cell as (XML, column letters, style, other attributes): r and s are picked out when they lead
+    # the tag, as openpyxl and Excel write them, and otherwise looked for in the other attributes
+    CELL_RE = re.compile(rb'(<(?:\w+:)?c(?=[\s/>])(?: r="([A-Z]+)\d+")?(?: s="(\d+)")?([^>]*?)(?:/>|>.*?</(?:\w+:)?c>))', re.S)
+    ROW_NUMBER_RE = re.compile(rb'\br="(\d+)"')
+    CELL_REF_RE = re.compile(rb'\br="([A-Z]+)(\d+)"')
+    STYLE_RE = re.compile(rb'\bs="(\d+)"')
+    SPANS_RE = re.compile(rb'\s+spans="[^"]*"')
+    DIMENSION_RE = re.compile(rb'(<(?:\w+:)?dimension\b[^>]*?\bref=")([^"]*)(")')
+    SHEET_DATA_END_RE = re.compile(rb'</(?P<prefix>(?:\w+:)?)sheetData>|<(?P<empty>(?:\w+:)?)sheetData\s*/>')
+    
+    def __init__(self, file_path, changes):
+        self.package = XlsxPackage(file_path)
+        self.changes = {self.package.sheet_parts[name]: change for name, change in changes.items()}
+        # Styles that display each kind of temporal value, and the one written where the cell has
+        # none of its own: dates and datetimes, times of day, and durations ([h]:mm:ss)
+        workbook = self.package.workbook
+        timedelta_styles = OpenpyxlInternals.timedelta_styles(workbook)
+        date_styles = OpenpyxlInternals.date_styles(workbook) - timedelta_styles
+        time_styles = {style for style in date_styles
+                       if is_datetime(OpenpyxlInternals.number_format(workbook, style)) == "time"}
+        self.temporal_styles = {date: date_styles - time_styles, time_of_day: time_styles, timedelta: timedelta_styles}
+        self.default_styles = {kind: min(styles) if styles else None for kind, styles in self.temporal_styles.items()}
+        self.stats = {"updated": 0, "deleted": 0, "inserted": 0}
+    
+    def write(self, target, progress=None):
+        """Write the patched workbook to the binary file object target"""
+        archive = self.package.archive
+        members = archive.infolist()
+        total_bytes = sum(info.file_size for info in members) or 1
+        self.bytes_done = 0
+        
+        def report(size):
+            self.bytes_done += size
+            if progress is not None:
+                progress(min(1.0, self.bytes_done / total_bytes))
+        
+        try:
+            with ZipFile(target, "w") as output:
+                for info in members:
+                    copy = ZipInfo(info.filename, date_time=info.date_time)
+                    copy.compress_type = info.compress_type
+                    copy.external_attr = info.external_attr
+                    with archive.open(info) as source, \
+                            output.open(copy, "w", force_zip64=info.file_size > 1 << 30) as destination:
+                        if info.filename in self.changes:
+                            self.patch_sheet(source, destination, self.changes[info.filename], report)
+                        else:
+                            for chunk in iter(lambda: source.read(self.CHUNK_BYTES), b""):
+                                destination.write(chunk)
+                                report(len(chunk))
+        finally:
+            self.package.close()
+        return self.stats
+    
+    def patch_sheet(self, source, destination, change, report):
+        deleted = change["deleted"]
+        updated = change["updated"]
+        deleted_set = set(deleted)
+        new_last_row = change["last_row"] - len(deleted) + len(change["inserted"])
+        
+        # Rows are matched one at a time; edited rows the XML leaves out (blank rows) are written
+        # as new rows when the stream passes their position
+        state = {"row": 0, "last_row": None, "prefix": b""}
+        missing = iter(sorted(updated))
+        next_missing = [next(missing, None)]
+        
+        def moved(number):
+            return number - bisect.bisect_left(deleted, number)
+        
+        def rows_missing_before(number):
+            xml = b""
+            while next_missing[0] is not None and next_missing[0] < number:
+                if next_missing[0] not in deleted_set and next_missing[0] > state["row"]:
+                    self.stats["updated"] += 1
+                    xml += self.build_row(state["prefix"], b"", {}, moved(next_missing[0]), updated[next_missing[0]])
+                next_missing[0] = next(missing, None)
+            return xml
+        
+        def rewrite_row(match):
+            number_match = self.ROW_NUMBER_RE.search(match["attrs"])
+            number = int(number_match[1]) if number_match else state["row"] + 1
+            state["prefix"] = match["prefix"]
+            xml = rows_missing_before(number)
+            state["row"] = number
+            state["last_row"] = match
+            if number in deleted_set:
+                self.stats["deleted"] += 1
+                return xml
+            new_number = moved(number)
+            if number in updated:
+                self.stats["updated"] += 1
+                return xml + self.build_row(match["prefix"], match["attrs"], self.row_cells(match),
+                                            new_number, updated[number], renumber=new_number != number)
+            if new_number != number:
+                return xml + self.renumber(match.group(0), new_number)
+            return xml + match.group(0)
+        
+        def first_segment(segment):
+            # The <dimension> record precedes the rows, so it is always in the first segment
+            return self.DIMENSION_RE.sub(lambda m: self.dimension(m, new_last_row, change["width"]), segment, count=1)
+        
+        def write_segment(segment, first):
+            destination.write(first_segment(segment) if first else segment)
+        
+        # Each chunk's rows are joined and written at once: the zip stream compresses per write call
+        buffer = b""
+        first = True
+        for chunk in iter(lambda: source.read(self.CHUNK_BYTES), b""):
+            report(len(chunk))
+            buffer += chunk
+            position = 0
+            pieces = []
+            for match in self.ROW_RE.finditer(buffer):
+                segment = buffer[position:match.start()]
+                pieces.append(first_segment(segment) if first else segment)
+                first = False
+                pieces.append(rewrite_row(match))
+                position = match.end()
+            destination.write(b"".join(pieces))
+            buffer = buffer[position:]
+        
+        # New rows go at the end of sheetData, styled like the last existing row
+        template = self.row_cells(state["last_row"]) if state["last_row"] is not None else {}
+        styles = {column: style for column, (_, style) in template.items()}
+        rows = rows_missing_before(change["last_row"] + 1) + b"".join(
+            self.build_row(state["prefix"], b"", {}, new_last_row - len(change["inserted"]) + index,
+                           dict(enumerate(values)), styles)
+            for index, values in enumerate(change["inserted"], 1))
+        self.stats["inserted"] += len(change["inserted"])
+        end = self.SHEET_DATA_END_RE.search(buffer)
+        if end is None or not rows:
+            write_segment(buffer, first)
+            return
+        if end["empty"] is not None:
+            prefix = end["empty"]
+            tail = b"<%ssheetData>%s</%ssheetData>" % (prefix, rows, prefix)
+        else:
+            tail = rows + end.group(0)
+        write_segment(buffer[:end.start()] + tail + buffer[end.end():], first)
+    
+    def dimension(self, match, last_row, width):
+        start, _, end = match[2].partition(b":")
+        end_column = re.match(rb"[A-Z]*", end or start)[0] or b"A"
+        if width:
+            end_column = max(end_column, get_column_letter(width).encode(), key=lambda letters: (len(letters), letters))
+        return match[1] + start + b":" + end_column + str(max(1, last_row)).encode() + match[3]
+    
+    def renumber(self, xml, number):
+        """Row XML moved to a new row number: its r attribute and every cell reference"""
+        digits = str(number).encode()
+        xml = self.ROW_NUMBER_RE.sub(b'r="' + digits + b'"', xml, count=1)
+        return self.CELL_REF_RE.sub(lambda m: b'r="' + m[1] + digits + b'"', xml)
+    
+    def row_cells(self, match):
+        """{column number: (cell XML, style)} for a parsed row match"""
+        cells = {}
+        column = 0
+        for xml, letters, style, attrs in self.CELL_RE.findall(match["body"] or b""):
+            if not letters and b'r="' in attrs:
+                found = self.CELL_REF_RE.search(attrs)
+                letters = found[1] if found else letters
+            if not style and b's="' in attrs:
+                found = self.STYLE_RE.search(attrs)
+                style = found[1] if found else style
+            column = column_index_from_string(letters.decode()) if letters else column + 1
+            cells[column] = (xml, style.decode() if style else None)
+        return cells
+    
+    def build_row(self, prefix, attrs, cells, number, changed, styles=None, renumber=True):
+        """Row XML numbered number: the existing cells (from row_cells) with the changed columns rewritten"""
+        digits = str(number).encode()
+        for column, value in changed.items():
+            if column + 1 in cells:
+                style = cells[column + 1][1]
+            elif value is None:
+                continue
+            else:
+                style = (styles or {}).get(column + 1)
+            cells[column + 1] = (self.cell_xml(prefix, column + 1, number, value, style), style)
+        attrs = self.SPANS_RE.sub(b"", attrs)
+        if self.ROW_NUMBER_RE.search(attrs):
+            attrs = self.ROW_NUMBER_RE.sub(b'r="' + digits + b'"', attrs, count=1)
+        else:
+            attrs = b' r="' + digits + b'"' + attrs
+        if renumber:
+            body = b"".join(self.CELL_REF_RE.sub(lambda m: b'r="' + m[1] + digits + b'"', cells[column][0])
+                            for column in sorted(cells))
+        else:
+            body = b"".join(cells[column][0] for column in sorted(cells))
+        return b"<%srow%s>%s</%srow>" % (prefix, attrs, body, prefix)
+    
+    def cell_xml(self, prefix, column, row, value, style):
+        """XML for one cell, in the forms openpyxl writes: numbers, booleans, date and time serials, formulas, inline strings"""
+        kind = date if isinstance(value, date) else type(value) if isinstance(value, (time_of_day, timedelta)) else None
+        if kind is not None and (style is None or int(style) not in self.temporal_styles[kind]):
+            style = self.default_styles[kind]
+        if kind is not None and style is None:
+            value = format_value(value)  # no style for it anywhere in the workbook: keep it readable as text
+            kind = None
+        
+        prefix = prefix.decode()
+        attrs = f' r="{get_column_letter(column)}{row}"' + (f' s="{style}"' if style is not None else "")
+        if value is None:
+            return f"<{prefix}c{attrs}/>".encode()
+        if isinstance(value, bool):
+            return f'<{prefix}c{attrs} t="b"><{prefix}v>{int(value)}</{prefix}v></{prefix}c>'.encode()
+        if isinstance(value, (int, float)):
+            return f"<{prefix}c{attrs}><{prefix}v>{value!r}</{prefix}v></{prefix}c>".encode()
+        if kind is not None:
+            return f"<{prefix}c{attrs}><{prefix}v>{to_excel(value)!r}</{prefix}v></{prefix}c>".encode()
+        
+        text = escape(ILLEGAL_CHARACTERS_RE.sub("", str(value)))
+        if text.startswith("="):
+            return f"<{prefix}c{attrs}><{prefix}f>{text[1:]}</{prefix}f></{prefix}c>".encode()
+        return (f'<{prefix}c{attrs} t="inlineStr"><{prefix}is><{prefix}t xml:space="preserve">{text}'
+                f'</{prefix}t></{prefix}is></{prefix}c>').encode()
+
+def save_workbook(file_path, changes, progress=None, expected=None, trace=NO_TRACE):
+    """Apply SheetModel.changes() snapshots (by sheet name) to a workbook in place; returns XlsxPatcher's stats"""
+    stat = os.stat(file_path)
+    directory, name = os.path.split(os.path.abspath(file_path))
+    # The changes' row numbers only hold for the version of the file they were made against
+    if expected is not None and not expected.matches(stat):
+        raise ValueError(f"{name} was changed on disk since it was loaded")
+    store = SheetStore.attach(file_path, stat)
+    handle, temp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(handle, "wb") as target:
+            with trace.span("patch_xlsx") as span:
+                stats = XlsxPatcher(file_path, changes).write(target, progress=progress)
+                span.set(rows=stats["updated"] + stats["inserted"] + stats["deleted"], bytes=target.tell())
+            with trace.span("fsync"):
+                target.flush()
+                os.fsync(target.fileno())
+        with trace.span("replace"):
+            shutil.copymode(file_path, temp_path)
+            os.replace(temp_path, file_path)
+    except BaseException:
+        if store is not None:
+            store.close()
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    if store is not None:
+        # The workbook is saved either way: a store that can't take the changes is just stale, and rebuilt on next open
+        try:
+            with trace.span("update_store"):
+                store.apply_changes(changes, WorkbookParts.read(file_path))
+        except Exception:
+            pass
+        finally:
+            store.close()
+    return stats
+
+class WorkbookSaver(threading.Thread):
+    """Save changed sheets with save_workbook on a worker thread"""
+    def __init__(self, file_path, changes, expected=None, trace=NO_TRACE):
+        # Not a daemon: closing the window mid-save lets the save finish instead of killing it
+        super().__init__(name="WorkbookSaver")
+        self.file_path = file_path
+        self.changes = changes
+        self.expected = expected
+        self.trace = trace
+        # ('progress', fraction), ('done', stats, parts) or ('error', message); parts is the saved file's
+        # WorkbookParts, None if they couldn't be read
+        self.messages = queue.Queue()
+    
+    def run(self):
+        try:
+            with self.trace.span("save_workbook", sheets=list(self.changes)) as span:
+                stats = save_workbook(self.file_path, self.changes, expected=self.expected, trace=self.trace,
+                                      progress=lambda fraction: self.messages.put(("progress", fraction)))
+                try:
+                    parts = WorkbookParts.read(self.file_path)
+                    span.set(bytes=parts.size)
+                except Exception:
+                    parts = None
+            self.messages.put(("done", stats, parts))
+        except Exception as e:
+            self.messages.put(("error", str(e)))
+
+class WorkbookLoader(threading.Thread):
+    """Parse requested sheets on a worker thread, from the SheetStore or streamed with XlsxPackage"""
+    FIRST_BATCH_ROWS = 500
+    BATCH_ROWS = 5000
+    
+    def __init__(self, file_path, use_store=True, known=None, trace=NO_TRACE):
+        super().__init__(daemon=True, name="WorkbookLoader")
+        self.file_path = file_path
+        self.use_store = use_store
+        self.known = known
+        self.trace = trace
+        # Overdue tasks in the sheets' summaries are those due before today
+        self.as_of = datetime.combine(date.today(), datetime.min.time())
+        self.package = None
+        # Drained by the UI: ('sheets', names, parts, changed), ('rows', sheet_name, headers, rows, fraction),
+        # ('sheet_done', sheet_name, summary), ('cancelled', sheet_name) or ('error', message)
+        self.messages = queue.Queue()
+        self.cancelled = threading.Event()
+        self.pending = deque()
+        self.parsing = None
+        self.closed = False
+        self.condition = threading.Condition()
+    
+    def request(self, sheet_name):
+        """Queue sheet_name for parsing, unless it is already being parsed or queued"""
+        with self.condition:
+            if sheet_name != self.parsing and sheet_name not in self.pending:
+                self.pending.append(sheet_name)
+                self.condition.notify()
+    
+    def cancel(self):
+        """Abandon the sheet being parsed and any queued ones"""
+        with self.condition:
+            self.pending.clear()
+            self.cancelled.set()
+    
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.pending.clear()
+            self.cancelled.set()
+            self.condition.notify()
+    
+    def open_package(self):
+        if self.package is None:
+            self.package = XlsxPackage(self.file_path)
+        return self.package
+    
+    def shared_strings(self):
+        return self.open_package().shared_strings
+    
+    def run(self):
+        store = None
+        try:
+            with self.trace.span("open_workbook") as span:
+                # The zip directory alone names the sheets and fingerprints them; the package (and its
+                # shared strings) is only read when a sheet has to be parsed or the strings compared
+                parts = WorkbookParts.read(self.file_path)
+                span.set(bytes=parts.size, sheets=len(parts.sheets))
+                store = SheetStore.open(self.file_path, parts, self.shared_strings) if self.use_store else None
+                changed = parts.changed_sheets(self.known, self.shared_strings) if self.known is not None else set()
+                if parts.strings is not None and parts.strings_digest is None:
+                    parts.strings_digest = WorkbookParts.digest_strings(self.shared_strings())
+                    if store is not None:
+                        store.set_parts(parts)
+        except Exception as e:
+            self.messages.put(("error", str(e)))
+            if store is not None:
+                store.close()
+            if self.package is not None:
+                self.package.close()
+            return
+        
+        try:
+            self.messages.put(("sheets", list(parts.sheets), parts, changed))
+            while True:
+                with self.condition:
+                    while not self.pending and not self.closed:
+                        self.condition.wait()
+                    if self.closed:
+                        return
+                    sheet_name = self.parsing = self.pending.popleft()
+                    self.cancelled.clear()
+                if sheet_name not in parts.sheets:
+                    self.messages.put(("cancelled", sheet_name))  # removed from the workbook
+                elif store is not None and store.sheet_info(sheet_name) is not None:
+                    with self.trace.span("read_sheet", sheet=sheet_name, source="store") as span:
+                        span.set(rows=self.read_sheet(store, sheet_name))
+                else:
+                    with self.trace.span("read_sheet", sheet=sheet_name, source="xlsx") as span:
+                        package = self.open_package()
+                        span.set(rows=self.parse_sheet(package, sheet_name, store),
+                                 bytes=package.part_size(sheet_name) or 0)
+                with self.condition:
+                    self.parsing = None
+        except Exception as e:
+            self.messages.put(("error", str(e)))
+        finally:
+            if self.package is not None:
+                self.package.close()
+            if store is not None:
+                store.close()
+    
+    def read_sheet(self, store, sheet_name):
+        """Post a sheet's rows from the store, one row id range per batch; returns the number of rows posted"""
+        _, headers, _, total = store.sheet_info(sheet_name)
+        summary = SheetSummary(sheet_name, headers, self.as_of)
+        done = 0
+        for batch in itertools.chain(store.iter_pages(sheet_name, self.FIRST_BATCH_ROWS), [None]):
+            if self.cancelled.is_set():
+                self.messages.put(("cancelled", sheet_name))
+                return done
+            if batch is None:
+                if done:
+                    break
+                batch = []  # an empty sheet still sends its headers
+            done += len(batch)
+            summary.add_rows(batch)
+            self.messages.put(("rows", sheet_name, headers, batch, done / total if total else 1.0))
+        self.messages.put(("sheet_done", sheet_name, summary))
+        return done
+    
+    def parse_sheet(self, package, sheet_name, store=None):
+        """Post a sheet's rows as they are parsed from the xlsx; returns the number of rows posted"""
+        # Progress is measured in bytes of the sheet's XML, known up front from the zip directory
+        total_bytes = package.part_size(sheet_name) or 1
+        rows = package.iter_rows(sheet_name)
+        headers = next(rows, [])
+        width = len(headers)
+        # Each batch is imported into the store as it is posted; the sheet only counts as stored once complete
+        table = store.begin_sheet(sheet_name, headers) if store is not None else None
+        summary = SheetSummary(sheet_name, headers, self.as_of)
+        tagged = set()
+        stored = posted = 0
+        batch = []
+        limit = self.FIRST_BATCH_ROWS
+        for row in itertools.chain(rows, [None]):
+            if row is not None:
+                # Pad short rows to the header width so every row has a value per column
+                batch.append(row + [None] * (width - len(row)) if len(row) < width else row)
+                if len(batch) < limit:
+                    continue
+            if self.cancelled.is_set():
+                rows.close()
+                self.messages.put(("cancelled", sheet_name))
+                return posted
+            if table is not None:
+                store.add_rows(table, width, stored, batch, tagged)
+                stored += len(batch)
+            fraction = min(1.0, package.position() / total_bytes)
+            summary.add_rows(batch)
+            self.messages.put(("rows", sheet_name, headers, batch, fraction))
+            posted += len(batch)
+            batch = []
+            limit = self.BATCH_ROWS
+        if table is not None:
+            store.finish_sheet(sheet_name, stored, tagged)
+        self.messages.put(("sheet_done", sheet_name, summary))
+        return posted
+
+class BatchPatcher:
+    """Apply a patch file of upserts and deletes to a workbook in one pass, without the GUI"""
+    OPERATIONS = ("upsert", "delete")
+    
+    def __init__(self, file_path):
+        self.file_path = file_path
+        # What conflicts' positions count: lines, or records of a .json array
+        self.position = "line"
+        self.parts = WorkbookParts.read(file_path)
+        self.package = XlsxPackage(file_path)
+        # Sheets already in an up-to-date SheetStore are read from it rather than parsed
+        self.store = SheetStore.attach(file_path, os.stat(file_path))
+        self.sheets = {}
+        self.counts = {}
+        self.conflicts = []
+        # Deleted row ids per sheet, removed together at the end: each delete_rows rebuilds the row order
+        self.doomed = {}
+        self.lookup = self.read_lookup() if "Lookup_Values" in self.package.sheet_parts else {}
+        self.allowed = {}
+    
+    def read_lookup(self):
+        """Allowed values per Lookup_Values category"""
+        lookup = {}
+        rows = self.package.iter_rows("Lookup_Values")
+        headers = next(rows, [])
+        if "Category" not in headers or "Value" not in headers:
+            return lookup
+        category_column, value_column = headers.index("Category"), headers.index("Value")
+        for row in rows:
+            if len(row) > max(category_column, value_column) and row[category_column] is not None:
+                lookup.setdefault(row[category_column], set()).add(row[value_column])
+        return lookup
+    
+    def sheet(self, sheet_name):
+        """The sheet's model, parsed the first time the patch touches it"""
+        model = self.sheets.get(sheet_name)
+        if model is None:
+            if self.store is not None and self.store.sheet_info(sheet_name) is not None:
+                model = self.sheets[sheet_name] = SheetModel(self.store.sheet_info(sheet_name)[1])
+                for rows in self.store.iter_pages(sheet_name):
+                    model.extend(rows)
+            else:
+                rows = self.package.iter_rows(sheet_name)
+                headers = next(rows, [])
+                width = len(headers)
+                model = self.sheets[sheet_name] = SheetModel(headers)
+                model.extend([row + [None] * (width - len(row)) if len(row) < width else row for row in rows])
+            model.finish()
+            self.counts[sheet_name] = {"updated": 0, "inserted": 0, "deleted": 0, "unchanged": 0}
+            self.doomed[sheet_name] = set()
+        return model
+    
+    @staticmethod
+    def read_records(patch_path):
+        """Yield (line, record) for each operation in a .jsonl, .json or .csv patch file"""
+        # JSON Lines records are left for apply() to decode, so a malformed line is one conflict;
+        # a .json array's records are numbered in place of lines
+        extension = os.path.splitext(patch_path)[1].lower()
+        with open(patch_path, newline="", encoding="utf-8") as f:
+            if extension == ".csv":
+                reader = csv.DictReader(f)
+                for record in reader:
+                    # A blank CSV cell means "leave as is": there is no way to tell it from an empty value
+                    yield reader.line_num, {name: value for name, value in record.items() if name and value != ""}
+            elif extension in (".jsonl", ".ndjson"):
+                for number, line in enumerate(f, start=1):
+                    if line.strip():
+                        yield number, line
+            elif extension == ".json":
+                records = json.load(f)
+                if not isinstance(records, list):
+                    raise ValueError("a .json patch must hold an array of records")
+                yield from enumerate(records, start=1)
+            else:
+                raise ValueError(f"Unsupported patch format {extension!r}: use .jsonl, .json or .csv")
+    
+    def apply_file(self, patch_path):
+        self.position = "record" if os.path.splitext(patch_path)[1].lower() == ".json" else "line"
+        for line, record in self.read_records(patch_path):
+            self.apply(line, record)
+        self.finish()
+    
+    def apply(self, line, record):
+        """Apply one record (a dict, or a JSON Lines text), or log why it can't be applied as a conflict"""
+        sheet_name = key = None
+        try:
+            if isinstance(record, str):
+                try:
+                    record = json.loads(record)
+                except ValueError as e:
+                    raise ValueError(f"not valid JSON: {e}") from None
+            if not isinstance(record, dict):
+                raise ValueError(f"expected an object of column values, not {type(record).__name__}")
+            record = dict(record)
+            op = str(record.pop("op", "")).lower()
+            sheet_name = record.pop("sheet", None)
+            if op not in self.OPERATIONS:
+                raise ValueError(f"unknown op {op!r} (expected upsert or delete)")
+            if not isinstance(sheet_name, str) or sheet_name not in self.package.sheet_parts:
+                raise ValueError(f"no sheet named {sheet_name!r}")
+            model = self.sheet(sheet_name)
+            if model.key_column is None:
+                raise ValueError(f"{sheet_name} has no ID column to match rows on")
+            key_header = model.headers[model.key_column]
+            if record.get(key_header) is None:
+                raise ValueError(f"missing {key_header}")
+            key = model.coerce(model.key_column, self.text(record[key_header]))
+            
+            row_id = model.key_index.get(key)
+            if op == "delete":
+                if row_id is None:
+                    raise ValueError(f"no {key_header} {key!r} to delete")
+                # Free the ID at once, so a later upsert of it in the same patch adds a new row
+                model.unindex_key(row_id)
+                self.doomed[sheet_name].add(row_id)
+                self.counts[sheet_name]["deleted"] += 1
+                return
+            
+            values = model.row(row_id) if row_id is not None else [None] * len(model.headers)
+            for header, value in record.items():
+                if header not in model.headers:
+                    raise ValueError(f"{sheet_name} has no column {header!r}")
+                column = model.headers.index(header)
+                values[column] = model.coerce(column, self.text(value))
+                if isinstance(values[column], str) and values[column].startswith("="):
+                    # The save would write it as a live formula; a patch only sets values
+                    raise ValueError(f"{header} {values[column]!r} would be saved as a formula")
+                self.validate(sheet_name, model, column, values[column])
+            
+            if row_id is None:
+                model.insert_row(values)
+                self.counts[sheet_name]["inserted"] += 1
+            elif all(same_value(old, new) for old, new in zip(model.row(row_id), values)):
+                self.counts[sheet_name]["unchanged"] += 1
+            else:
+                model.update_row(row_id, values)
+                self.counts[sheet_name]["updated"] += 1
+        except ValueError as e:
+            self.conflicts.append({"line": line, "sheet": sheet_name, "key": key, "message": str(e)})
+    
+    @staticmethod
+    def text(value):
+        """A patch value as the text SheetModel.coerce expects (None stays None: clear the cell)"""
+        if value is None or isinstance(value, str):
+            return value if value is not None else ""
+        if isinstance(value, (list, dict)):
+            raise ValueError(f"{json.dumps(value)} is not a single value")
+        return str(value).lower() if isinstance(value, bool) else str(value)
+    
+    def validate(self, sheet_name, model, column, value):
+        header = model.headers[column]
+        category = LOOKUP_COLUMNS.get((sheet_name, header))
+        if value is None or category not in self.lookup:
+            return
+        allowed = self.allowed.get((sheet_name, column))
+        if allowed is None:
+            # Values the sheet already uses stay valid (e.g. the "All" department of company-wide tasks)
+            allowed = self.allowed[(sheet_name, column)] = self.lookup[category] | set(model.columns[column])
+        if value not in allowed:
+            raise ValueError(f"{header} {value!r} is not one of the {category} values in Lookup_Values")
+    
+    def finish(self):
+        for sheet_name, model in self.sheets.items():
+            if self.doomed[sheet_name]:
+                model.delete_rows(self.doomed[sheet_name])
+                self.doomed[sheet_name] = set()
+    
+    def save(self):
+        """Write the applied changes into the workbook; returns XlsxPatcher's stats"""
+        self.package.close()
+        changes = {name: model.changes() for name, model in self.sheets.items() if model.dirty}
+        if not changes:
+            return {"updated": 0, "deleted": 0, "inserted": 0}
+        return save_workbook(self.file_path, changes, expected=self.parts)
+    
+    def close(self):
+        self.package.close()
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+def run_patch(file_path, patch_path, dry_run=False, strict=False, max_conflicts=20):
+    """Command-line batch patch: apply, save, print counts and conflicts; returns the exit status"""
+    start = time.perf_counter()
+    patcher = BatchPatcher(file_path)
+    try:
+        patcher.apply_file(patch_path)
+    except (OSError, ValueError) as e:
+        print(f"❌ Couldn't read {os.path.basename(patch_path)}: {e}; nothing was saved")
+        return 1
+    finally:
+        patcher.close()
+    # By default the records that apply are saved and the conflicts skipped; strict saves all or nothing
+    held_back = strict and bool(patcher.conflicts)
+    if not dry_run and not held_back:
+        patcher.save()
+    
+    verb = "Checked" if dry_run or held_back else "Applied"
+    print(f"✅ {verb} {os.path.basename(patch_path)} against {os.path.basename(file_path)} "
+          f"in {time.perf_counter() - start:.1f} s")
+    for sheet_name, counts in patcher.counts.items():
+        print(f"   • {sheet_name}: {counts['updated']:,} updated, {counts['inserted']:,} added, "
+              f"{counts['deleted']:,} deleted, {counts['unchanged']:,} unchanged")
+    if patcher.conflicts:
+        print(f"⚠️  {len(patcher.conflicts):,} conflict(s) skipped:")
+        for conflict in patcher.conflicts[:max_conflicts]:
+            where = " ".join(str(part) for part in (conflict["sheet"], conflict["key"]) if part is not None)
+            print(f"   • {patcher.position} {conflict['line']}: {where + ': ' if where else ''}{conflict['message']}")
+        if len(patcher.conflicts) > max_conflicts:
+            print(f"   ... and {len(patcher.conflicts) - max_conflicts:,} more")
+        if held_back and not dry_run:
+            print("❌ Nothing was saved (--strict)")
+        return 1
+    return 0
+
+class EmployeeManagementUpdater:
+    # How often the UI drains the loader's queue, and how long one drain may hold the event loop
+    POLL_MS = 50
+    POLL_BUDGET_SECONDS = 0.03
+    # Pause in typing after which the filter is applied
+    FILTER_DELAY_MS = 150
+    # How often the workbook's size and mtime are checked for changes made by someone else
+    WATCH_MS = 2000
+    # Conflicts listed in the merge prompt
+    MAX_CONFLICTS_SHOWN = 10
+    
+    def __init__(self, root, cache_mb=512, use_store=True, use_journal=True, compact_idle=300, trace=None,
+                 trace_path=None):
+        self.root = root
+        self.root.title("Employee Management System Updater")
+        self.root.geometry("1000x700")
+        
+        self.file_path = ""
+        self.sheets = {}
+        self.current_sheet = ""
+        self.sheet = None
+        self.loader = None
+        self.saver = None
+        # Read sheets of unchanged workbooks back from their SheetStore instead of the xlsx
+        self.use_store = use_store
+        
+        # Parsed sheets stay cached while within the memory budget; sheets still being parsed wait
+        # in self.partial until their last row arrives
+        self.cache = SheetCache(cache_mb * 1024 * 1024)
+        self.partial = {}
+        
+        # Filters and sort order per sheet name, kept while switching sheets
+        self.queries = {}
+        self.filter_job = None
+        # Headers the view's columns were last set up with, and a pending "all records for this
+        # employee" drill-down: {"employee_id", "waiting": sheet names still loading, "results"}
+        self.view_headers = []
+        self.drilldown = None
+        
+        # WorkbookParts of the file version the cached sheets were read from (None while a loader is
+        # starting), and dirty sheets changed on disk, waiting for the new version to merge into
+        self.parts = None
+        self.rebase = {}
+        
+        # Edits are journaled next to the workbook as they are made (see EditJournal) and saved into
+        # it after compact_idle seconds without edits (0: only on exit). Edits recovered from the
+        # journal of a session that crashed wait in self.recovery until their sheet has been read.
+        self.use_journal = use_journal
+        self.compact_idle = compact_idle
+        self.journal = None
+        self.recovery = {}
+        self.compacted_at = time.monotonic()
+        self.closing = False
+        
+        # Opening, reading, showing and saving sheets are timed with a TraceRecorder (None: not at all);
+        # the latest timings show in the status bar, and the trace is written to trace_path on exit
+        self.trace = trace or NO_TRACE
+        self.trace_path = trace_path
+        
+        self.create_widgets()
+        self.root.after(self.WATCH_MS, self.watch_file)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+    def create_widgets(self):
+        # File selection frame
+        file_frame = ttk.LabelFrame(self.root, text="Excel File", padding=10)
+        file_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.file_entry = ttk.Entry(file_frame, width=50)
+        self.file_entry.pack(side=tk.LEFT, padx=5, expand=True, fill=tk.X)
+        
+        browse_btn = ttk.Button(file_frame, text="Browse", command=self.browse_file)
+        browse_btn.pack(side=tk.LEFT, padx=5)
+        
+        load_btn = ttk.Button(file_frame, text="Load", command=self.load_workbook)
+        load_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.progress_var = tk.DoubleVar()
+        self.progress_bar = ttk.Progressbar(file_frame, length=150, maximum=100, variable=self.progress_var)
+        self.progress_bar.pack(side=tk.LEFT, padx=5)
+        
+        self.cancel_btn = ttk.Button(file_frame, text="Cancel", command=self.cancel_loading, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.LEFT, padx=5)
+        
+        # Sheet selection
+        sheet_frame = ttk.LabelFrame(self.root, text="Select Sheet", padding=10)
+        sheet_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.sheet_combobox = ttk.Combobox(sheet_frame, state="readonly")
+        self.sheet_combobox.pack(fill=tk.X, padx=5, pady=5)
+        self.sheet_combobox.bind("<<ComboboxSelected>>", self.load_sheet_data)
+        
+        # Filter bar: one filter per column, applied as you type; headings sort (Shift+click adds a key)
+        filter_frame = ttk.LabelFrame(self.root, text="Filter", padding=10)
+        filter_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.filter_column = ttk.Combobox(filter_frame, state="readonly", width=24)
+        self.filter_column.pack(side=tk.LEFT, padx=5)
+        self.filter_column.bind("<<ComboboxSelected>>", self.show_column_filter)
+        
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add("write", self.on_filter_typed)
+        filter_entry = ttk.Entry(filter_frame, textvariable=self.filter_var, width=30)
+        filter_entry.pack(side=tk.LEFT, padx=5)
+        
+        clear_btn = ttk.Button(filter_frame, text="Clear Filters", command=self.clear_filters)
+        clear_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.filter_summary = tk.StringVar()
+        ttk.Label(filter_frame, textvariable=self.filter_summary).pack(side=tk.LEFT, padx=5)
+        
+        # Joined view: employee and process names next to their IDs, and every record of one employee
+        self.records_btn = ttk.Button(filter_frame, text="Employee Records", command=self.show_employee_records)
+        self.records_btn.pack(side=tk.RIGHT, padx=5)
+        
+        self.join_var = tk.BooleanVar()
+        join_check = ttk.Checkbutton(filter_frame, text="Show names", variable=self.join_var, command=self.toggle_join)
+        join_check.pack(side=tk.RIGHT, padx=5)
+        
+        # Live aggregates of the current sheet (SheetSummary), updated with every edit
+        summary_frame = ttk.LabelFrame(self.root, text="Summary", padding=10)
+        summary_frame.pack(fill=tk.X, padx=10, pady=5)
+        self.summary_var = tk.StringVar()
+        ttk.Label(summary_frame, textvariable=self.summary_var, wraplength=940, justify=tk.LEFT).pack(fill=tk.X, padx=5)
+        
+        # Data display frame
+        data_frame = ttk.LabelFrame(self.root, text="Sheet Data", padding=10)
+        data_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        # Virtualized view over the current SheetModel: only the visible rows exist as Treeview items
+        self.view = VirtualTreeview(data_frame, on_heading=self.sort_by)
+        self.tree = self.view.tree
+        
+        # Edit frame
+        edit_frame = ttk.LabelFrame(self.root, text="Edit Data", padding=10)
+        edit_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.edit_btn = ttk.Button(edit_frame, text="Edit Selected", command=self.edit_selected)
+        self.edit_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.add_btn = ttk.Button(edit_frame, text="Add New", command=self.add_new)
+        self.add_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.delete_btn = ttk.Button(edit_frame, text="Delete Selected", command=self.delete_selected)
+        self.delete_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.bulk_btn = ttk.Button(edit_frame, text="Bulk Edit", command=self.bulk_edit)
+        self.bulk_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.undo_btn = ttk.Button(edit_frame, text="Undo", command=self.undo)
+        self.undo_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.redo_btn = ttk.Button(edit_frame, text="Redo", command=self.redo)
+        self.redo_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.save_btn = ttk.Button(edit_frame, text="Save Changes", command=self.save_changes)
+        self.save_btn.pack(side=tk.RIGHT, padx=5)
+        
+        self.root.bind("<Control-z>", lambda event: self.undo())
+        self.root.bind("<Control-y>", lambda event: self.redo())
+        
+        # Status bar, with the latest phase timings and their export on the right
+        status_frame = ttk.Frame(self.root)
+        status_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.status_var = tk.StringVar()
+        self.status_var.set("Ready")
+        status_bar = ttk.Label(status_frame, textvariable=self.status_var, relief=tk.SUNKEN)
+        status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        trace_btn = ttk.Button(status_frame, text="Export Trace", command=self.export_trace,
+                               state=tk.NORMAL if self.trace.enabled else tk.DISABLED)
+        trace_btn.pack(side=tk.RIGHT, padx=(5, 0))
+        
+        self.timing_var = tk.StringVar()
+        timing_label = ttk.Label(status_frame, textvariable=self.timing_var, relief=tk.SUNKEN)
+        timing_label.pack(side=tk.RIGHT, padx=(5, 0))
+        
+        # Disable buttons until file is loaded
+        self.sheet_combobox.config(state=tk.DISABLED)
+        self.toggle_buttons(False)
+    
+    def toggle_buttons(self, enabled):
+        # Edits stay off while a save is writing the model's changes
+        state = tk.NORMAL if enabled and self.saver is None else tk.DISABLED
+        self.edit_btn.config(state=state)
+        self.add_btn.config(state=state)
+        self.delete_btn.config(state=state)
+        self.bulk_btn.config(state=state)
+        self.undo_btn.config(state=state)
+        self.redo_btn.config(state=state)
+        self.save_btn.config(state=state)
+    
+    def browse_file(self):
+        file_path = filedialog.askopenfilename(
+            title="Select Excel File",
+            filetypes=[("Excel Files", "*.xlsx"), ("All Files", "*.*")]
+        )
+        if file_path:
+            self.file_entry.delete(0, tk.END)
+            self.file_entry.insert(0, file_path)
+    
+    def load_workbook(self):
+        file_path = self.file_entry.get()
+        if not file_path:
+            messagebox.showerror("Error", "Please select an Excel file first.")
+            return
+        
+        dirty = self.unsaved_sheets()
+        if dirty and not messagebox.askyesno(
+                "Unsaved Changes", f"Discard unsaved changes to {', '.join(dirty)}?"):
+            return
+        
+        # Sheets are parsed on a worker thread as they are selected; poll_loader shows rows as they arrive
+        if self.loader is not None:
+            self.loader.close()
+        if self.journal is not None:
+            self.journal.discard()  # whatever it held was saved or just discarded
+        self.journal, self.recovery, known = None, {}, None
+        if self.use_journal:
+            self.journal = EditJournal(file_path)
+            left = self.journal.read()
+            if left is not None and left[1]:
+                steps = sum(EditJournal.count_steps(records) for records in left[1].values())
+                if messagebox.askyesno(
+                        "Recover Edits", f"{os.path.basename(file_path)} has {steps:,} unsaved edit(s) to "
+                        f"{', '.join(left[1])} from a session that ended without saving them. Restore them?"):
+                    # The loader reports which sheets changed on disk since, for recover_sheets
+                    known, self.recovery = left
+        self.file_path = file_path
+        self.cache = SheetCache(self.cache.budget_bytes)
+        self.partial = {}
+        self.queries = {}
+        self.drilldown = None
+        self.parts = None
+        self.rebase = {}
+        self.current_sheet = ""
+        self.sheet = None
+        self.view.set_rows([], [])
+        self.sheet_combobox.config(state=tk.DISABLED)
+        self.toggle_buttons(False)
+        self.progress_var.set(0)
+        self.status_var.set(f"Opening: {os.path.basename(file_path)}...")
+        
+        self.loader = WorkbookLoader(file_path, self.use_store, known, trace=self.trace)
+        self.loader.start()
+        self.root.after(self.POLL_MS, self.poll_loader, self.loader)
+    
+    def cancel_loading(self):
+        if self.loader is not None:
+            self.loader.cancel()
+    
+    def poll_loader(self, loader):
+        """Move what the loader has parsed so far into the sheets, a time-boxed slice per call"""
+        if loader is not self.loader or not loader.is_alive() and loader.messages.empty():
+            return  # superseded by a newer load, or finished
+        
+        deadline = time.perf_counter() + self.POLL_BUDGET_SECONDS
+        current_changed = False
+        while time.perf_counter() < deadline:
+            try:
+                message = loader.messages.get_nowait()
+            except queue.Empty:
+                break
+            
+            kind = message[0]
+            if kind == "sheets":
+                _, names, self.parts, changed = message
+                self.sheet_combobox["values"] = names
+                self.sheet_combobox.config(state="readonly")
+                if self.journal is not None and self.journal.parts is None:
+                    self.recover_sheets(changed, names)
+                elif changed:
+                    self.reload_sheets(changed, names)
+                if not self.rebase:
+                    self.compact_journal()
+                self.show_timing("open_workbook")
+                if message[1] and not self.current_sheet:
+                    self.status_var.set(f"Loaded: {os.path.basename(loader.file_path)}")
+                    self.sheet_combobox.current(0)
+                    self.load_sheet_data()
+            elif kind == "rows":
+                _, sheet_name, headers, rows, fraction = message
+                sheet = self.partial.get(sheet_name)
+                if sheet is None:
+                    sheet = self.partial[sheet_name] = SheetModel(headers)
+                    if sheet_name == self.current_sheet:
+                        self.load_sheet_data()
+                sheet.extend(rows)
+                current_changed = current_changed or sheet_name == self.current_sheet
+                self.progress_var.set(fraction * 100)
+            elif kind == "sheet_done":
+                _, sheet_name, summary = message
+                sheet = self.partial.pop(sheet_name)
+                sheet.finish()
+                sheet.summary = summary
+                records = self.recovery.pop(sheet_name, None)
+                if records is not None and not self.recover_edits(sheet_name, sheet, records):
+                    # Read it again, unedited; the journal no longer offers the edits
+                    self.compact_journal()
+                    self.loader.request(sheet_name)
+                    continue
+                if self.journal is not None:
+                    self.journal.attach(sheet_name, sheet, fresh=records is None)
+                merged = sheet_name in self.rebase
+                if merged:
+                    self.merge_edits(sheet_name, self.rebase.pop(sheet_name), sheet)
+                self.cache.put(sheet_name, sheet, keep=self.pinned_sheets())
+                if merged and not self.rebase:
+                    self.compact_journal()  # every sheet is now against the version on disk
+                if sheet_name == self.current_sheet:
+                    self.load_sheet_data()
+                elif sheet_name in self.join_parents() and self.sheet is not None and self.sheet.complete:
+                    self.show_rows(keep_view=True)  # the joined columns it feeds can be filled in now
+                if self.drilldown is not None and sheet_name in self.drilldown["waiting"]:
+                    self.collect_records(sheet_name, sheet)
+                    self.finish_records()
+            elif kind == "cancelled":
+                # A partly parsed sheet is not cached; it can be browsed now and is parsed again when reselected
+                self.partial.pop(message[1], None)
+                self.progress_var.set(0)
+                if self.drilldown is not None and message[1] in self.drilldown["waiting"]:
+                    self.drilldown = None
+                    self.status_var.set("Employee records cancelled")
+                if message[1] == self.current_sheet:
+                    self.status_var.set(f"Loading {message[1]} cancelled - partial data shown read-only")
+            elif kind == "error":
+                messagebox.showerror("Error", f"Failed to load workbook:\n{message[1]}")
+                self.status_var.set("Error loading file")
+        
+        if current_changed:
+            self.view.refresh()
+            self.status_var.set(f"Loading: {self.current_sheet} ({len(self.sheet.order):,} rows so far)...")
+        self.cancel_btn.config(state=tk.NORMAL if self.partial else tk.DISABLED)
+        self.root.after(self.POLL_MS, self.poll_loader, loader)
+    
+    def load_sheet_data(self, event=None):
+        sheet_name = self.sheet_combobox.get()
+        if not sheet_name:
+            return
+        
+        self.current_sheet = sheet_name
+        sheet = self.cache.get(sheet_name) or self.partial.get(sheet_name)
+        if sheet is None:
+            # Not parsed yet (or evicted): have the loader parse it; poll_loader shows it when rows arrive
+            self.sheet = None
+            self.set_view([], [])
+            self.set_filter_columns([])
+            self.show_summary()
+            self.toggle_buttons(False)
+            self.loader.request(sheet_name)
+            self.status_var.set(f"Loading: {sheet_name}...")
+            return
+        
+        # The model holds the sheet's data; the view only draws the visible window of it
+        with self.trace.span("load_sheet_data", sheet=sheet_name, rows=len(sheet.order)):
+            self.sheet = sheet
+            self.set_view(sheet.headers, ModelRows(sheet))
+            self.set_filter_columns(sheet.headers)
+            self.show_summary()
+            
+            # Only a completely parsed sheet can be edited (or filtered), so a save never drops its missing rows
+            self.toggle_buttons(sheet.complete)
+            self.status_var.set(f"Displaying: {sheet_name}" if sheet.complete else f"Loading: {sheet_name}...")
+            if sheet.complete:
+                self.show_rows()
+        if sheet.complete:
+            self.show_timing("read_sheet", "load_sheet_data")
+    
+    def query(self):
+        return self.queries.setdefault(self.current_sheet, SheetQuery())
+    
+    def set_view(self, headers, rows):
+        """Show rows in the view, setting its columns up again only if the headers changed"""
+        if headers != self.view_headers:
+            self.view_headers = list(headers)
+            self.view.set_rows(headers, rows)
+        else:
+            self.view.replace_rows(rows)
+    
+    def joins(self):
+        """The current sheet's SheetJoins when the joined view is on and the sheet has foreign keys, else None"""
+        if not self.join_var.get() or self.sheet is None:
+            return None
+        joins = SheetJoins(self.sheet)
+        return joins if joins.parents else None
+    
+    def join_parents(self):
+        joins = self.joins()
+        return joins.parents if joins is not None else set()
+    
+    def pinned_sheets(self):
+        """Sheets the cache must not evict: the one on screen and those its joined columns look up"""
+        return {self.current_sheet} | self.join_parents()
+    
+    def parent_models(self, joins):
+        """The parsed parent sheets of joins by name (None for those still loading, which are requested)"""
+        parents = {}
+        for sheet_name in joins.parents & set(self.sheet_combobox["values"]):
+            parents[sheet_name] = self.cache.get(sheet_name)
+            if parents[sheet_name] is None:
+                self.loader.request(sheet_name)
+        return parents
+    
+    def toggle_join(self):
+        if self.sheet is not None and self.sheet.complete:
+            self.show_rows()
+    
+    def show_rows(self, keep_view=False):
+        """Point the view at the current sheet through its filters and sort order"""
+        with self.trace.span("show_rows", sheet=self.current_sheet) as span:
+            sheet = self.sheet
+            query = self.query()
+            start = time.perf_counter()
+            try:
+                row_ids = query.row_ids(sheet)
+            except ValueError as e:
+                self.status_var.set(f"Invalid filter: {e}")
+                return
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            
+            joins = self.joins()
+            if joins is not None:
+                rows = JoinedRows(sheet, joins, self.parent_models(joins), row_ids)
+                headers = joins.headers()
+            else:
+                rows = ModelRows(sheet, row_ids)
+                headers = sheet.headers
+            focused = self.view.focus_row()
+            row_id = self.view.rows.row_id(focused) if keep_view and focused is not None and focused < len(self.view.rows) else None
+            first = self.view.first
+            self.set_view(headers, rows)
+            span.set(rows=len(rows), query_ms=round(elapsed_ms, 1))
+            if keep_view:
+                position = rows.position(row_id) if row_id is not None else None
+                if position is not None:
+                    self.view.selected = {position}
+                    self.view.focused = self.view.anchor = position
+                self.view.first = first
+                self.view.render()
+            
+            # Headings show the sort keys: an arrow per key, numbered when there are several
+            arrows = {column: ("▼" if descending else "▲") + (str(rank + 1) if len(query.sort_keys) > 1 else "")
+                      for rank, (column, descending) in enumerate(query.sort_keys)}
+            columns = joins.columns if joins is not None else range(len(headers))
+            self.view.set_headings([f"{header} {arrows[column]}" if column in arrows else header
+                                    for column, header in zip(columns, headers)])
+            if query.filters:
+                self.filter_summary.set(f"{len(rows):,} of {len(sheet.order):,} rows match "
+                                        f"{len(query.filters)} filter(s) ({elapsed_ms:.0f} ms)")
+            else:
+                self.filter_summary.set(f"Sorted in {elapsed_ms:.0f} ms" if query.sort_keys else "")
+    
+    def show_timing(self, *names):
+        """Show the latest timings of the named phases, e.g. 'read_sheet Employees 120 ms (12,463 rows, 3.4 MB)'"""
+        events = [self.trace.latest[name] for name in names if name in self.trace.latest]
+        if events:
+            self.timing_var.set(" · ".join(TraceRecorder.describe(event) for event in events))
+    
+    def export_trace(self):
+        """Save the phases timed so far as a Chrome trace, to attach to a performance report"""
+        if not self.trace.events:
+            messagebox.showinfo("Export Trace", "Nothing has been timed yet - open a workbook first.")
+            return
+        path = filedialog.asksaveasfilename(
+            title="Export Trace", initialfile="ems-gen-up-trace.json", defaultextension=".json",
+            filetypes=[("Chrome Trace", "*.json"), ("All Files", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            self.trace.export(path)
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to export the trace:\n{e}")
+            return
+        self.status_var.set(f"{len(self.trace.events):,} timed phases written to {os.path.basename(path)} "
+                            "(open it in chrome://tracing or ui.perfetto.dev)")
+    
+    def refresh_rows(self):
+        """Redraw after an edit; a filtered or sorted view is queried again, since edits can move rows in or out"""
+        if self.sheet.complete and self.query().active:
+            self.show_rows(keep_view=True)
+        else:
+            self.view.refresh()
+        self.show_summary()
+    
+    def show_summary(self):
+        """Show the current sheet's aggregates, e.g. 'Rows: 209 · Status: Completed 60, Pending 53 · overdue: 46'"""
+        summary = self.sheet.summary if self.sheet is not None else None
+        if summary is None:
+            self.summary_var.set("Shown once the sheet is loaded" if self.sheet is not None else "")
+            return
+        parts = []
+        for label, value in summary.result().items():
+            if isinstance(value, dict):
+                value = ", ".join(f"{key} {amount:,}" for key, amount in value.items()) or "none"
+            elif isinstance(value, (int, float)):
+                value = f"{value:,}"
+            parts.append(f"{label[:1].upper()}{label[1:]}: {value if value is not None else '-'}")
+        self.summary_var.set("  ·  ".join(parts))
+    
+    def set_filter_columns(self, headers):
+        column = self.filter_column.current()
+        self.filter_column["values"] = headers
+        if headers:
+            self.filter_column.current(column if 0 <= column < len(headers) else 0)
+        else:
+            self.filter_column.set("")
+        self.show_column_filter()
+    
+    def show_column_filter(self, event=None):
+        """Put the chosen column's filter text in the entry"""
+        column = self.filter_column.current()
+        self.filter_var.set(self.query().filters.get(column, "") if column >= 0 else "")
+    
+    def on_filter_typed(self, *args):
+        if self.filter_job is not None:
+            self.root.after_cancel(self.filter_job)
+        self.filter_job = self.root.after(self.FILTER_DELAY_MS, self.apply_filter)
+    
+    def apply_filter(self):
+        self.filter_job = None
+        column = self.filter_column.current()
+        if self.sheet is None or not self.sheet.complete or column < 0:
+            return
+        query = self.query()
+        text = self.filter_var.get()
+        if query.filters.get(column, "") == text.strip():
+            return
+        query.set_filter(column, text)
+        self.show_rows()
+    
+    def clear_filters(self):
+        self.query().filters.clear()
+        self.filter_var.set("")
+        if self.sheet is not None and self.sheet.complete:
+            self.show_rows()
+    
+    def sort_by(self, column, extend):
+        """Heading click: cycle the column through ascending, descending and unsorted"""
+        if self.sheet is None or not self.sheet.complete:
+            return
+        joins = self.joins()
+        if joins is not None:
+            column = joins.model_column(column)
+            if column is None:
+                self.status_var.set("Joined columns can't be sorted; sort by the ID column instead")
+                return
+        self.query().toggle_sort(column, extend)
+        self.show_rows()
+    
+    def show_employee_records(self):
+        """Drill down from the focused row to every record of its employee, across all sheets"""
+        focused = self.view.focus_row()
+        if self.sheet is None or focused is None:
+            messagebox.showwarning("Warning", "Please select a row first.")
+            return
+        if "Employee_ID" not in self.sheet.headers:
+            messagebox.showwarning("Warning", f"{self.current_sheet} has no Employee_ID column.")
+            return
+        row_id = self.view.rows.row_id(focused)
+        employee_id = self.sheet.columns[self.sheet.headers.index("Employee_ID")][row_id]
+        if employee_id is None:
+            messagebox.showwarning("Warning", "The selected row has no Employee_ID.")
+            return
+        
+        # Sheets not parsed yet are requested; each is searched as it arrives, then the window opens
+        sheets = {sheet_name: self.cache.get(sheet_name) for sheet_name in self.sheet_combobox["values"]}
+        waiting = {sheet_name for sheet_name, sheet in sheets.items() if sheet is None}
+        self.drilldown = {"employee_id": employee_id, "waiting": waiting, "results": {}}
+        for sheet_name in waiting:
+            self.loader.request(sheet_name)
+        for sheet_name, sheet in sheets.items():
+            if sheet is not None:
+                self.collect_records(sheet_name, sheet)
+        self.finish_records()
+        if waiting:
+            self.status_var.set(f"Loading {len(waiting)} sheet(s) for {employee_id}'s records...")
+    
+    def collect_records(self, sheet_name, sheet):
+        """Add a sheet's rows for the pending drill-down's employee"""
+        drilldown = self.drilldown
+        drilldown["waiting"].discard(sheet_name)
+        if "Employee_ID" in sheet.headers:
+            column = sheet.headers.index("Employee_ID")
+            employee_id = drilldown["employee_id"]
+            if column == sheet.key_column:
+                row_ids = {sheet.key_index[employee_id]} if employee_id in sheet.key_index else set()
+            else:
+                # The column's HashIndex is built on first use and kept current through edits like the filters'
+                row_ids = sheet.column_index(column).equal(employee_id)
+            if row_ids:
+                drilldown["results"][sheet_name] = (sheet.headers, [sheet.display_row(row_id) for row_id in sorted(row_ids)])
+    
+    def finish_records(self):
+        """Open the pending drill-down's window once no sheet it needs is still loading"""
+        if self.drilldown is not None and not self.drilldown["waiting"]:
+            drilldown, self.drilldown = self.drilldown, None
+            self.open_records_window(drilldown)
+    
+    def open_records_window(self, drilldown):
+        employee_id = drilldown["employee_id"]
+        results = drilldown["results"]
+        window = tk.Toplevel(self.root)
+        window.title(f"Records for {employee_id}")
+        window.geometry("900x500")
+        if not results:
+            ttk.Label(window, text=f"No records found for {employee_id}.", padding=20).pack()
+            return
+        notebook = ttk.Notebook(window)
+        notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        for sheet_name in self.sheet_combobox["values"]:
+            if sheet_name in results:
+                headers, rows = results[sheet_name]
+                tab = ttk.Frame(notebook)
+                notebook.add(tab, text=f"{sheet_name} ({len(rows):,})")
+                VirtualTreeview(tab).set_rows(headers, rows)
+        self.status_var.set(f"{sum(len(rows) for _, rows in results.values()):,} records for {employee_id} "
+                            f"in {len(results)} sheet(s)")
+    
+    def edit_selected(self):
+        selected = self.view.focus_row()
+        if selected is None:
+            messagebox.showwarning("Warning", "Please select a row to edit.")
+            return
+        
+        # Get selected item data
+        row_id = self.view.rows.row_id(selected)
+        item_data = self.sheet.display_row(row_id)
+        headers = self.sheet.headers
+        
+        # Create edit window
+        edit_win = tk.Toplevel(self.root)
+        edit_win.title("Edit Record")
+        edit_win.grab_set()
+        
+        # Create entry widgets for each column
+        entries = []
+        for i, header in enumerate(headers):
+            ttk.Label(edit_win, text=header).grid(row=i, column=0, padx=5, pady=2, sticky=tk.E)
+            entry = ttk.Entry(edit_win)
+            entry.grid(row=i, column=1, padx=5, pady=2, sticky=tk.W+tk.E)
+            
+            # Pre-fill with current value
+            entry.insert(0, item_data[i])
+            
+            entries.append(entry)
+        
+        # Save button
+        save_btn = ttk.Button(
+            edit_win, 
+            text="Save Changes",
+            command=lambda: self.save_edit(row_id, entries, edit_win)
+        )
+        save_btn.grid(row=len(headers), column=0, columnspan=2, pady=10)
+    
+    def entry_values(self, entries, window):
+        """The entries' text converted to each column's type, or None after showing why it doesn't fit"""
+        try:
+            return [self.sheet.coerce(column, entry.get()) for column, entry in enumerate(entries)]
+        except ValueError as e:
+            messagebox.showerror("Invalid Value", str(e), parent=window)
+            return None
+    
+    def save_edit(self, row_id, entries, window):
+        # Only cells whose text was changed are converted, so untouched cells keep their stored value
+        # and type, even in a column of mixed types (typed as text)
+        row = self.sheet.row(row_id)
+        changed = {}
+        try:
+            for column, entry in enumerate(entries):
+                text = entry.get()
+                if text == format_value(row[column]):
+                    continue
+                value = self.sheet.coerce(column, text)
+                if not same_value(row[column], value):
+                    changed[column] = value
+            
+            # Update the model and redraw the visible window
+            self.sheet.edit({row_id: changed})
+        except ValueError as e:
+            messagebox.showerror("Invalid Value", str(e), parent=window)
+            return
+        self.refresh_rows()
+        
+        # Close edit window
+        window.destroy()
+        self.status_var.set("Changes saved to memory (not file). Click 'Save Changes' to update file.")
+    
+    def add_new(self):
+        headers = self.sheet.headers
+        
+        # Create add window
+        add_win = tk.Toplevel(self.root)
+        add_win.title("Add New Record")
+        add_win.grab_set()
+        
+        # Create entry widgets for each column
+        entries = []
+        for i, header in enumerate(headers):
+            ttk.Label(add_win, text=header).grid(row=i, column=0, padx=5, pady=2, sticky=tk.E)
+            entry = ttk.Entry(add_win)
+            entry.grid(row=i, column=1, padx=5, pady=2, sticky=tk.W+tk.E)
+            entries.append(entry)
+        
+        # Add button
+        add_btn = ttk.Button(
+            add_win, 
+            text="Add Record",
+            command=lambda: self.save_new(entries, add_win)
+        )
+        add_btn.grid(row=len(headers), column=0, columnspan=2, pady=10)
+    
+    def save_new(self, entries, window):
+        # Get new values from entries
+        new_values = self.entry_values(entries, window)
+        if new_values is None:
+            return
+        
+        # Append the row to the model and scroll to it
+        try:
+            row_id = self.sheet.insert_row(new_values)
+        except ValueError as e:
+            messagebox.showerror("Invalid Value", str(e), parent=window)
+            return
+        self.refresh_rows()
+        position = self.view.rows.position(row_id)
+        
+        # Close add window
+        window.destroy()
+        if position is None:
+            self.status_var.set("New record added to memory (not file) but hidden by the filter. Click 'Save Changes' to update file.")
+            return
+        self.view.selected = {position}
+        self.view.focused = self.view.anchor = position
+        self.view.see(position)
+        self.status_var.set("New record added to memory (not file). Click 'Save Changes' to update file.")
+    
+    def delete_selected(self):
+        selected = self.view.selected_rows()
+        if not selected:
+            messagebox.showwarning("Warning", "Please select one or more rows to delete.")
+            return
+        
+        if messagebox.askyesno("Confirm", "Are you sure you want to delete the selected records?"):
+            # One model step for the whole selection, undoable as a unit
+            self.sheet.delete_rows([self.view.rows.row_id(index) for index in selected])
+            self.view.selected = set()
+            self.refresh_rows()
+            self.status_var.set("Records deleted from memory (not file). Click 'Save Changes' to update file.")
+    
+    def bulk_edit(self):
+        """Set a value, replace text or apply an expression across the selected rows or all rows shown"""
+        selected = self.view.selected_rows()
+        headers = self.sheet.headers
+        
+        bulk_win = tk.Toplevel(self.root)
+        bulk_win.title("Bulk Edit")
+        bulk_win.grab_set()
+        
+        # Which rows: the selection, or every row the filters let through
+        scope = tk.StringVar(value="selected" if len(selected) > 1 else "shown")
+        ttk.Label(bulk_win, text="Apply to").grid(row=0, column=0, padx=5, pady=2, sticky=tk.E)
+        ttk.Radiobutton(bulk_win, text=f"Selected rows ({len(selected):,})", variable=scope, value="selected",
+                        state=tk.NORMAL if selected else tk.DISABLED).grid(row=0, column=1, padx=5, pady=2, sticky=tk.W)
+        ttk.Radiobutton(bulk_win, text=f"All rows shown ({len(self.view.rows):,})", variable=scope,
+                        value="shown").grid(row=0, column=2, columnspan=2, padx=5, pady=2, sticky=tk.W)
+        
+        # What to do: set or replace in one column, or an expression
+        mode = tk.StringVar(value="set")
+        column = ttk.Combobox(bulk_win, values=headers, state="readonly", width=24)
+        column.current(0)
+        ttk.Label(bulk_win, text="Column").grid(row=1, column=0, padx=5, pady=2, sticky=tk.E)
+        column.grid(row=1, column=1, padx=5, pady=2, sticky=tk.W)
+        
+        value = ttk.Entry(bulk_win, width=30)
+        ttk.Radiobutton(bulk_win, text="Set to", variable=mode, value="set").grid(row=2, column=0, padx=5, pady=2, sticky=tk.W)
+        value.grid(row=2, column=1, padx=5, pady=2, sticky=tk.W)
+        
+        find, replacement = ttk.Entry(bulk_win, width=30), ttk.Entry(bulk_win, width=30)
+        ttk.Radiobutton(bulk_win, text="Replace", variable=mode, value="replace").grid(row=3, column=0, padx=5, pady=2, sticky=tk.W)
+        find.grid(row=3, column=1, padx=5, pady=2, sticky=tk.W)
+        ttk.Label(bulk_win, text="with").grid(row=3, column=2, padx=5, pady=2)
+        replacement.grid(row=3, column=3, padx=5, pady=2, sticky=tk.W)
+        
+        expression = ttk.Entry(bulk_win, width=70)
+        ttk.Radiobutton(bulk_win, text="Expression", variable=mode, value="expression").grid(row=4, column=0, padx=5, pady=2, sticky=tk.W)
+        expression.grid(row=4, column=1, columnspan=3, padx=5, pady=2, sticky=tk.W+tk.E)
+        ttk.Label(bulk_win, text="e.g. Progress_Percentage = 100 where Training_Status == 'Completed'",
+                  foreground="gray").grid(row=5, column=1, columnspan=3, padx=5, sticky=tk.W)
+        
+        def make_edit():
+            if mode.get() == "set":
+                return BulkEdit.set_value(self.sheet, column.current(), value.get())
+            if mode.get() == "replace":
+                return BulkEdit.find_replace(self.sheet, column.current(), find.get(), replacement.get())
+            return BulkEdit.parse(self.sheet, expression.get())
+        
+        apply_btn = ttk.Button(
+            bulk_win,
+            text="Apply",
+            command=lambda: self.save_bulk_edit(make_edit, selected if scope.get() == "selected" else None, bulk_win)
+        )
+        apply_btn.grid(row=6, column=0, columnspan=4, pady=10)
+    
+    def save_bulk_edit(self, make_edit, selected, window):
+        """Work out the bulk edit's changes, confirm them and make them one undoable step"""
+        rows = self.view.rows
+        row_ids = [rows.row_id(index) for index in selected] if selected is not None else list(rows.ids())
+        start = time.perf_counter()
+        try:
+            updates = make_edit().updates(row_ids)
+        except ValueError as e:
+            messagebox.showerror("Invalid Bulk Edit", str(e), parent=window)
+            return
+        if not updates:
+            messagebox.showinfo("Bulk Edit", "No cells need changing.", parent=window)
+            return
+        elapsed = time.perf_counter() - start
+        cells = sum(len(changed) for changed in updates.values())
+        if not messagebox.askyesno("Confirm", f"Change {cells:,} cell(s) in {len(updates):,} row(s)?", parent=window):
+            return
+        
+        start = time.perf_counter()
+        try:
+            self.sheet.edit(updates)
+        except ValueError as e:
+            messagebox.showerror("Invalid Bulk Edit", str(e), parent=window)
+            return
+        elapsed_ms = (elapsed + time.perf_counter() - start) * 1000
+        self.refresh_rows()
+        window.destroy()
+        self.status_var.set(f"Bulk edit changed {cells:,} cell(s) in {len(updates):,} row(s) in {elapsed_ms:.0f} ms "
+                            "(one step to undo). Click 'Save Changes' to update file.")
+    
+    def undo(self):
+        if self.sheet is None or not self.sheet.complete:
+            return
+        if self.sheet.undo():
+            self.refresh_rows()
+            self.status_var.set("Undone. Click 'Save Changes' to update file.")
+        else:
+            self.status_var.set("Nothing to undo")
+    
+    def redo(self):
+        if self.sheet is None or not self.sheet.complete:
+            return
+        if self.sheet.redo():
+            self.refresh_rows()
+            self.status_var.set("Redone. Click 'Save Changes' to update file.")
+        else:
+            self.status_var.set("Nothing to redo")
+    
+    def save_changes(self):
+        if not self.file_path or not self.current_sheet:
+            messagebox.showerror("Error", "No workbook or sheet loaded.")
+            return
+        
+        dirty = self.cache.dirty_sheets()
+        if not dirty and not self.rebase:
+            self.status_var.set("No unsaved changes")
+            return
+        
+        # Changes are row numbers in the version they were made against: a file changed on disk is
+        # merged first (the edits of sheets being merged can't be saved yet either)
+        if self.parts is None:
+            self.status_var.set("Still opening the workbook - save again in a moment")
+            return
+        if self.rebase or self.file_changed():
+            if not self.rebase:
+                self.reload_changed()
+            for sheet_name in self.rebase:
+                self.loader.request(sheet_name)
+            self.status_var.set("The workbook changed on disk - merging your edits into it; save again when done")
+            return
+        
+        # Only changed rows are rewritten, on a worker thread, into a temp file that replaces the workbook
+        with self.trace.span("save_changes", sheets=list(dirty)) as span:
+            changes = {name: sheet.changes() for name, sheet in dirty.items()}
+            span.set(rows=sum(len(change["updated"]) + len(change["deleted"]) + len(change["inserted"])
+                              for change in changes.values()))
+        self.saver = WorkbookSaver(self.file_path, changes, expected=self.parts, trace=self.trace)
+        self.toggle_buttons(False)
+        self.progress_var.set(0)
+        self.status_var.set(f"Saving {', '.join(dirty)}...")
+        self.saver.start()
+        self.root.after(self.POLL_MS, self.poll_saver, self.saver, dirty)
+    
+    def poll_saver(self, saver, dirty):
+        message = None
+        while True:
+            try:
+                message = saver.messages.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == "progress":
+                self.progress_var.set(message[1] * 100)
+            else:
+                break
+        
+        if message is None or message[0] == "progress":
+            self.root.after(self.POLL_MS, self.poll_saver, saver, dirty)
+            return
+        
+        self.saver = None
+        if message[0] == "done":
+            for sheet in dirty.values():
+                sheet.mark_saved()
+            if message[2] is not None:
+                self.compact_journal(message[2])
+            self.cache.evict(keep=self.pinned_sheets())
+            if self.sheet is not None:
+                self.refresh_rows()
+            stats = message[1]
+            self.status_var.set(f"Changes to {', '.join(dirty)} saved to {os.path.basename(self.file_path)} "
+                                f"({stats['updated']} updated, {stats['inserted']} added, {stats['deleted']} deleted rows)")
+            self.show_timing("save_changes", "patch_xlsx", "save_workbook")
+            # The new loader reports the saved version's parts; until then the watch has nothing to compare
+            self.parts = None
+            self.restart_loader()
+        else:
+            messagebox.showerror("Error", f"Failed to save changes:\n{message[1]}")
+            self.status_var.set("Error saving changes - the workbook was left as it was")
+        self.toggle_buttons(self.sheet is not None and self.sheet.complete)
+        if self.closing:
+            self.closing = False
+            if message[0] == "done" or self.confirm_quit():
+                self.close()
+    
+    def restart_loader(self, known=None):
+        """Parse sheets from the file as it is now on disk, re-requesting any that were mid-parse"""
+        self.loader.close()
+        self.loader = WorkbookLoader(self.file_path, self.use_store, known, trace=self.trace)
+        self.loader.start()
+        self.root.after(self.POLL_MS, self.poll_loader, self.loader)
+        for sheet_name in list(self.partial):
+            del self.partial[sheet_name]
+            self.loader.request(sheet_name)
+        for sheet_name in self.drilldown["waiting"] if self.drilldown is not None else ():
+            self.loader.request(sheet_name)
+        if self.sheet is not None and not self.sheet.complete:
+            self.load_sheet_data()
+    
+    def unsaved_sheets(self):
+        return list(self.cache.dirty_sheets()) + list(self.rebase) + list(self.recovery)
+    
+    def file_changed(self):
+        """Whether the workbook on disk is no longer the version the cached sheets were read from"""
+        try:
+            return not self.parts.matches(os.stat(self.file_path))
+        except OSError:
+            return False  # mid-replace, or moved away: nothing to reload from
+    
+    def watch_file(self):
+        """Timer: reload the sheets that changed when the workbook is changed on disk by someone else"""
+        self.root.after(self.WATCH_MS, self.watch_file)
+        if self.journal is not None and self.journal.error is not None:
+            error, self.journal = self.journal.error, None
+            messagebox.showwarning("Edit Journal", f"Edits can no longer be journaled ({error}); save them with "
+                                   "'Save Changes' to keep them.")
+        # Skipped while a loader is starting (parts is None) and while our own save is replacing the file
+        if self.parts is not None and self.saver is None and self.file_changed():
+            self.reload_changed()
+        elif self.compact_due():
+            self.compacted_at = time.monotonic()
+            self.save_changes()
+    
+    def reload_changed(self):
+        self.status_var.set(f"{os.path.basename(self.file_path)} changed on disk - checking which sheets changed...")
+        known, self.parts = self.parts, None
+        self.restart_loader(known)
+    
+    def reload_sheets(self, changed, names):
+        """Drop the cached copies of sheets changed on disk and have the ones in use parsed again"""
+        lost = []
+        stale = [sheet_name for sheet_name in changed if self.recovery.pop(sheet_name, None) is not None]
+        for sheet_name in changed:
+            sheet = self.cache.discard(sheet_name) or self.rebase.pop(sheet_name, None)
+            if sheet is not None and sheet.dirty:
+                if sheet_name in names:
+                    self.rebase[sheet_name] = sheet
+                else:
+                    lost.append(sheet_name)
+            if sheet_name in names and (sheet_name in self.rebase or sheet_name in self.join_parents()):
+                self.loader.request(sheet_name)
+        
+        if self.current_sheet not in names:
+            self.current_sheet = ""  # poll_loader selects the first sheet
+        elif self.current_sheet in changed:
+            self.load_sheet_data()
+        elif self.sheet is not None and self.sheet.complete and self.join_parents() & set(changed):
+            self.show_rows(keep_view=True)
+        
+        self.status_var.set(f"{os.path.basename(self.file_path)} changed on disk - reloading "
+                            f"{', '.join(sorted(set(changed) & set(names))) or 'no sheets'}")
+        if lost:
+            messagebox.showwarning("Sheets Removed", f"{', '.join(lost)} no longer exist(s) in the workbook on disk; "
+                                   "the unsaved changes to them were dropped.")
+        if stale:
+            messagebox.showwarning("Recover Edits", f"{', '.join(stale)} changed on disk before the edits recovered "
+                                   "for them could be restored; those edits were dropped.")
+    
+    def merge_edits(self, sheet_name, local, incoming):
+        """Replay a sheet's unsaved edits onto its new version from disk, asking how to settle conflicts"""
+        merge = SheetMerge(local, incoming)
+        keep_local = False
+        if merge.conflicts:
+            shown = "\n".join(f"• {description}" for description, _ in merge.conflicts[:self.MAX_CONFLICTS_SHOWN])
+            more = len(merge.conflicts) - self.MAX_CONFLICTS_SHOWN
+            if more > 0:
+                shown += f"\n... and {more:,} more"
+            if merge.keepable:
+                keep_local = messagebox.askyesno(
+                    "Conflicting Changes",
+                    f"{sheet_name} was changed on disk, and {len(merge.conflicts):,} of your unsaved edits conflict "
+                    f"with it:\n\n{shown}\n\nKeep your values? (No keeps the values on disk)")
+            else:
+                messagebox.showwarning("Conflicting Changes", f"{sheet_name} was changed on disk and your unsaved "
+                                       f"edits can't be merged into it; they were dropped:\n\n{shown}")
+        try:
+            merge.apply(keep_local)
+        except ValueError as e:
+            messagebox.showwarning("Conflicting Changes", f"Your edits to {sheet_name} could not be merged ({e}); "
+                                   "the version on disk is shown.")
+            return
+        if incoming.dirty:
+            self.status_var.set(f"Your unsaved edits were merged into the new version of {sheet_name}")
+    
+    def recover_sheets(self, changed, names):
+        """First load: have the sheets with recovered edits read, dropping the edits to sheets changed on disk since"""
+        lost = [sheet_name for sheet_name in self.recovery if sheet_name in changed or sheet_name not in names]
+        for sheet_name in lost:
+            del self.recovery[sheet_name]
+        for sheet_name in self.recovery:
+            self.loader.request(sheet_name)
+        if lost:
+            messagebox.showwarning("Recover Edits", f"{', '.join(lost)} changed on disk after the unsaved edits to "
+                                   "them were made; those edits were dropped.")
+    
+    def recover_edits(self, sheet_name, sheet, records):
+        """Replay a sheet's journaled edits onto it; False (after saying so) when they don't fit it"""
+        try:
+            EditJournal.replay(sheet, records)
+        except (ValueError, IndexError, KeyError, TypeError) as e:
+            messagebox.showwarning("Recover Edits", f"The unsaved edits to {sheet_name} could not be restored ({e}); "
+                                   "the version on disk is shown instead.")
+            return False
+        self.status_var.set(f"Restored {EditJournal.count_steps(records):,} unsaved edit(s) to {sheet_name}")
+        return True
+    
+    def compact_journal(self, parts=None):
+        """Start the journal over against the workbook version on disk (parts, or self.parts), keeping what is unsaved"""
+        parts = parts or self.parts
+        if self.journal is not None and parts is not None:
+            self.journal.rewrite(parts, list(self.cache.sheets.items()), self.recovery)
+    
+    def compact_due(self):
+        """Whether to save the journaled edits into the workbook: edited since the last try, then idle long enough"""
+        return (self.journal is not None and self.compact_idle > 0 and self.saver is None and self.parts is not None
+                and not self.rebase and self.root.grab_current() is None and self.cache.dirty_sheets()
+                and self.compacted_at < self.journal.last_write < time.monotonic() - self.compact_idle)
+    
+    def on_close(self):
+        """Window closed: save the journaled edits into the workbook, then quit"""
+        if self.saver is not None:
+            self.closing = True  # poll_saver quits once the save is done
+            self.status_var.set("Finishing the save before closing...")
+            return
+        if self.journal is not None and self.cache.dirty_sheets():
+            self.closing = True
+            self.save_changes()
+            if self.saver is not None:
+                return
+            self.closing = False
+            if not self.confirm_quit():
+                return
+        self.close()
+    
+    def confirm_quit(self):
+        return messagebox.askyesno("Quit", "Your edits could not be saved into the workbook now. They are kept in "
+                                   "its edit journal and offered again when it is next opened. Quit anyway?")
+    
+    def close(self):
+        if self.loader is not None:
+            self.loader.close()
+        if self.trace_path:
+            try:
+                self.trace.export(self.trace_path)
+            except OSError as e:
+                print(f"Failed to write the trace to {self.trace_path}: {e}", file=sys.stderr)
+        if self.journal is not None:
+            if self.unsaved_sheets():
+                self.journal.close()
+            else:
+                self.journal.discard()
+        self.root.destroy()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update an Employee Management System workbook")
+    parser.add_argument("--cache-mb", type=int, default=512,
+                        help="memory budget for parsed sheets kept for instant switching (default 512)")
+    parser.add_argument("--no-store", action="store_true",
+                        help="always parse the xlsx instead of reading unchanged sheets from its SQLite sidecar")
+    parser.add_argument("--no-journal", action="store_true",
+                        help="don't journal edits next to the workbook for recovery after a crash")
+    parser.add_argument("--compact-idle", type=int, default=300, metavar="SECONDS",
+                        help="save journaled edits into the workbook after this long without edits; 0 saves them "
+                             "only on exit (default 300)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="write the timings of opening, reading, showing and saving sheets to FILE as a Chrome "
+                             "trace (JSON) on exit")
+    parser.add_argument("--no-trace", action="store_true",
+                        help="don't time opening, reading, showing and saving sheets (no timings in the status bar)")
+    parser.add_argument("--patch", metavar="FILE",
+                        help="apply a .jsonl, .json or .csv patch of upserts and deletes to WORKBOOK without the GUI; "
+                             "records that conflict are reported and skipped, and the rest are saved")
+    parser.add_argument("--dry-run", action="store_true", help="with --patch, validate and report without saving")
+    parser.add_argument("--strict", action="store_true",
+                        help="with --patch, save nothing if any record conflicts")
+    parser.add_argument("workbook", nargs="?", help="workbook to patch (with --patch)")
+    args = parser.parse_args()
+    
+    if args.patch:
+        if not args.workbook:
+            parser.error("--patch needs a WORKBOOK")
+        sys.exit(run_patch(args.workbook, args.patch, dry_run=args.dry_run, strict=args.strict))
+    
+    if args.trace and args.no_trace:
+        parser.error("--trace and --no-trace can't be used together")
+    
+    root = tk.Tk()
+    app = EmployeeManagementUpdater(root, cache_mb=args.cache_mb, use_store=not args.no_store,
+                                    use_journal=not args.no_journal, compact_idle=args.compact_idle,
+                                    trace=None if args.no_trace else TraceRecorder(), trace_path=args.trace)
+    root.mainloop()
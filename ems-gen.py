@@ -1,73 +1,720 @@
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
+from collections import deque
+from datetime import date, datetime, timedelta
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED
+import argparse
+import csv
+import itertools
+import json
+import math
 import random
+import sqlite3
+import shutil
 import os
+import pickle
+import tempfile
+
+from ems_common import LOOKUP_VALUES, SheetSummary
+from ems_trace import NO_TRACE, TraceRecorder
+
+# numpy and pandas take most of the startup time, so they are imported on first use (see
+# load_dependencies) rather than here; --help and argument errors return immediately
+np = None
+pd = None
+
+def load_dependencies():
+    """Import numpy and pandas into this module's globals; called before any data is generated"""
+    global np, pd
+    if pd is None:
+        import numpy
+        import pandas
+        np, pd = numpy, pandas
+
+def format_ids(prefix, numbers, width=3):
+    """Vectorized equivalent of f'{prefix}{str(n).zfill(width)}' over an integer array"""
+    return np.char.add(prefix, np.char.zfill(np.asarray(numbers).astype(str), width))
+
+# Key columns per sheet, used by writers that can declare them (SQLite)
+PRIMARY_KEYS = {
+    'Employees': ['Employee_ID'],
+    'Training_Processes': ['Process_ID'],
+    'Training_Status': ['Record_ID'],
+    'One_on_Ones': ['Meeting_ID'],
+    'Projects': ['Project_ID'],
+    'Onboarding_Tasks': ['Task_ID'],
+    'Lookup_Values': ['Category', 'Value'],
+}
+FOREIGN_KEYS = {
+    'Training_Status': [('Employee_ID', 'Employees'), ('Process_ID', 'Training_Processes')],
+    'One_on_Ones': [('Employee_ID', 'Employees')],
+    'Projects': [('Employee_ID', 'Employees')],
+    'Onboarding_Tasks': [('Employee_ID', 'Employees')],
+}
+
+def dataframe_rows(df):
+    """Yield plain Python row tuples from a DataFrame, with NaT/NaN turned into empty cells"""
+    columns = [df[name].astype(object).where(df[name].notna(), None).tolist() for name in df.columns]
+    return zip(*columns)
+
+def sqlite_rows(df):
+    """Like dataframe_rows, with dates as ISO-8601 text since sqlite3 has no datetime64 binding"""
+    df = df.copy()
+    for name in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[name].dtype):
+            values = df[name].to_numpy('datetime64[s]')
+            df[name] = np.where(np.isnat(values), None, np.datetime_as_string(values, unit='s'))
+    return dataframe_rows(df)
+
+def remove_files(paths):
+    """Delete the files that exist among paths"""
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+class FixedTimeZipFile(ZipFile):
+    """ZipFile that stamps every member with the same date_time, so equal content gives equal bytes"""
+    def __init__(self, file, date_time, **kwargs):
+        super().__init__(file, 'w', ZIP_DEFLATED, allowZip64=True, **kwargs)
+        self.date_time = date_time
+    
+    def member_info(self, arcname):
+        zinfo = ZipInfo(arcname, date_time=self.date_time)
+        zinfo.compress_type = self.compression
+        zinfo.external_attr = 0o600 << 16
+        return zinfo
+    
+    def writestr(self, zinfo_or_arcname, data, *args, **kwargs):
+        if isinstance(zinfo_or_arcname, str):
+            zinfo_or_arcname = self.member_info(zinfo_or_arcname)
+        super().writestr(zinfo_or_arcname, data, *args, **kwargs)
+    
+    def write(self, filename, arcname=None, *args, **kwargs):
+        with open(filename, 'rb') as src, self.open(self.member_info(arcname or filename), 'w', force_zip64=True) as dest:
+            shutil.copyfileobj(src, dest, 1024 * 1024)
+
+class StreamingXlsxWriter:
+    """Write sheets chunk by chunk into a write-only openpyxl workbook, continuing long sheets on <Sheet>_2, ..."""
+    MAX_ROWS = 1048576
+    extension = '.xlsx'
+    # Optional dependency the writer imports, if any
+    requires = 'openpyxl'
+    
+    def __init__(self, file_path, timestamp=None):
+        self.file_path = file_path
+        self.timestamp = timestamp
+        import openpyxl
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.sheet_name = None
+        self.sheet = None
+        self.part = 0
+        self.rows = 0
+        self.headers = None
+        # Set once close() starts writing file_path
+        self.saving = False
+    
+    def start_sheet_part(self):
+        self.part += 1
+        title = self.sheet_name if self.part == 1 else f"{self.sheet_name}_{self.part}"
+        self.sheet = self.workbook.create_sheet(title)
+        self.sheet.append(self.headers)
+        self.rows = 1
+    
+    def write_chunk(self, sheet_name, df):
+        """Append a DataFrame chunk to sheet_name, starting the sheet on its first chunk"""
+        if sheet_name != self.sheet_name:
+            self.sheet_name = sheet_name
+            self.headers = list(df.columns)
+            self.part = 0
+            self.start_sheet_part()
+        
+        for row in dataframe_rows(df):
+            if self.rows == self.MAX_ROWS:
+                self.start_sheet_part()
+            self.sheet.append(row)
+            self.rows += 1
+    
+    def close(self):
+        self.saving = True
+        if self.timestamp is None:
+            self.workbook.save(self.file_path)
+            return
+        
+        # Pin the document properties and zip member times so a seeded run is byte-identical
+        from openpyxl.writer.excel import ExcelWriter
+        self.workbook.properties.created = self.timestamp
+        self.workbook.properties.modified = self.timestamp
+        archive = FixedTimeZipFile(self.file_path, self.timestamp.timetuple()[:6])
+        ExcelWriter(self.workbook, archive).save()
+    
+    def discard(self):
+        """Drop the workbook after a failed run, and the file if close() had started it"""
+        if self.saving:
+            remove_files([self.file_path])
+        # Finish the sheets' streams now rather than when they are garbage collected
+        for sheet in self.workbook.worksheets:
+            if not sheet.closed:
+                sheet.close()
+        self.workbook = None
+
+class CsvWriter:
+    """Write each sheet to <dir>/<Sheet>.csv, appending chunk by chunk"""
+    extension = '.csv'
+    requires = None
+    
+    def __init__(self, directory, timestamp=None):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.sheet_name = None
+        self.file = None
+        self.paths = []
+    
+    def write_chunk(self, sheet_name, df):
+        header = sheet_name != self.sheet_name
+        if header:
+            self.close()
+            self.sheet_name = sheet_name
+            self.paths.append(os.path.join(self.directory, sheet_name + self.extension))
+            self.file = open(self.paths[-1], 'w', newline='', encoding='utf-8')
+        df.to_csv(self.file, header=header, index=False)
+    
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+    
+    def discard(self):
+        """Close and delete the sheet files written so far, after a failed run"""
+        self.close()
+        remove_files(self.paths)
+
+class ArrowWriter:
+    """Base for pyarrow-backed writers: one file per sheet under a directory, written as record batches"""
+    requires = 'pyarrow'
+    
+    def __init__(self, directory, timestamp=None):
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError(f"pyarrow is required for {self.extension[1:]} output (pip install pyarrow)")
+        self.pa = pyarrow
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.sheet_name = None
+        self.writer = None
+        self.schema = None
+        self.paths = []
+    
+    def write_chunk(self, sheet_name, df):
+        if sheet_name != self.sheet_name:
+            self.close()
+            self.sheet_name = sheet_name
+            # Fixed by the first chunk, so a column that is all-null in a later chunk keeps its type
+            self.schema = self.pa.Schema.from_pandas(df, preserve_index=False)
+            self.paths.append(os.path.join(self.directory, sheet_name + self.extension))
+            self.writer = self.open_file(self.paths[-1], self.schema)
+        self.writer.write_table(self.pa.Table.from_pandas(df, schema=self.schema, preserve_index=False))
+    
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+    
+    def discard(self):
+        """Close and delete the sheet files written so far, after a failed run"""
+        self.close()
+        remove_files(self.paths)
+
+class ParquetWriter(ArrowWriter):
+    extension = '.parquet'
+    
+    def open_file(self, path, schema):
+        import pyarrow.parquet
+        return pyarrow.parquet.ParquetWriter(path, schema)
+
+class FeatherWriter(ArrowWriter):
+    """Arrow IPC (Feather v2) files, left uncompressed so readers can memory-map them"""
+    extension = '.feather'
+    
+    def open_file(self, path, schema):
+        import pyarrow.ipc
+        return pyarrow.ipc.new_file(path, schema)
+
+class SqliteWriter:
+    """Write every sheet as a table of one SQLite database, with primary and foreign keys declared"""
+    extension = '.sqlite'
+    requires = None
+    
+    def __init__(self, file_path, timestamp=None):
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        self.file_path = file_path
+        self.connection = sqlite3.connect(file_path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        # A fresh file that is rebuilt on failure doesn't need a rollback journal during the bulk load
+        self.connection.execute("PRAGMA journal_mode = OFF")
+        self.connection.execute("PRAGMA synchronous = OFF")
+        self.sheet_name = None
+        self.insert_sql = None
+        self.tables = []
+    
+    def create_table(self, sheet_name, df):
+        columns = []
+        for name, dtype in df.dtypes.items():
+            if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+                sql_type = 'INTEGER'
+            elif pd.api.types.is_float_dtype(dtype):
+                sql_type = 'REAL'
+            else:
+                sql_type = 'TEXT'
+            columns.append(f'"{name}" {sql_type}')
+        columns.append('PRIMARY KEY (' + ', '.join(f'"{key}"' for key in PRIMARY_KEYS[sheet_name]) + ')')
+        for column, parent in FOREIGN_KEYS.get(sheet_name, []):
+            columns.append(f'FOREIGN KEY ("{column}") REFERENCES "{parent}" ("{PRIMARY_KEYS[parent][0]}")')
+        self.connection.execute(f'CREATE TABLE "{sheet_name}" (' + ', '.join(columns) + ')')
+        self.tables.append(sheet_name)
+        
+        placeholders = ', '.join('?' * len(df.columns))
+        self.insert_sql = f'INSERT INTO "{sheet_name}" VALUES ({placeholders})'
+    
+    def write_chunk(self, sheet_name, df):
+        if sheet_name != self.sheet_name:
+            self.sheet_name = sheet_name
+            self.create_table(sheet_name, df)
+        
+        with self.connection:
+            self.connection.executemany(self.insert_sql, sqlite_rows(df))
+    
+    def write_info(self, info):
+        """Record generation parameters (as-of date, seed, scale, skew) for later incremental runs"""
+        self.connection.execute('CREATE TABLE IF NOT EXISTS "Dataset_Info" ("Key" TEXT PRIMARY KEY, "Value" TEXT)')
+        self.connection.executemany('INSERT OR REPLACE INTO "Dataset_Info" VALUES (?, ?)',
+                                    [(key, None if value is None else str(value)) for key, value in info.items()])
+    
+    def close(self):
+        # Index the foreign-key columns once, after the bulk load, so joins to Employees stay fast
+        for sheet_name in self.tables:
+            for column, _ in FOREIGN_KEYS.get(sheet_name, []):
+                self.connection.execute(
+                    f'CREATE INDEX IF NOT EXISTS "idx_{sheet_name}_{column}" ON "{sheet_name}" ("{column}")')
+        self.connection.commit()
+        self.connection.close()
+    
+    def discard(self):
+        """Close and delete the half-built database after a failed run"""
+        self.connection.close()
+        remove_files([self.file_path])
+
+WRITERS = {
+    'xlsx': StreamingXlsxWriter,
+    'csv': CsvWriter,
+    'parquet': ParquetWriter,
+    'feather': FeatherWriter,
+    'sqlite': SqliteWriter,
+}
+
+class KeyRegistry:
+    """Shared key space for foreign-key sampling, built once from the parent tables' sizes"""
+    FIRST_NAMES = [
+        'John', 'Sarah', 'Mike', 'Lisa', 'Tom', 'Anna', 'David', 'Emma', 'Chris', 'Maya',
+        'James', 'Jessica', 'Robert', 'Amy', 'Kevin', 'Nicole', 'Daniel', 'Olivia', 'Ryan', 'Sophia'
+    ]
+    LAST_NAMES = [
+        'Smith', 'Johnson', 'Brown', 'Davis', 'Wilson', 'Garcia', 'Lee', 'Martinez', 'Taylor', 'Patel',
+        'Anderson', 'White', 'Clark', 'Rodriguez', 'Chen', 'Thompson', 'Kim', 'Jackson', 'Murphy', 'Liu'
+    ]
+    NAME_CATEGORIES = [' '.join(pair) for pair in itertools.product(FIRST_NAMES, LAST_NAMES)]
+    
+    # Integer key columns and the prefix their string IDs get when materialized
+    ID_PREFIXES = {'Employee_ID': 'EMP', 'Process_ID': 'PROC', 'Meeting_ID': 'MEET', 'Project_ID': 'PROJ', 'Task_ID': 'TASK'}
+    # Columns holding a manager's employee number, materialized as that employee's name
+    MANAGER_COLUMNS = ['Manager', 'Manager_Name', 'Assigned_By', 'Project_Manager']
+    
+    # One employee in MANAGER_RATIO manages (4 of the 20 base employees, as in the original sample)
+    MANAGER_RATIO = 5
+    
+    def __init__(self, num_employees, num_processes, rng, skew=0.0):
+        self.num_employees = num_employees
+        self.num_processes = num_processes
+        self.skew = skew
+        
+        num_managers = max(1, num_employees // self.MANAGER_RATIO)
+        self.manager_numbers = (np.sort(rng.choice(num_employees, num_managers, replace=False)) + 1).astype(np.int32)
+        self.is_manager = np.zeros(num_employees + 1, dtype=bool)
+        self.is_manager[self.manager_numbers] = True
+        
+        # Multiplier coprime to the key count: spreads Zipf ranks over the key space so the hottest
+        # employees aren't simply EMP001, EMP002, ...
+        self.stride = 2654435761
+        while math.gcd(self.stride, num_employees) != 1:
+            self.stride += 2
+    
+    def add_employees(self, count):
+        """Extend the key space with count new (non-manager) hires"""
+        self.num_employees += count
+        self.is_manager = np.concatenate([self.is_manager, np.zeros(count, dtype=bool)])
+    
+    def sample_employees(self, rng, size):
+        """Employee numbers for child rows: uniform, or Zipf-like (a few hot employees) when skew > 0"""
+        n = self.num_employees
+        if self.skew <= 0:
+            return rng.integers(1, n + 1, size, dtype=np.int32)
+        
+        # Inverse CDF of a continuous power law over ranks 1..n
+        u = rng.random(size)
+        if abs(self.skew - 1) < 1e-9:
+            rank = np.floor(n ** u)
+        else:
+            exponent = 1 - self.skew
+            rank = np.floor(((n ** exponent - 1) * u + 1) ** (1 / exponent))
+        rank = np.clip(rank.astype(np.int64), 1, n) - 1
+        return ((rank * self.stride) % n + 1).astype(np.int32)
+    
+    def sample_processes(self, rng, size):
+        return rng.integers(1, self.num_processes + 1, size, dtype=np.int32)
+    
+    def sample_managers(self, rng, size):
+        return self.manager_numbers[rng.integers(0, len(self.manager_numbers), size)]
+    
+    @classmethod
+    def name_codes(cls, numbers):
+        """Position in NAME_CATEGORIES of each employee number's first/last name pair, cycling after 400"""
+        idx = np.asarray(numbers, dtype=np.int64) - 1
+        return ((idx % 20) * 20 + (idx + idx // 20) % 20).astype(np.int16)
+    
+    def employee_names(self, numbers):
+        """Names for employee numbers, unique at any scale so manager columns name exactly one employee"""
+        numbers = np.asarray(numbers, dtype=np.int64)
+        codes = self.name_codes(numbers)
+        if self.num_employees <= len(self.NAME_CATEGORIES):
+            return pd.Categorical.from_codes(codes, categories=self.NAME_CATEGORIES)
+        names = np.asarray(self.NAME_CATEGORIES, dtype=object)[codes]
+        return names + np.where(numbers > len(self.NAME_CATEGORIES), np.char.add(' ', numbers.astype(str)), '').astype(object)
+    
+    def materialize(self, df):
+        """Replace integer key and manager columns with their display strings, for writing"""
+        df = df.copy()
+        for column in df.columns:
+            if not pd.api.types.is_integer_dtype(df[column].dtype):
+                continue
+            if column in self.ID_PREFIXES:
+                df[column] = format_ids(self.ID_PREFIXES[column], df[column].to_numpy()).astype(object)
+            elif column in self.MANAGER_COLUMNS:
+                df[column] = self.employee_names(df[column].to_numpy())
+        return df
+
+# Per-process generator used by the worker pool; set once by init_worker rather than pickled per chunk
+_worker_generator = None
+
+def init_worker(generator):
+    global _worker_generator
+    load_dependencies()
+    generator.trace.drain()  # spans the parent had recorded before the pool started are its own
+    _worker_generator = generator
+
+def build_chunk_in_worker(sheet_name, chunk_index, start, stop, materialize):
+    """Build one chunk; returns it with the spans timed while building it, for the parent's TraceRecorder"""
+    df = _worker_generator.build_chunk(sheet_name, chunk_index, start, stop)
+    df = _worker_generator.registry.materialize(df) if materialize else df
+    return df, _worker_generator.trace.drain()
 
 class EmployeeManagementSystemGenerator:
-    def __init__(self, file_path="Employee_Management_System.xlsx"):
+    # Row counts at scale=1 (the original sample workbook); child tables grow proportionally
+    BASE_EMPLOYEES = 20
+    BASE_TRAINING_RECORDS = 50
+    BASE_MEETINGS = 30
+    BASE_PROJECTS = 15
+    
+    # Sheet name, builder method and the attribute holding its row count (None for fixed-size
+    # tables built in one piece); Onboarding_Tasks is chunked by employee, up to 12 rows each
+    SHEETS = [
+        ('Employees', 'create_employees_table', 'num_employees'),
+        ('Training_Processes', 'create_training_processes_table', None),
+        ('Training_Status', 'create_training_status_table', 'num_training_records'),
+        ('One_on_Ones', 'create_one_on_ones_table', 'num_meetings'),
+        ('Projects', 'create_projects_table', 'num_projects'),
+        ('Onboarding_Tasks', 'create_onboarding_tasks_table', 'num_employees'),
+        ('Lookup_Values', 'create_lookup_values_table', None),
+    ]
+    ROWS_PER_UNIT = {'Onboarding_Tasks': 12}
+    ONBOARDING_TASKS = [
+        'Complete paperwork', 'IT setup and accounts', 'Office tour', 'Meet team members',
+        'Review company handbook', 'Safety training', 'Department orientation', 'Assign mentor',
+        'Set up workspace', 'First week check-in', 'Complete required training',
+        'Review job description', 'Set initial goals', '30-day review', '60-day review', '90-day review'
+    ]
+    
+    def __init__(self, file_path="Employee_Management_System.xlsx", scale=1, seed=None, chunk_size=100000,
+                 workers=1, as_of=None, formats=('xlsx',), skew=0.0, tables=None, history_days=1095,
+                 timeline=False, generate=True, trace=None):
+        load_dependencies()
         self.file_path = file_path
-        self.generate_comprehensive_system()
+        # Phase timings (a TraceRecorder); off unless one is given
+        self.trace = trace or NO_TRACE
+        self.formats = list(formats)
+        for fmt in self.formats:
+            if fmt not in WRITERS:
+                raise ValueError(f"Unknown output format {fmt!r}; choose from {', '.join(WRITERS)}")
+        self.tables = self.tables_with_parents(tables)
+        self.scale = scale
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.history_days = history_days
+        self.workers = workers or os.cpu_count() or 1
+        self.as_of = datetime.combine(as_of or date.today(), datetime.min.time())
+        self.now = np.datetime64(self.as_of, 's')
+        
+        # Every sheet chunk draws from its own stream, keyed by (sheet index, chunk index) under the
+        # root seed, so the output is identical however the chunks are spread across workers
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.rng = self.stream(len(self.SHEETS))
+        
+        self.num_employees = self.scaled(self.BASE_EMPLOYEES)
+        self.num_training_records = self.scaled(self.BASE_TRAINING_RECORDS)
+        self.num_meetings = self.scaled(self.BASE_MEETINGS)
+        self.num_projects = self.scaled(self.BASE_PROJECTS)
+        
+        # Onboarding task counts (8-12 per employee) are drawn up front so any employee range
+        # knows its first Task_ID without generating the rows before it
+        self.onboarding_task_counts = self.rng.integers(8, 13, self.num_employees).astype(np.int8)
+        self.onboarding_task_offsets = np.concatenate([[0], np.cumsum(self.onboarding_task_counts, dtype=np.int64)])
+        self.num_onboarding_tasks = int(self.onboarding_task_offsets[-1])
+        
+        self.categories = self.lookup_categories()
+        self.registry = KeyRegistry(self.num_employees, len(self.create_training_processes_table()), self.rng, skew=skew)
+        
+        # With timeline, Training_Status and Onboarding_Tasks are snapshots of a simulated event
+        # history instead of independent random draws, and the events are written out as well
+        self.timeline = EventTimelineSimulator(self) if timeline else None
+        
+        if generate:
+            self.generate_comprehensive_system()
+    
+    @classmethod
+    def tables_with_parents(cls, tables=None):
+        """The requested sheets plus the parents their foreign keys point at, in generation order"""
+        all_sheets = [name for name, _, _ in cls.SHEETS]
+        if tables is None:
+            return all_sheets
+        for name in tables:
+            if name not in all_sheets:
+                raise ValueError(f"Unknown table {name!r}; choose from {', '.join(all_sheets)}")
+        
+        selected = set(tables)
+        for name in tables:
+            selected.update(parent for _, parent in FOREIGN_KEYS.get(name, []))
+        return [name for name in all_sheets if name in selected]
+    
+    def scaled(self, base_rows):
+        """Row count for a table whose size at scale=1 is base_rows"""
+        return max(1, int(round(base_rows * self.scale)))
+    
+    def dataset_info(self):
+        """Parameters DatasetClockAdvancer needs to rebuild this run's key registry and random streams"""
+        return {'as_of': self.as_of.date().isoformat(), 'seed': self.seed, 'entropy': self.seed_sequence.entropy,
+                'scale': self.scale, 'skew': self.registry.skew}
+    
+    def stream(self, *key):
+        """Independent random Generator for the given spawn key under the root seed"""
+        return np.random.default_rng(np.random.SeedSequence(self.seed_sequence.entropy, spawn_key=key))
+    
+    def lookup_categories(self):
+        """Allowed values per Lookup_Values category, in display order"""
+        lookup = self.create_lookup_values_table().sort_values(['Category', 'Display_Order'], kind='stable')
+        return {category: list(group['Value']) for category, group in lookup.groupby('Category', sort=False)}
+    
+    def choice(self, rng, values, size):
+        """Random draw of size labels from values, as a Categorical built straight from random codes"""
+        return pd.Categorical.from_codes(rng.integers(0, len(values), size, dtype=np.int8), categories=values)
+    
+    def constant(self, value, size):
+        """A column repeating one label, stored as a single-category Categorical"""
+        return pd.Categorical.from_codes(np.zeros(size, dtype=np.int8), categories=[value])
+    
+    def random_days(self, rng, low, high, size):
+        """Array of random whole-day offsets in [low, high]"""
+        return rng.integers(low, high + 1, size).astype('timedelta64[D]')
+    
+    def output_path(self, fmt):
+        """Where a format is written: a .xlsx/.sqlite file, or a directory of per-sheet files, next to file_path"""
+        base = os.path.splitext(self.file_path)[0]
+        if fmt in ('xlsx', 'sqlite'):
+            return base + WRITERS[fmt].extension
+        return base
+    
+    def event_log_path(self):
+        """Where the timeline event log is written, next to file_path"""
+        return os.path.splitext(self.file_path)[0] + '_events.csv'
+    
+    def summary_path(self):
+        """Where the summary statistics are written as JSON, next to file_path"""
+        return os.path.splitext(self.file_path)[0] + '_summary.json'
+    
+    def sheet_index(self, sheet_name):
+        """Position of sheet_name in SHEETS, which also keys its random streams"""
+        for index, (name, _, _) in enumerate(self.SHEETS):
+            if name == sheet_name:
+                return index
+        raise KeyError(sheet_name)
+    
+    def chunk_plan(self, sheet_name):
+        """List of (chunk_index, start, stop) row ranges for a sheet; fixed tables are one (0, None, None) chunk"""
+        count_attr = self.SHEETS[self.sheet_index(sheet_name)][2]
+        if count_attr is None:
+            return [(0, None, None)]
+        
+        total = getattr(self, count_attr)
+        step = max(1, self.chunk_size // self.ROWS_PER_UNIT.get(sheet_name, 1))
+        return [(index, start, min(start + step, total)) for index, start in enumerate(range(0, total, step))]
+    
+    def build_chunk(self, sheet_name, chunk_index, start, stop):
+        """Build one chunk of a sheet from that chunk's own random stream"""
+        sheet_index = self.sheet_index(sheet_name)
+        builder_name = self.SHEETS[sheet_index][1]
+        builder = getattr(self, builder_name)
+        with self.trace.span(builder_name, sheet=sheet_name, chunk=chunk_index) as span:
+            if start is None:
+                df = builder()
+            else:
+                df = builder(start, stop, rng=self.stream(sheet_index, chunk_index))
+            span.set(rows=len(df))
+        return df
+    
+    def iter_table_chunks(self, sheet_name, executor=None, materialize=True):
+        """Yield one sheet's rows in order as DataFrames of about chunk_size rows, keys as strings with materialize"""
+        plan = self.chunk_plan(sheet_name)
+        if executor is None:
+            for chunk in plan:
+                df = self.build_chunk(sheet_name, *chunk)
+                yield self.registry.materialize(df) if materialize else df
+            return
+        
+        # Keep a bounded window of chunks in flight and hand them back in submission order, so
+        # memory stays proportional to the worker count rather than the table size
+        pending = deque()
+        for chunk in plan:
+            pending.append(executor.submit(build_chunk_in_worker, sheet_name, *chunk, materialize))
+            if len(pending) > 2 * self.workers:
+                df, spans = pending.popleft().result()
+                self.trace.extend(spans)
+                yield df
+        while pending:
+            df, spans = pending.popleft().result()
+            self.trace.extend(spans)
+            yield df
     
     def generate_comprehensive_system(self):
         """Generate the complete employee management system with sample data"""
         print("Generating Comprehensive Employee Management System...")
         
-        # Generate all data tables
-        df_employees = self.create_employees_table()
-        df_training_processes = self.create_training_processes_table()
-        df_training_status = self.create_training_status_table()
-        df_one_on_ones = self.create_one_on_ones_table()
-        df_projects = self.create_projects_table()
-        df_onboarding_tasks = self.create_onboarding_tasks_table()
-        df_lookup_values = self.create_lookup_values_table()
-        
-        # Write all sheets to Excel
-        with pd.ExcelWriter(self.file_path, engine='openpyxl') as writer:
-            df_employees.to_excel(writer, sheet_name='Employees', index=False)
-            df_training_processes.to_excel(writer, sheet_name='Training_Processes', index=False)
-            df_training_status.to_excel(writer, sheet_name='Training_Status', index=False)
-            df_one_on_ones.to_excel(writer, sheet_name='One_on_Ones', index=False)
-            df_projects.to_excel(writer, sheet_name='Projects', index=False)
-            df_onboarding_tasks.to_excel(writer, sheet_name='Onboarding_Tasks', index=False)
-            df_lookup_values.to_excel(writer, sheet_name='Lookup_Values', index=False)
-        
-        print(f"✅ Complete system generated: {self.file_path}")
+        executor = None
+        if self.workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=(self,))
+        
+        # Generate each sheet chunk by chunk and stream every chunk straight into all requested
+        # outputs, so the data is generated once and only a few chunks are ever held in memory
+        timestamp = self.as_of if self.seed is not None else None
+        writers = []
+        event_log = None
+        # Each sheet's SheetSummary is built from the same chunks as they stream past
+        self.summaries = {}
+        trace = self.trace
+        try:
+            for fmt in self.formats:
+                writers.append(WRITERS[fmt](self.output_path(fmt), timestamp=timestamp))
+            if self.timeline is not None:
+                event_log = self.event_log_path()
+                with trace.span('write_event_log') as span:
+                    self.timeline.write_event_log(event_log, self.tables)
+                    span.set(bytes=os.path.getsize(event_log))
+            for sheet_name in self.tables:
+                if self.timeline is not None and sheet_name in EventTimelineSimulator.SNAPSHOT_SHEETS:
+                    chunks = (self.registry.materialize(df) for df in self.timeline.iter_snapshot_chunks(sheet_name))
+                else:
+                    chunks = self.iter_table_chunks(sheet_name, executor)
+                for df in chunks:
+                    for fmt, writer in zip(self.formats, writers):
+                        with trace.span('write_chunk', sheet=sheet_name, format=fmt, rows=len(df)):
+                            writer.write_chunk(sheet_name, df)
+                    if sheet_name not in self.summaries:
+                        self.summaries[sheet_name] = SheetSummary(sheet_name, list(df.columns), self.as_of)
+                    with trace.span('summarize', sheet=sheet_name, rows=len(df)):
+                        self.summaries[sheet_name].add_frame(df)
+            for fmt, writer in zip(self.formats, writers):
+                # For xlsx this is most of the Excel write: the workbook is assembled and zipped on close
+                with trace.span('close_writer', format=fmt) as span:
+                    if isinstance(writer, SqliteWriter):
+                        writer.write_info(self.dataset_info())
+                    writer.close()
+                    path = self.output_path(fmt)
+                    if os.path.isfile(path):
+                        span.set(bytes=os.path.getsize(path))
+        except BaseException:
+            # No half-written outputs are left behind to pass for a complete dataset
+            for writer in writers:
+                try:
+                    writer.discard()
+                except Exception:
+                    pass
+            if event_log is not None:
+                remove_files([event_log])
+            raise
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            if self.timeline is not None:
+                self.timeline.close()
+        
+        for fmt in self.formats:
+            print(f"✅ Complete system generated: {self.output_path(fmt)} ({fmt})")
+        if self.timeline is not None:
+            print(f"✅ Event log written: {self.event_log_path()}")
+        self.write_summary(self.summary_path())
         self.print_summary()
+        if trace.enabled:
+            self.print_timings()
     
-    def create_employees_table(self):
+    def create_employees_table(self, start=0, stop=None, rng=None):
         """Create comprehensive employees table"""
-        departments = ['Operations', 'Finance', 'Sales', 'Legal', 'HR', 'IT', 'Marketing']
         positions = ['Analyst', 'Specialist', 'Manager', 'Director', 'Coordinator', 'Associate']
+        manager_codes = np.array([2, 3], dtype=np.int8)
+        other_codes = np.array([0, 1, 4, 5], dtype=np.int8)
+        
+        stop = self.num_employees if stop is None else stop
+        rng = self.rng if rng is None else rng
+        n = stop - start
+        numbers = np.arange(start + 1, stop + 1, dtype=np.int32)
+        
+        # Emails are numbered past the first 20 employees so addresses stay unique at any scale; names
+        # past the 400th carry the same number
+        names = self.registry.employee_names(numbers)
+        email_names = np.asarray([name.lower().replace(' ', '.') for name in KeyRegistry.NAME_CATEGORIES], dtype=object)
+        email_suffix = np.where(numbers <= 20, '', numbers.astype(str)).astype(object)
+        emails = email_names[KeyRegistry.name_codes(numbers)] + email_suffix + '@company.com'
+        
+        # Registry managers hold the managerial positions; one who draws themselves as manager
+        # reports to the next manager instead
+        managers = self.registry.manager_numbers
+        is_manager = self.registry.is_manager[numbers]
+        manager = self.registry.sample_managers(rng, n)
+        self_managed = manager == numbers
+        if len(managers) > 1 and self_managed.any():
+            manager[self_managed] = managers[(np.searchsorted(managers, manager[self_managed]) + 1) % len(managers)]
         
         employees_data = {
-            'Employee_ID': [f'EMP{str(i).zfill(3)}' for i in range(1, 21)],
-            'Employee_Name': [
-                'John Smith', 'Sarah Johnson', 'Mike Brown', 'Lisa Davis', 'Tom Wilson',
-                'Anna Garcia', 'David Lee', 'Emma Martinez', 'Chris Taylor', 'Maya Patel',
-                'James Anderson', 'Jessica White', 'Robert Clark', 'Amy Rodriguez', 'Kevin Chen',
-                'Nicole Thompson', 'Daniel Kim', 'Olivia Jackson', 'Ryan Murphy', 'Sophia Liu'
-            ],
-            'Email': [f'{name.lower().replace(" ", ".")}@company.com' for name in [
-                'John Smith', 'Sarah Johnson', 'Mike Brown', 'Lisa Davis', 'Tom Wilson',
-                'Anna Garcia', 'David Lee', 'Emma Martinez', 'Chris Taylor', 'Maya Patel',
-                'James Anderson', 'Jessica White', 'Robert Clark', 'Amy Rodriguez', 'Kevin Chen',
-                'Nicole Thompson', 'Daniel Kim', 'Olivia Jackson', 'Ryan Murphy', 'Sophia Liu'
-            ]],
-            'Department': [random.choice(departments) for _ in range(20)],
-            'Position': [random.choice(positions) for _ in range(20)],
-            'Hire_Date': [datetime.now() - timedelta(days=random.randint(30, 1095)) for _ in range(20)],
-            'Manager': [
-                'Jane Doe', 'Robert Clark', 'Amy White', 'David Lee', 'Jane Doe',
-                'Robert Clark', 'Amy White', 'Jane Doe', 'David Lee', 'Amy White',
-                'Jane Doe', 'Robert Clark', 'David Lee', 'Amy White', 'Jane Doe',
-                'Robert Clark', 'Amy White', 'Jane Doe', 'David Lee', 'Amy White'
-            ],
-            'Employment_Status': ['Active'] * 20,
-            'Onboarding_Status': [random.choice(['Completed', 'In Progress', 'Not Started']) for _ in range(20)],
-            'Last_One_on_One_Date': [datetime.now() - timedelta(days=random.randint(1, 90)) for _ in range(20)],
-            'Performance_Rating': [random.choice(['Exceeds', 'Meets', 'Below', 'New Employee']) for _ in range(20)],
-            'Location': [random.choice(['Remote', 'Office', 'Hybrid']) for _ in range(20)]
+            'Employee_ID': numbers,
+            'Employee_Name': names,
+            'Email': emails,
+            'Department': self.choice(rng, self.categories['Department'], n),
+            'Position': pd.Categorical.from_codes(
+                np.where(is_manager, manager_codes[rng.integers(0, 2, n)], other_codes[rng.integers(0, 4, n)]),
+                categories=positions),
+            'Hire_Date': self.now - self.random_days(rng, 30, self.history_days, n),
+            'Manager': manager,
+            'Employment_Status': self.constant('Active', n),
+            'Onboarding_Status': self.choice(rng, ['Completed', 'In Progress', 'Not Started'], n),
+            'Last_One_on_One_Date': self.now - self.random_days(rng, 1, 90, n),
+            'Performance_Rating': self.choice(rng, self.categories['Performance_Rating'], n),
+            'Location': self.choice(rng, ['Remote', 'Office', 'Hybrid'], n)
         }
         
         return pd.DataFrame(employees_data)
@@ -116,208 +763,206 @@ class EmployeeManagementSystemGenerator:
         
         return pd.DataFrame(training_data)
     
-    def create_training_status_table(self):
+    def create_training_status_table(self, start=0, stop=None, rng=None):
         """Create training status tracking table"""
-        # Generate 50 training records across employees
-        training_records = []
+        stop = self.num_training_records if stop is None else stop
+        rng = self.rng if rng is None else rng
+        n = stop - start
+        nat = np.datetime64('NaT')
         
-        for i in range(1, 51):
-            employee_id = f'EMP{str(random.randint(1, 20)).zfill(3)}'
-            process_id = f'PROC{str(random.randint(1, 20)).zfill(3)}'
-            status = random.choice(['Completed', 'In Progress', 'Planned', 'On Hold'])
-            
-            start_date = None
-            completion_date = None
-            planned_completion = datetime.now() + timedelta(days=random.randint(1, 180))
-            
-            if status in ['Completed', 'In Progress']:
-                start_date = datetime.now() - timedelta(days=random.randint(1, 90))
-                if status == 'Completed':
-                    completion_date = start_date + timedelta(days=random.randint(1, 30))
-                    planned_completion = completion_date
-            
-            progress = 100 if status == 'Completed' else random.randint(0, 90) if status == 'In Progress' else 0
-            
-            training_records.append({
-                'Record_ID': i,
-                'Employee_ID': employee_id,
-                'Process_ID': process_id,
-                'Training_Status': status,
-                'Start_Date': start_date,
-                'Completion_Date': completion_date,
-                'Planned_Completion': planned_completion,
-                'Progress_Percentage': progress,
-                'Assigned_By': random.choice(['Jane Doe', 'Robert Clark', 'Amy White', 'David Lee']),
-                'Priority': random.choice(['High', 'Medium', 'Low']),
-                'Notes': random.choice([
-                    'Excellent performance', 'On track', 'Needs support', 'Quick learner',
-                    'Requires additional time', 'Meeting expectations', 'Outstanding progress',
-                    'Slow start but improving', 'Complex material', 'Exceeding expectations'
-                ])
-            })
+        status = self.choice(rng, self.categories['Training_Status'], n)
+        completed = status == 'Completed'
+        in_progress = status == 'In Progress'
+        
+        start_date = np.where(completed | in_progress, self.now - self.random_days(rng, 1, 90, n), nat)
+        completion_date = np.where(completed, start_date + self.random_days(rng, 1, 30, n), nat)
+        planned_completion = np.where(completed, completion_date, self.now + self.random_days(rng, 1, 180, n))
+        progress = np.where(completed, 100, np.where(in_progress, rng.integers(0, 91, n), 0)).astype(np.int8)
+        
+        training_records = {
+            'Record_ID': np.arange(start + 1, stop + 1, dtype=np.int32),
+            'Employee_ID': self.registry.sample_employees(rng, n),
+            'Process_ID': self.registry.sample_processes(rng, n),
+            'Training_Status': status,
+            'Start_Date': start_date,
+            'Completion_Date': completion_date,
+            'Planned_Completion': planned_completion,
+            'Progress_Percentage': progress,
+            'Assigned_By': self.registry.sample_managers(rng, n),
+            'Priority': self.choice(rng, self.categories['Priority'], n),
+            'Notes': self.choice(rng, [
+                'Excellent performance', 'On track', 'Needs support', 'Quick learner',
+                'Requires additional time', 'Meeting expectations', 'Outstanding progress',
+                'Slow start but improving', 'Complex material', 'Exceeding expectations'
+            ], n)
+        }
         
         return pd.DataFrame(training_records)
     
-    def create_one_on_ones_table(self):
+    def create_one_on_ones_table(self, start=0, stop=None, rng=None):
         """Create one-on-one meetings tracking table"""
-        meeting_types = ['Weekly Check-in', 'Monthly Review', 'Quarterly Review', 'Goal Setting', 'Performance Review']
+        stop = self.num_meetings if stop is None else stop
+        rng = self.rng if rng is None else rng
+        n = stop - start
+        meeting_date = self.now - self.random_days(rng, 1, 180, n)
         
-        one_on_one_records = []
-        
-        for i in range(1, 31):
-            employee_id = f'EMP{str(random.randint(1, 20)).zfill(3)}'
-            meeting_date = datetime.now() - timedelta(days=random.randint(1, 180))
-            
-            one_on_one_records.append({
-                'Meeting_ID': f'MEET{str(i).zfill(3)}',
-                'Employee_ID': employee_id,
-                'Manager_Name': random.choice(['Jane Doe', 'Robert Clark', 'Amy White', 'David Lee']),
-                'Meeting_Date': meeting_date,
-                'Meeting_Type': random.choice(meeting_types),
-                'Duration_Minutes': random.choice([30, 45, 60]),
-                'Goals_Discussed': random.choice([
-                    'Career development goals', 'Project objectives', 'Skill improvement',
-                    'Work-life balance', 'Team collaboration', 'Process improvements'
-                ]),
-                'Challenges_Raised': random.choice([
-                    'Time management', 'Resource constraints', 'Technical difficulties',
-                    'Communication barriers', 'Workload concerns', 'Training gaps'
-                ]),
-                'Action_Items': random.choice([
-                    'Complete training module', 'Schedule follow-up meeting', 'Research new tools',
-                    'Join project team', 'Attend workshop', 'Prepare presentation'
-                ]),
-                'Employee_Satisfaction': random.randint(7, 10),
-                'Next_Meeting_Date': meeting_date + timedelta(days=random.randint(7, 30)),
-                'Meeting_Status': random.choice(['Completed', 'Scheduled', 'Cancelled']),
-                'Notes': 'Regular check-in meeting to discuss progress and challenges.'
-            })
+        one_on_one_records = {
+            'Meeting_ID': np.arange(start + 1, stop + 1, dtype=np.int32),
+            'Employee_ID': self.registry.sample_employees(rng, n),
+            'Manager_Name': self.registry.sample_managers(rng, n),
+            'Meeting_Date': meeting_date,
+            'Meeting_Type': self.choice(rng, self.categories['Meeting_Type'], n),
+            'Duration_Minutes': rng.choice(np.array([30, 45, 60], dtype=np.int16), n),
+            'Goals_Discussed': self.choice(rng, [
+                'Career development goals', 'Project objectives', 'Skill improvement',
+                'Work-life balance', 'Team collaboration', 'Process improvements'
+            ], n),
+            'Challenges_Raised': self.choice(rng, [
+                'Time management', 'Resource constraints', 'Technical difficulties',
+                'Communication barriers', 'Workload concerns', 'Training gaps'
+            ], n),
+            'Action_Items': self.choice(rng, [
+                'Complete training module', 'Schedule follow-up meeting', 'Research new tools',
+                'Join project team', 'Attend workshop', 'Prepare presentation'
+            ], n),
+            'Employee_Satisfaction': rng.integers(7, 11, n, dtype=np.int8),
+            'Next_Meeting_Date': meeting_date + self.random_days(rng, 7, 30, n),
+            'Meeting_Status': self.choice(rng, ['Completed', 'Scheduled', 'Cancelled'], n),
+            'Notes': self.constant('Regular check-in meeting to discuss progress and challenges.', n)
+        }
         
         return pd.DataFrame(one_on_one_records)
     
-    def create_projects_table(self):
+    def create_projects_table(self, start=0, stop=None, rng=None):
         """Create project tracking table"""
-        project_names = [
+        project_names = np.array([
             'Customer Portal Upgrade', 'Process Automation', 'Data Migration', 'Mobile App Development',
             'Security Audit', 'Website Redesign', 'CRM Implementation', 'Training Platform',
             'Quality Management System', 'Employee Onboarding Portal', 'Analytics Dashboard',
             'Inventory Management', 'Customer Feedback System', 'Document Management',
             'Performance Tracking Tool'
-        ]
+        ])
         
-        project_records = []
+        stop = self.num_projects if stop is None else stop
+        rng = self.rng if rng is None else rng
+        n = stop - start
+        idx = np.arange(start, stop)
+        start_date = self.now - self.random_days(rng, 30, 365, n)
         
-        for i, project_name in enumerate(project_names, 1):
-            start_date = datetime.now() - timedelta(days=random.randint(30, 365))
-            due_date = start_date + timedelta(days=random.randint(30, 180))
-            
-            project_records.append({
-                'Project_ID': f'PROJ{str(i).zfill(3)}',
-                'Project_Name': project_name,
-                'Employee_ID': f'EMP{str(random.randint(1, 20)).zfill(3)}',
-                'Project_Manager': random.choice(['Jane Doe', 'Robert Clark', 'Amy White', 'David Lee']),
-                'Status': random.choice(['Planning', 'In Progress', 'On Hold', 'Completed', 'Cancelled']),
-                'Priority': random.choice(['High', 'Medium', 'Low']),
-                'Start_Date': start_date,
-                'Due_Date': due_date,
-                'Progress_Percentage': random.randint(0, 100),
-                'Budget': random.randint(5000, 100000),
-                'Department': random.choice(['IT', 'Operations', 'Finance', 'HR', 'Marketing']),
-                'Last_Update': datetime.now() - timedelta(days=random.randint(1, 30)),
-                'Risk_Level': random.choice(['Low', 'Medium', 'High']),
-                'Team_Size': random.randint(2, 8),
-                'Notes': 'Project progressing according to schedule.'
-            })
+        # Past the 15 base projects, names repeat with a phase number ("Data Migration 2")
+        phase = idx // len(project_names)
+        names = np.char.add(project_names[idx % len(project_names)],
+                            np.where(phase == 0, '', np.char.add(' ', (phase + 1).astype(str))))
+        
+        project_records = {
+            'Project_ID': (idx + 1).astype(np.int32),
+            'Project_Name': names,
+            'Employee_ID': self.registry.sample_employees(rng, n),
+            'Project_Manager': self.registry.sample_managers(rng, n),
+            'Status': self.choice(rng, self.categories['Project_Status'], n),
+            'Priority': self.choice(rng, self.categories['Priority'], n),
+            'Start_Date': start_date,
+            'Due_Date': start_date + self.random_days(rng, 30, 180, n),
+            'Progress_Percentage': rng.integers(0, 101, n, dtype=np.int8),
+            'Budget': rng.integers(5000, 100001, n, dtype=np.int32),
+            'Department': self.choice(rng, ['IT', 'Operations', 'Finance', 'HR', 'Marketing'], n),
+            'Last_Update': self.now - self.random_days(rng, 1, 30, n),
+            'Risk_Level': self.choice(rng, ['Low', 'Medium', 'High'], n),
+            'Team_Size': rng.integers(2, 9, n, dtype=np.int8),
+            'Notes': self.constant('Project progressing according to schedule.', n)
+        }
         
         return pd.DataFrame(project_records)
     
-    def create_onboarding_tasks_table(self):
-        """Create onboarding tasks tracking table"""
-        onboarding_tasks = [
-            'Complete paperwork', 'IT setup and accounts', 'Office tour', 'Meet team members',
-            'Review company handbook', 'Safety training', 'Department orientation', 'Assign mentor',
-            'Set up workspace', 'First week check-in', 'Complete required training',
-            'Review job description', 'Set initial goals', '30-day review', '60-day review', '90-day review'
-        ]
-        
-        onboarding_records = []
-        task_id = 1
-        
-        # Create tasks for employees with onboarding status
-        for emp_num in range(1, 21):
-            employee_id = f'EMP{str(emp_num).zfill(3)}'
-            
-            # Assign 8-12 random tasks per employee
-            num_tasks = random.randint(8, 12)
-            selected_tasks = random.sample(onboarding_tasks, num_tasks)
-            
-            for task_name in selected_tasks:
-                due_date = datetime.now() + timedelta(days=random.randint(-30, 60))
-                
-                onboarding_records.append({
-                    'Task_ID': f'TASK{str(task_id).zfill(3)}',
-                    'Employee_ID': employee_id,
-                    'Task_Name': task_name,
-                    'Department': random.choice(['HR', 'IT', 'Operations', 'All']),
-                    'Due_Date': due_date,
-                    'Status': random.choice(['Completed', 'In Progress', 'Pending', 'Overdue']),
-                    'Assigned_To': random.choice(['HR Team', 'IT Team', 'Manager', 'Mentor']),
-                    'Completion_Date': due_date - timedelta(days=random.randint(1, 5)) if random.choice([True, False]) else None,
-                    'Priority': random.choice(['High', 'Medium', 'Low']),
-                    'Estimated_Hours': random.choice([0.5, 1, 2, 4, 8]),
-                    'Notes': random.choice([
-                        'Standard onboarding task', 'Critical for first week', 'Department specific',
-                        'Requires manager approval', 'Self-paced learning', 'Scheduled session'
-                    ])
-                })
-                task_id += 1
+    def create_onboarding_tasks_table(self, start=0, stop=None, rng=None):
+        """Create onboarding tasks tracking table for employees start..stop (0-based)"""
+        onboarding_tasks = self.ONBOARDING_TASKS
+        
+        stop = self.num_employees if stop is None else stop
+        rng = self.rng if rng is None else rng
+        num_employees = stop - start
+        
+        # Assign 8-12 distinct random tasks per employee: rank a random key per (employee, task)
+        # and keep each employee's lowest-ranked num_tasks entries
+        num_tasks = self.onboarding_task_counts[start:stop]
+        task_order = np.argsort(rng.random((num_employees, len(onboarding_tasks))), axis=1)
+        keep = np.arange(len(onboarding_tasks)) < num_tasks[:, None]
+        task_index = task_order[keep]
+        employee_num = np.repeat(np.arange(start + 1, stop + 1, dtype=np.int32), num_tasks)
+        first_task_id = int(self.onboarding_task_offsets[start]) + 1
+        
+        n = len(task_index)
+        due_date = self.now + rng.integers(-30, 61, n).astype('timedelta64[D]')
+        completed_early = rng.random(n) < 0.5
+        
+        onboarding_records = {
+            'Task_ID': np.arange(first_task_id, first_task_id + n, dtype=np.int32),
+            'Employee_ID': employee_num,
+            'Task_Name': pd.Categorical.from_codes(task_index.astype(np.int8), categories=onboarding_tasks),
+            'Department': self.choice(rng, ['HR', 'IT', 'Operations', 'All'], n),
+            'Due_Date': due_date,
+            'Status': self.choice(rng, ['Completed', 'In Progress', 'Pending', 'Overdue'], n),
+            'Assigned_To': self.choice(rng, ['HR Team', 'IT Team', 'Manager', 'Mentor'], n),
+            'Completion_Date': np.where(completed_early, due_date - self.random_days(rng, 1, 5, n), np.datetime64('NaT')),
+            'Priority': self.choice(rng, self.categories['Priority'], n),
+            'Estimated_Hours': rng.choice(np.array([0.5, 1, 2, 4, 8], dtype=np.float32), n),
+            'Notes': self.choice(rng, [
+                'Standard onboarding task', 'Critical for first week', 'Department specific',
+                'Requires manager approval', 'Self-paced learning', 'Scheduled session'
+            ], n)
+        }
         
         return pd.DataFrame(onboarding_records)
     
     def create_lookup_values_table(self):
         """Create lookup values for form dropdowns"""
-        lookup_data = {
-            'Category': [
-                'Department', 'Department', 'Department', 'Department', 'Department', 'Department', 'Department',
-                'Training_Status', 'Training_Status', 'Training_Status', 'Training_Status',
-                'Project_Status', 'Project_Status', 'Project_Status', 'Project_Status', 'Project_Status',
-                'Priority', 'Priority', 'Priority',
-                'Performance_Rating', 'Performance_Rating', 'Performance_Rating', 'Performance_Rating',
-                'Meeting_Type', 'Meeting_Type', 'Meeting_Type', 'Meeting_Type', 'Meeting_Type'
-            ],
-            'Value': [
-                'Operations', 'Finance', 'Sales', 'Legal', 'HR', 'IT', 'Marketing',
-                'Completed', 'In Progress', 'Planned', 'On Hold',
-                'Planning', 'In Progress', 'On Hold', 'Completed', 'Cancelled',
-                'High', 'Medium', 'Low',
-                'Exceeds', 'Meets', 'Below', 'New Employee',
-                'Weekly Check-in', 'Monthly Review', 'Quarterly Review', 'Goal Setting', 'Performance Review'
-            ],
-            'Display_Order': [
-                1, 2, 3, 4, 5, 6, 7,
-                1, 2, 3, 4,
-                1, 2, 3, 4, 5,
-                1, 2, 3,
-                1, 2, 3, 4,
-                1, 2, 3, 4, 5
-            ]
+        return pd.DataFrame({
+            'Category': [category for category, values in LOOKUP_VALUES.items() for _ in values],
+            'Value': [value for values in LOOKUP_VALUES.values() for value in values],
+            'Display_Order': [order for values in LOOKUP_VALUES.values() for order in range(1, len(values) + 1)],
+        })
+    
+    def summary(self):
+        """The summary statistics of the generated sheets, as written to summary_path()"""
+        return {
+            'as_of': self.as_of.date().isoformat(),
+            'sheets': {sheet_name: summary.result() for sheet_name, summary in self.summaries.items()},
         }
-        
-        return pd.DataFrame(lookup_data)
+    
+    def write_summary(self, path):
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(self.summary(), handle, indent=2)
+            handle.write('\n')
     
     def print_summary(self):
         """Print system summary"""
+        sheets = self.summary()['sheets']
         print("\n" + "="*60)
         print("📊 EMPLOYEE MANAGEMENT SYSTEM SUMMARY")
         print("="*60)
-        print("📁 Excel Sheets Created:")
-        print("   • Employees (20 sample employees)")
-        print("   • Training_Processes (20 training programs)")
-        print("   • Training_Status (50 training records)")
-        print("   • One_on_Ones (30 meeting records)")
-        print("   • Projects (15 active projects)")
-        print("   • Onboarding_Tasks (180+ onboarding tasks)")
-        print("   • Lookup_Values (dropdown options)")
+        print("📁 Sheets Created:")
+        for sheet_name, result in sheets.items():
+            print(f"   • {sheet_name} ({result['rows']:,} rows)")
+        
+        def top(counts, limit=4):
+            shown = ", ".join(f"{label} {count:,}" for label, count in itertools.islice(counts.items(), limit))
+            return shown + (", ..." if len(counts) > limit else "")
+        
+        print("\n📈 Statistics:")
+        if 'Employees' in sheets:
+            print(f"   • Employees by department: {top(sheets['Employees']['Department'])}")
+        if 'Training_Status' in sheets:
+            training = sheets['Training_Status']
+            print(f"   • Training: {top(training['Training_Status'])}; "
+                  f"average progress {training['mean Progress_Percentage'] or 0:.1f}%")
+        if 'Projects' in sheets:
+            budgets = sheets['Projects']['Budget by Department']
+            print(f"   • Projects: {top(sheets['Projects']['Status'])}; budget "
+                  + ", ".join(f"{label} ${total:,.0f}" for label, total in budgets.items()))
+        if 'Onboarding_Tasks' in sheets:
+            tasks = sheets['Onboarding_Tasks']
+            print(f"   • Onboarding tasks: {top(tasks['Status'])}; {tasks['overdue']:,} overdue")
+        print(f"   • Full statistics: {self.summary_path()}")
         print("\n🔧 Ready for:")
         print("   • Upload to Excel Online")
         print("   • Power Automate integration")
@@ -325,8 +970,516 @@ class EmployeeManagementSystemGenerator:
         print("   • Microsoft Forms connection")
         print("="*60)
 
+    def print_timings(self):
+        """Print the time spent per traced phase, summed over its chunks"""
+        print("\n⏱  Timings:")
+        for name, total in self.trace.totals().items():
+            counts = f", {total['rows']:,} rows" if total['rows'] else ""
+            counts += f", {total['bytes'] / 1e6:,.1f} MB" if total['bytes'] else ""
+            print(f"   • {name}: {total['ms']:,.0f} ms over {total['count']:,} call(s){counts}")
+
+class EventTimelineSimulator:
+    """Simulate each employee's training and onboarding history as a time-ordered event stream"""
+    SNAPSHOT_SHEETS = ['Training_Status', 'Onboarding_Tasks']
+    RECORD_TYPES = {'Training_Status': 'Training', 'Onboarding_Tasks': 'Onboarding'}
+    EVENT_COLUMNS = ['Event_Date', 'Employee_ID', 'Record_Type', 'Record_ID', 'Event_Type',
+                     'Status', 'Progress_Percentage', 'Item', 'Due_Date']
+    EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+    
+    # Simulation rates: training assignments per employee-year, chance a progress check puts the
+    # training on hold, and the day ranges each step waits before the next
+    TRAININGS_PER_YEAR = 2.0
+    HOLD_PROBABILITY = 0.05
+    TRAINING_START_DAYS = (0, 30)
+    TRAINING_PLANNED_DAYS = (30, 180)
+    TRAINING_CHECK_DAYS = (5, 10)
+    TRAINING_STEP_PERCENT = (5, 25)
+    TRAINING_HOLD_DAYS = (7, 60)
+    TASK_DUE_DAYS = (7, 90)
+    TASK_START_DAYS = (0, 14)
+    TASK_DURATION_DAYS = (1, 30)
+    
+    def __init__(self, generator):
+        self.generator = generator
+        self.end = generator.as_of.date().toordinal()
+        # Random streams past those of the sheets and of DatasetClockAdvancer
+        self.event_stream = len(generator.SHEETS) + 2
+        self.attribute_stream = len(generator.SHEETS) + 3
+        # Snapshot sheet name -> temporary file of pickled DataFrames, filled by write_event_log
+        self.spools = {}
+    
+    def __getstate__(self):
+        # Open files don't pickle, and worker processes never read the spooled snapshots
+        return dict(self.__dict__, spools={})
+    
+    def iter_employee_events(self):
+        """Yield (employee number, events) per employee in Employee_ID order, each list in date order"""
+        # An event is (day ordinal, sequence, record type, record number, event type, status, progress, item,
+        # due day ordinal); the item is a process number or a task name
+        next_record = 1
+        for chunk_index, start, stop in self.generator.chunk_plan('Employees'):
+            # Hire dates come from the Employees sheet itself, so the history lines up with it
+            hire_dates = self.generator.build_chunk('Employees', chunk_index, start, stop)['Hire_Date']
+            hire_days = hire_dates.to_numpy().astype('datetime64[D]').astype(np.int64) + self.EPOCH_ORDINAL
+            rnd = random.Random(int(self.generator.stream(self.event_stream, chunk_index).integers(2**63)))
+            for number, hire_day in zip(range(start + 1, stop + 1), hire_days.tolist()):
+                events, next_record = self.employee_events(rnd, number, hire_day, next_record)
+                yield number, events
+    
+    def employee_events(self, rnd, number, hire_day, next_record):
+        """One employee's events in date order, and the next free training Record_ID"""
+        events = []
+        sequence = itertools.count()
+        end = self.end
+        
+        def emit(day, record_type, record, event_type, status, progress, item, due):
+            if day <= end:
+                events.append((day, next(sequence), record_type, record, event_type, status, progress, item, due))
+        
+        # Onboarding tasks keep the Task_IDs the generator reserves for this employee
+        first_task = int(self.generator.onboarding_task_offsets[number - 1]) + 1
+        count = int(self.generator.onboarding_task_counts[number - 1])
+        for task, name in enumerate(rnd.sample(self.generator.ONBOARDING_TASKS, count), first_task):
+            due = hire_day + rnd.randint(*self.TASK_DUE_DAYS)
+            started = hire_day + rnd.randint(*self.TASK_START_DAYS)
+            done = started + rnd.randint(*self.TASK_DURATION_DAYS)
+            emit(hire_day, 'Onboarding', task, 'assigned', 'Pending', 0, name, due)
+            emit(started, 'Onboarding', task, 'started', 'In Progress' if started <= due else 'Overdue', 0, name, due)
+            if done > due:
+                emit(due + 1, 'Onboarding', task, 'overdue', 'Overdue', 0, name, due)
+            emit(done, 'Onboarding', task, 'completed', 'Completed', 100, name, due)
+        
+        day = hire_day
+        rate = self.TRAININGS_PER_YEAR / 365
+        while True:
+            day += 1 + int(rnd.expovariate(rate))
+            if day > end:
+                break
+            record = next_record
+            next_record += 1
+            process = rnd.randint(1, self.generator.registry.num_processes)
+            planned = day + rnd.randint(*self.TRAINING_PLANNED_DAYS)
+            emit(day, 'Training', record, 'assigned', 'Planned', 0, process, planned)
+            
+            current = day + rnd.randint(*self.TRAINING_START_DAYS)
+            emit(current, 'Training', record, 'started', 'In Progress', 0, process, planned)
+            progress = 0
+            while current <= end:
+                current += rnd.randint(*self.TRAINING_CHECK_DAYS)
+                if rnd.random() < self.HOLD_PROBABILITY:
+                    emit(current, 'Training', record, 'on_hold', 'On Hold', progress, process, planned)
+                    current += rnd.randint(*self.TRAINING_HOLD_DAYS)
+                    emit(current, 'Training', record, 'resumed', 'In Progress', progress, process, planned)
+                    continue
+                progress = min(100, progress + rnd.randint(*self.TRAINING_STEP_PERCENT))
+                if progress == 100:
+                    emit(current, 'Training', record, 'completed', 'Completed', 100, process, planned)
+                    break
+                emit(current, 'Training', record, 'progress', 'In Progress', progress, process, planned)
+        
+        events.sort()
+        return events, next_record
+    
+    def write_event_log(self, path, sheets=()):
+        """Write the full event stream to path as an append-only CSV and spool the snapshot sheets"""
+        prefix = KeyRegistry.ID_PREFIXES
+        self.close()
+        sheets = [name for name in self.SNAPSHOT_SHEETS if name in sheets]
+        self.spools = {sheet_name: tempfile.TemporaryFile() for sheet_name in sheets}
+        pending = {sheet_name: [] for sheet_name in sheets}
+        blocks = dict.fromkeys(sheets, 0)
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.EVENT_COLUMNS)
+            for number, events in self.iter_employee_events():
+                employee = f"{prefix['Employee_ID']}{number:03d}"
+                writer.writerows(
+                    (date.fromordinal(day).isoformat(), employee, record_type,
+                     record if record_type == 'Training' else f"{prefix['Task_ID']}{record:03d}",
+                     event_type, status, progress,
+                     f"{prefix['Process_ID']}{item:03d}" if record_type == 'Training' else item,
+                     date.fromordinal(due).isoformat())
+                    for day, _, record_type, record, event_type, status, progress, item, due in events)
+                for sheet_name, rows in pending.items():
+                    for record, state in self.snapshot_rows(events, self.RECORD_TYPES[sheet_name]).items():
+                        rows.append((record, number, state))
+                    if len(rows) >= self.generator.chunk_size:
+                        self.spool(sheet_name, rows, blocks[sheet_name])
+                        pending[sheet_name] = []
+                        blocks[sheet_name] += 1
+        for sheet_name, rows in pending.items():
+            if rows:
+                self.spool(sheet_name, rows, blocks[sheet_name])
+    
+    def spool(self, sheet_name, rows, block):
+        pickle.dump(self.build_snapshot(sheet_name, rows, block), self.spools[sheet_name], pickle.HIGHEST_PROTOCOL)
+    
+    def snapshot_rows(self, events, record_type):
+        """Replay one employee's events into the final state of each of their records of record_type"""
+        records = {}
+        for day, _, kind, record, event_type, status, progress, item, due in events:
+            if kind != record_type:
+                continue
+            state = records.setdefault(record, {'item': item, 'due': due, 'start': None, 'completed': None})
+            state['status'] = status
+            state['progress'] = progress
+            if event_type == 'started':
+                state['start'] = day
+            elif event_type == 'completed':
+                state['completed'] = day
+        return records
+    
+    def dates(self, ordinals):
+        """datetime64[s] array from day ordinals, with None as NaT"""
+        days = np.array([-1 if day is None else day - self.EPOCH_ORDINAL for day in ordinals], dtype=np.int64)
+        return np.where(days >= 0, days.astype('datetime64[D]'), np.datetime64('NaT')).astype('datetime64[s]')
+    
+    def iter_snapshot_chunks(self, sheet_name):
+        """Yield a snapshot sheet spooled by write_event_log, in DataFrames of about chunk_size rows"""
+        with self.spools.pop(sheet_name) as spool:
+            spool.seek(0)
+            while True:
+                try:
+                    yield pickle.load(spool)
+                except EOFError:
+                    return
+    
+    def build_snapshot(self, sheet_name, rows, block):
+        builder = self.training_status_chunk if sheet_name == 'Training_Status' else self.onboarding_tasks_chunk
+        with self.generator.trace.span(builder.__name__, sheet=sheet_name, chunk=block, rows=len(rows)):
+            return builder(rows, self.generator.stream(self.attribute_stream, self.generator.sheet_index(sheet_name), block))
+    
+    def close(self):
+        """Drop snapshot sheets spooled but not read"""
+        for spool in self.spools.values():
+            spool.close()
+        self.spools = {}
+    
+    def training_status_chunk(self, rows, rng):
+        """Training_Status rows for (Record_ID, employee, final state) entries"""
+        gen = self.generator
+        n = len(rows)
+        states = [state for _, _, state in rows]
+        completed = [state['completed'] for state in states]
+        return pd.DataFrame({
+            'Record_ID': np.array([record for record, _, _ in rows], dtype=np.int32),
+            'Employee_ID': np.array([number for _, number, _ in rows], dtype=np.int32),
+            'Process_ID': np.array([state['item'] for state in states], dtype=np.int32),
+            'Training_Status': pd.Categorical([state['status'] for state in states],
+                                              categories=gen.categories['Training_Status']),
+            'Start_Date': self.dates([state['start'] for state in states]),
+            'Completion_Date': self.dates(completed),
+            'Planned_Completion': self.dates([done if done is not None else state['due']
+                                              for done, state in zip(completed, states)]),
+            'Progress_Percentage': np.array([state['progress'] for state in states], dtype=np.int8),
+            'Assigned_By': gen.registry.sample_managers(rng, n),
+            'Priority': gen.choice(rng, gen.categories['Priority'], n),
+            'Notes': gen.choice(rng, [
+                'Excellent performance', 'On track', 'Needs support', 'Quick learner',
+                'Requires additional time', 'Meeting expectations', 'Outstanding progress',
+                'Slow start but improving', 'Complex material', 'Exceeding expectations'
+            ], n)
+        })
+    
+    def onboarding_tasks_chunk(self, rows, rng):
+        """Onboarding_Tasks rows for (Task_ID, employee, final state) entries"""
+        gen = self.generator
+        n = len(rows)
+        states = [state for _, _, state in rows]
+        return pd.DataFrame({
+            'Task_ID': np.array([record for record, _, _ in rows], dtype=np.int32),
+            'Employee_ID': np.array([number for _, number, _ in rows], dtype=np.int32),
+            'Task_Name': pd.Categorical([state['item'] for state in states], categories=gen.ONBOARDING_TASKS),
+            'Department': gen.choice(rng, ['HR', 'IT', 'Operations', 'All'], n),
+            'Due_Date': self.dates([state['due'] for state in states]),
+            'Status': pd.Categorical([state['status'] for state in states],
+                                     categories=['Completed', 'In Progress', 'Pending', 'Overdue']),
+            'Assigned_To': gen.choice(rng, ['HR Team', 'IT Team', 'Manager', 'Mentor'], n),
+            'Completion_Date': self.dates([state['completed'] for state in states]),
+            'Priority': gen.choice(rng, gen.categories['Priority'], n),
+            'Estimated_Hours': rng.choice(np.array([0.5, 1, 2, 4, 8], dtype=np.float32), n),
+            'Notes': gen.choice(rng, [
+                'Standard onboarding task', 'Critical for first week', 'Department specific',
+                'Requires manager approval', 'Self-paced learning', 'Scheduled session'
+            ], n)
+        })
+
+class DatasetClockAdvancer:
+    """Advance an existing generated SQLite dataset in place by N days of simulated activity"""
+    # Expected events per employee per simulated day
+    HIRES_PER_EMPLOYEE_DAY = 0.15 / 365
+    TRAININGS_PER_EMPLOYEE_DAY = 0.01
+    MEETINGS_PER_EMPLOYEE_DAY = 0.05
+    
+    # Daily probabilities for open records
+    TRAINING_START_PER_DAY = 0.03
+    TRAINING_RESUME_PER_DAY = 0.01
+    TRAINING_PROGRESS_PER_DAY = 4
+    TASK_START_PER_DAY = 0.15
+    TASK_COMPLETE_PER_DAY = 0.10
+    
+    OPEN_TRAINING = ('In Progress', 'Planned', 'On Hold')
+    
+    def __init__(self, file_path):
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(file_path)
+        load_dependencies()
+        self.file_path = file_path
+        self.connection = sqlite3.connect(file_path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        
+        try:
+            info = dict(self.connection.execute('SELECT "Key", "Value" FROM "Dataset_Info"'))
+        except sqlite3.OperationalError:
+            raise ValueError(f"{file_path} has no Dataset_Info table; regenerate it with --format sqlite")
+        self.as_of = datetime.fromisoformat(info['as_of'])
+        # Datasets written before the entropy was recorded only replay when they were seeded
+        seed = info.get('entropy') or info.get('seed')
+        self.seed = None if seed is None else int(seed)
+        self.scale = float(info.get('scale') or 1)
+        self.skew = float(info.get('skew') or 0)
+        
+        # Partial indexes over the open rows keep each advance proportional to the open work,
+        # not to the full history
+        self.connection.execute(
+            'CREATE INDEX IF NOT EXISTS "idx_Training_Status_open" ON "Training_Status" ("Record_ID") '
+            "WHERE \"Training_Status\" IN ('In Progress', 'Planned', 'On Hold')")
+        self.connection.execute(
+            'CREATE INDEX IF NOT EXISTS "idx_Onboarding_Tasks_open" ON "Onboarding_Tasks" ("Task_ID") '
+            "WHERE \"Status\" != 'Completed'")
+    
+    def row_count(self, table):
+        # IDs are sequential and rows are only appended, so the last rowid is the row count
+        return self.connection.execute(f'SELECT COALESCE(MAX(rowid), 0) FROM "{table}"').fetchone()[0]
+    
+    def insert(self, table, df):
+        df = self.generator.registry.materialize(df)
+        placeholders = ', '.join('?' * len(df.columns))
+        self.connection.executemany(f'INSERT INTO "{table}" VALUES ({placeholders})', sqlite_rows(df))
+    
+    def window_dates(self, rng, size, days):
+        """Random dates within the simulated window (as_of, as_of + days]"""
+        return np.datetime64(self.as_of, 's') + rng.integers(1, days + 1, size).astype('timedelta64[D]')
+    
+    def advance(self, days):
+        """Simulate days more days of activity and move the dataset's as-of date forward"""
+        if days < 1:
+            raise ValueError("days must be at least 1")
+        new_as_of = self.as_of + timedelta(days=days)
+        
+        num_employees = self.row_count('Employees')
+        generator = EmployeeManagementSystemGenerator(self.file_path, scale=self.scale, seed=self.seed, skew=self.skew,
+                                                      as_of=new_as_of, formats=(), generate=False)
+        # Same seed, scale and skew give the same registry (and managers) as the initial generation;
+        # employees hired by earlier advances are appended to it
+        generator.registry.add_employees(num_employees - generator.num_employees)
+        self.generator = generator
+        # One stream per advanced-to date, outside the keys used for the initial generation
+        rng = generator.stream(len(generator.SHEETS) + 1, new_as_of.toordinal())
+        
+        # Existing open work progresses first, so rows appended for this window start out fresh
+        with self.connection:
+            training_updates = self.progress_training(rng, days, new_as_of)
+            task_updates = self.progress_onboarding(rng, days, new_as_of)
+            hires = self.add_new_hires(generator, rng, num_employees, days)
+            generator.num_employees = num_employees + hires
+            trainings = self.add_training_records(generator, rng, days)
+            meetings = self.add_meetings(generator, rng, days)
+            self.connection.execute('UPDATE "Dataset_Info" SET "Value" = ? WHERE "Key" = ?',
+                                    (new_as_of.date().isoformat(), 'as_of'))
+        
+        self.as_of = new_as_of
+        print(f"⏩ Advanced {self.file_path} by {days} days to {new_as_of.date()}: "
+              f"{hires} new hires, {trainings} training records, {meetings} meetings added; "
+              f"{training_updates} training records and {task_updates} onboarding tasks updated")
+    
+    def add_new_hires(self, generator, rng, num_employees, days):
+        hires = int(rng.poisson(num_employees * self.HIRES_PER_EMPLOYEE_DAY * days))
+        if hires == 0:
+            return 0
+        
+        start, stop = num_employees, num_employees + hires
+        generator.registry.add_employees(hires)
+        df = generator.create_employees_table(start, stop, rng=rng)
+        df['Hire_Date'] = self.window_dates(rng, hires, days)
+        df['Onboarding_Status'] = 'Not Started'
+        df['Last_One_on_One_Date'] = pd.NaT
+        df['Performance_Rating'] = 'New Employee'
+        self.insert('Employees', df)
+        
+        # The onboarding builder reads task counts and the first Task_ID per employee from these arrays
+        counts = np.zeros(stop, dtype=np.int8)
+        counts[start:] = rng.integers(8, 13, hires)
+        offsets = np.zeros(stop + 1, dtype=np.int64)
+        offsets[start:] = self.row_count('Onboarding_Tasks') + np.concatenate([[0], np.cumsum(counts[start:])])
+        generator.onboarding_task_counts, generator.onboarding_task_offsets = counts, offsets
+        
+        tasks = generator.create_onboarding_tasks_table(start, stop, rng=rng)
+        hire_dates = np.repeat(df['Hire_Date'].to_numpy('datetime64[s]'), counts[start:])
+        tasks['Due_Date'] = hire_dates + rng.integers(1, 91, len(tasks)).astype('timedelta64[D]')
+        tasks['Status'] = 'Pending'
+        tasks['Completion_Date'] = pd.NaT
+        self.insert('Onboarding_Tasks', tasks)
+        return hires
+    
+    def add_training_records(self, generator, rng, days):
+        count = int(rng.poisson(generator.num_employees * self.TRAININGS_PER_EMPLOYEE_DAY * days))
+        if count == 0:
+            return 0
+        
+        start = self.row_count('Training_Status')
+        df = generator.create_training_status_table(start, start + count, rng=rng)
+        df['Training_Status'] = 'Planned'
+        df['Start_Date'] = pd.NaT
+        df['Completion_Date'] = pd.NaT
+        df['Planned_Completion'] = generator.now + generator.random_days(rng, 1, 180, count)
+        df['Progress_Percentage'] = 0
+        self.insert('Training_Status', df)
+        return count
+    
+    def add_meetings(self, generator, rng, days):
+        count = int(rng.poisson(generator.num_employees * self.MEETINGS_PER_EMPLOYEE_DAY * days))
+        if count == 0:
+            return 0
+        
+        start = self.row_count('One_on_Ones')
+        df = generator.create_one_on_ones_table(start, start + count, rng=rng)
+        df['Meeting_Date'] = self.window_dates(rng, count, days)
+        df['Next_Meeting_Date'] = df['Meeting_Date'] + pd.to_timedelta(rng.integers(7, 31, count), unit='D')
+        df['Meeting_Status'] = 'Completed'
+        self.insert('One_on_Ones', df)
+        return count
+    
+    def progress_training(self, rng, days, new_as_of):
+        rows = self.connection.execute(
+            'SELECT "Record_ID", "Training_Status", "Progress_Percentage", "Start_Date" FROM "Training_Status" '
+            "WHERE \"Training_Status\" IN ('In Progress', 'Planned', 'On Hold')").fetchall()
+        if not rows:
+            return 0
+        
+        record_id, status, progress, start_date = (np.array(column, dtype=object) for column in zip(*rows))
+        progress = progress.astype(np.int64)
+        n = len(rows)
+        
+        # Planned records start and On Hold records resume with a per-day probability, on a day in
+        # the window; everything in progress from then on gains a few percent per day
+        started = (status == 'Planned') & (rng.random(n) < 1 - (1 - self.TRAINING_START_PER_DAY) ** days)
+        resumed = (status == 'On Hold') & (rng.random(n) < 1 - (1 - self.TRAINING_RESUME_PER_DAY) ** days)
+        active = (status == 'In Progress') | started | resumed
+        active_from = np.where(started | resumed, self.window_dates(rng, n, days), np.datetime64(self.as_of, 's'))
+        active_days = (np.datetime64(new_as_of, 's') - active_from).astype('timedelta64[D]').astype(np.int64)
+        new_progress = np.where(active, progress + rng.integers(0, self.TRAINING_PROGRESS_PER_DAY * active_days + 1), progress)
+        completed = active & (new_progress >= 100)
+        
+        # Progress accrues evenly over the active days, so a record completes on the day it reaches 100%
+        gained = np.maximum(new_progress - progress, 1)
+        completion_days = np.ceil((100 - progress) / gained * active_days).astype(np.int64)
+        completion = active_from + np.clip(completion_days, 1, np.maximum(active_days, 1)).astype('timedelta64[D]')
+        
+        changed = active & ((new_progress != progress) | started | resumed)
+        start_text = np.datetime_as_string(active_from, unit='s')
+        completion_text = np.datetime_as_string(completion, unit='s')
+        updates = []
+        for i in np.flatnonzero(changed):
+            row_start = start_text[i] if started[i] else start_date[i]
+            if completed[i]:
+                updates.append(('Completed', 100, row_start, completion_text[i], completion_text[i], int(record_id[i])))
+            else:
+                updates.append(('In Progress', int(new_progress[i]), row_start, None, None, int(record_id[i])))
+        self.connection.executemany(
+            'UPDATE "Training_Status" SET "Training_Status" = ?, "Progress_Percentage" = ?, "Start_Date" = ?, '
+            '"Completion_Date" = COALESCE(?, "Completion_Date"), "Planned_Completion" = COALESCE(?, "Planned_Completion") '
+            'WHERE "Record_ID" = ?', updates)
+        return len(updates)
+    
+    def progress_onboarding(self, rng, days, new_as_of):
+        rows = self.connection.execute(
+            'SELECT "Task_ID", "Employee_ID", "Status", "Due_Date" FROM "Onboarding_Tasks" '
+            "WHERE \"Status\" != 'Completed'").fetchall()
+        if not rows:
+            return 0
+        
+        task_id, employee_id, status, due_date = (np.array(column, dtype=object) for column in zip(*rows))
+        n = len(rows)
+        
+        # Pending tasks start on a day in the window and only complete after that; tasks already
+        # under way (In Progress or Overdue) can complete from the first day
+        start_day = np.where(status == 'Pending', rng.geometric(self.TASK_START_PER_DAY, n), 0)
+        completion_day = start_day + rng.geometric(self.TASK_COMPLETE_PER_DAY, n)
+        started = (status == 'Pending') & (start_day <= days)
+        completed = completion_day <= days
+        overdue = ~completed & (due_date.astype('datetime64[s]') < np.datetime64(new_as_of, 's'))
+        new_status = np.where(completed, 'Completed', np.where(overdue, 'Overdue', np.where(started, 'In Progress', status)))
+        completion_text = np.datetime_as_string(
+            np.datetime64(self.as_of, 's') + np.minimum(completion_day, days).astype('timedelta64[D]'), unit='s')
+        
+        changed = np.flatnonzero(new_status != status)
+        self.connection.executemany(
+            'UPDATE "Onboarding_Tasks" SET "Status" = ?, "Completion_Date" = ? WHERE "Task_ID" = ?',
+            [(new_status[i], completion_text[i] if completed[i] else None, task_id[i]) for i in changed])
+        
+        # Only employees with a task that started or completed in this window can change onboarding status
+        touched = sorted(set(employee_id[completed | started]))
+        self.connection.executemany(
+            'UPDATE "Employees" SET "Onboarding_Status" = CASE WHEN EXISTS '
+            '(SELECT 1 FROM "Onboarding_Tasks" t WHERE t."Employee_ID" = ? AND t."Status" != \'Completed\') '
+            'THEN \'In Progress\' ELSE \'Completed\' END WHERE "Employee_ID" = ?',
+            [(emp, emp) for emp in touched])
+        return len(changed)
+    
+    def close(self):
+        self.connection.close()
+
 # Usage
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a sample Employee Management System workbook")
+    parser.add_argument("--out", default="Employee_Management_System.xlsx", help="output workbook path")
+    parser.add_argument("--scale", type=float, default=1, help="size multiplier (1 = 20 employees)")
+    parser.add_argument("--seed", type=int, help="random seed; the same seed gives byte-identical output")
+    parser.add_argument("--workers", type=int, default=1, help="generator processes (0 = one per core)")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="rows generated per chunk")
+    parser.add_argument("--skew", type=float, default=0.0,
+                        help="Zipf-like exponent for picking employees in child tables (0 = uniform, ~1.1 = realistic hot employees)")
+    parser.add_argument("--advance-days", type=int,
+                        help="instead of generating, simulate this many more days on the existing SQLite dataset at --out")
+    parser.add_argument("--format", default="xlsx",
+                        help=f"comma-separated output formats, written in one pass ({', '.join(WRITERS)})")
+    parser.add_argument("--tables",
+                        help="comma-separated sheets to generate (their foreign-key parents are added); default all")
+    parser.add_argument("--timeline", action="store_true",
+                        help="derive Training_Status and Onboarding_Tasks from a simulated event history, also written to <out>_events.csv")
+    parser.add_argument("--history-days", type=int, default=1095,
+                        help="longest employee tenure in days, i.e. how far back the simulated history reaches (default 1095)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="time each builder chunk, writer and the Excel write, and save them as a Chrome trace (JSON)")
+    args = parser.parse_args()
+    
+    formats = args.format.split(',')
+    tables = args.tables.split(',') if args.tables else None
+    try:
+        for fmt in formats:
+            if fmt not in WRITERS:
+                raise ValueError(f"Unknown output format {fmt!r}; choose from {', '.join(WRITERS)}")
+        EmployeeManagementSystemGenerator.tables_with_parents(tables)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.advance_days is not None and args.advance_days < 1:
+        parser.error("--advance-days must be at least 1")
+    
+    if args.advance_days is not None:
+        advancer = DatasetClockAdvancer(os.path.splitext(args.out)[0] + SqliteWriter.extension)
+        advancer.advance(args.advance_days)
+        advancer.close()
+        raise SystemExit
+    
     print("🚀 Generating Comprehensive Employee Management System...")
-    system = EmployeeManagementSystemGenerator()
+    trace = TraceRecorder() if args.trace else None
+    system = EmployeeManagementSystemGenerator(args.out, scale=args.scale, seed=args.seed,
+                                               chunk_size=args.chunk_size, workers=args.workers,
+                                               formats=formats, skew=args.skew, tables=tables,
+                                               history_days=args.history_days, timeline=args.timeline,
+                                               trace=trace)
+    if trace is not None:
+        trace.export(args.trace)
+        print(f"✅ Trace written: {args.trace} (open it in chrome://tracing or ui.perfetto.dev)")
     print("\n✅ System ready for deployment!")
\ No newline at end of file
@@ -0,0 +1,254 @@
+"""Lookup values and sheet statistics shared by ems-gen.py and ems-gen-up.py.
+
+LOOKUP_VALUES is what the generator writes to Lookup_Values and LOOKUP_COLUMNS which columns the
+updater checks against it; SheetSummary is the aggregation engine behind the generator's summary
+JSON and the updater's summary panel, so both report the same numbers. Keep this file next to the
+two scripts.
+"""
+from collections import Counter
+from datetime import date, datetime
+import math
+
+# pandas is only needed for the generator's DataFrame chunks (add_frame), so the updater, which
+# adds plain rows, never imports it
+pd = None
+
+def load_pandas():
+    """Import pandas into this module's globals; called before a DataFrame is summarized"""
+    global pd
+    if pd is None:
+        import pandas
+        pd = pandas
+
+# Lookup_Values categories and their values, in display order
+LOOKUP_VALUES = {
+    'Department': ['Operations', 'Finance', 'Sales', 'Legal', 'HR', 'IT', 'Marketing'],
+    'Training_Status': ['Completed', 'In Progress', 'Planned', 'On Hold'],
+    'Project_Status': ['Planning', 'In Progress', 'On Hold', 'Completed', 'Cancelled'],
+    'Priority': ['High', 'Medium', 'Low'],
+    'Performance_Rating': ['Exceeds', 'Meets', 'Below', 'New Employee'],
+    'Meeting_Type': ['Weekly Check-in', 'Monthly Review', 'Quarterly Review', 'Goal Setting', 'Performance Review'],
+}
+# The Lookup_Values category each (sheet, column) takes its values from
+LOOKUP_COLUMNS = {
+    ('Employees', 'Department'): 'Department',
+    ('Employees', 'Performance_Rating'): 'Performance_Rating',
+    ('Training_Processes', 'Department'): 'Department',
+    ('Training_Status', 'Training_Status'): 'Training_Status',
+    ('Training_Status', 'Priority'): 'Priority',
+    ('One_on_Ones', 'Meeting_Type'): 'Meeting_Type',
+    ('Projects', 'Status'): 'Project_Status',
+    ('Projects', 'Priority'): 'Priority',
+    ('Projects', 'Department'): 'Department',
+    ('Onboarding_Tasks', 'Department'): 'Department',
+    ('Onboarding_Tasks', 'Priority'): 'Priority',
+}
+
+# Aggregates kept per sheet by SheetSummary, as (metric class, column names); a metric whose
+# columns a sheet doesn't have is left out
+SUMMARY_METRICS = {
+    'Employees': [('CountBy', 'Department'), ('CountBy', 'Employment_Status')],
+    'Training_Status': [('CountBy', 'Training_Status'), ('CountBy', 'Priority'), ('Mean', 'Progress_Percentage')],
+    'Projects': [('CountBy', 'Status'), ('CountBy', 'Priority'), ('SumBy', 'Department', 'Budget')],
+    'Onboarding_Tasks': [('CountBy', 'Status'), ('CountBy', 'Priority'), ('Overdue', 'Due_Date', 'Status')],
+}
+
+def summary_number(value):
+    """value as a plain int or float if it is a number (bools and NaN aren't), else None"""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+def plain(value):
+    """A NumPy scalar as the Python int or float it holds; anything else unchanged"""
+    return value.item() if hasattr(value, 'item') else value
+
+def summary_label(value):
+    """JSON key for a grouped value: its text, '(blank)' for empty cells"""
+    if value is None or isinstance(value, float) and math.isnan(value):
+        return '(blank)'
+    return str(value)
+
+class CountBy:
+    """Number of rows per value of a column"""
+    def __init__(self, column):
+        self.columns = [column]
+        self.counts = {}
+    
+    def add(self, value, sign=1):
+        count = self.counts.get(value, 0) + sign
+        if count:
+            self.counts[value] = count
+        else:
+            del self.counts[value]
+    
+    def add_many(self, values):
+        for value, count in Counter(values).items():
+            self.add(value, count)
+    
+    def add_frame(self, df):
+        column = df[self.columns[0]]
+        for value, count in column.value_counts(dropna=False, sort=False).items():
+            if count:
+                self.add(None if pd.isna(value) else value, int(count))
+    
+    def result(self):
+        counts = {}
+        for value, count in self.counts.items():
+            label = summary_label(value)
+            counts[label] = counts.get(label, 0) + count
+        return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+class Mean:
+    """Average of a numeric column over the rows that have a number in it"""
+    def __init__(self, column):
+        self.columns = [column]
+        self.total = 0
+        self.count = 0
+    
+    def add(self, value, sign=1):
+        value = summary_number(value)
+        if value is not None:
+            self.total += sign * value
+            self.count += sign
+    
+    def add_many(self, values):
+        numbers = [number for number in map(summary_number, values) if number is not None]
+        self.total += sum(numbers)
+        self.count += len(numbers)
+    
+    def add_frame(self, df):
+        values = pd.to_numeric(df[self.columns[0]], errors='coerce')
+        self.total += plain(values.sum())
+        self.count += int(values.count())
+    
+    def result(self):
+        return round(self.total / self.count, 2) if self.count else None
+
+class SumBy:
+    """Total of a numeric column per value of a grouping column"""
+    def __init__(self, group_column, value_column):
+        self.columns = [group_column, value_column]
+        self.totals = {}
+    
+    def add(self, group, value, sign=1):
+        value = summary_number(value)
+        if value is None:
+            return
+        total, count = self.totals.get(group, (0, 0))
+        count += sign
+        if count:
+            self.totals[group] = (total + sign * value, count)
+        else:
+            del self.totals[group]
+    
+    def add_many(self, groups, values):
+        for group, value in zip(groups, values):
+            self.add(group, value)
+    
+    def add_frame(self, df):
+        values = pd.to_numeric(df[self.columns[1]], errors='coerce')
+        grouped = values.groupby(df[self.columns[0]].astype(object).where(df[self.columns[0]].notna(), '(blank)'),
+                                 sort=False, observed=True).agg(['sum', 'count'])
+        for group, total, count in grouped.itertuples(name=None):
+            if count:
+                old_total, old_count = self.totals.get(group, (0, 0))
+                self.totals[group] = (old_total + plain(total), old_count + int(count))
+    
+    def result(self):
+        totals = {}
+        for group, (total, _) in self.totals.items():
+            label = summary_label(group)
+            totals[label] = totals.get(label, 0) + total
+        return dict(sorted(totals.items(), key=lambda item: (-item[1], item[0])))
+
+class Overdue:
+    """Rows not Completed that are marked Overdue or past their due date (before as_of)"""
+    def __init__(self, due_column, status_column, as_of):
+        self.columns = [due_column, status_column]
+        self.as_of = as_of
+        self.count = 0
+    
+    def is_overdue(self, due, status):
+        if status == 'Completed':
+            return False
+        if status == 'Overdue':
+            return True
+        if isinstance(due, datetime):
+            return due < self.as_of
+        if isinstance(due, date):
+            return due < self.as_of.date()
+        return False
+    
+    def add(self, due, status, sign=1):
+        if self.is_overdue(due, status):
+            self.count += sign
+    
+    def add_many(self, dues, statuses):
+        self.count += sum(map(self.is_overdue, dues, statuses))
+    
+    def add_frame(self, df):
+        due = pd.to_datetime(df[self.columns[0]], errors='coerce')
+        status = df[self.columns[1]].astype(object)
+        self.count += int((((due < self.as_of) | (status == 'Overdue')) & (status != 'Completed')).sum())
+    
+    def result(self):
+        return self.count
+
+class SheetSummary:
+    """Aggregates of one sheet (see SUMMARY_METRICS), computed once and then kept current row by row"""
+    METRICS = {'CountBy': CountBy, 'Mean': Mean, 'SumBy': SumBy, 'Overdue': Overdue}
+    # Metrics that count relative to a date are given the as-of date after their columns
+    DATED_METRICS = {'Overdue'}
+    
+    def __init__(self, sheet_name, headers, as_of):
+        self.sheet_name = sheet_name
+        self.rows = 0
+        self.metrics = []
+        positions = {header: index for index, header in enumerate(headers)}
+        for kind, *columns in SUMMARY_METRICS.get(sheet_name, []):
+            if all(column in positions for column in columns):
+                arguments = columns + [as_of] if kind in self.DATED_METRICS else columns
+                metric = self.METRICS[kind](*arguments)
+                metric.positions = [positions[column] for column in columns]
+                self.metrics.append(metric)
+    
+    def add(self, row, sign=1):
+        self.rows += sign
+        for metric in self.metrics:
+            metric.add(*[row[position] for position in metric.positions], sign)
+    
+    def remove(self, row):
+        self.add(row, -1)
+    
+    def add_rows(self, rows):
+        """Add rows given as lists of values in header order"""
+        self.rows += len(rows)
+        for metric in self.metrics:
+            metric.add_many(*[[row[position] for row in rows] for position in metric.positions])
+    
+    def add_frame(self, df):
+        load_pandas()
+        self.rows += len(df)
+        for metric in self.metrics:
+            metric.add_frame(df)
+    
+    def result(self):
+        """The aggregates as JSON-ready values, keyed like 'Status', 'mean Progress_Percentage' or 'Budget by Department'"""
+        result = {'rows': self.rows}
+        for metric in self.metrics:
+            if isinstance(metric, CountBy):
+                result[metric.columns[0]] = metric.result()
+            elif isinstance(metric, Mean):
+                result[f'mean {metric.columns[0]}'] = metric.result()
+            elif isinstance(metric, SumBy):
+                result[f'{metric.columns[1]} by {metric.columns[0]}'] = metric.result()
+            else:
+                result['overdue'] = metric.result()
+        return result
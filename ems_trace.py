@@ -0,0 +1,122 @@
+"""Phase timing shared by ems-gen.py and ems-gen-up.py.
+
+TraceRecorder times the phases of both scripts, so their Chrome traces read the same. Keep this
+file next to the two scripts.
+"""
+from collections import deque
+import json
+import os
+import threading
+import time
+
+class TraceSpan:
+    """One timed phase of a TraceRecorder; set() adds arguments (rows, bytes, ...) while it runs"""
+    __slots__ = ('recorder', 'name', 'args', 'start')
+    
+    def __init__(self, recorder, name, args):
+        self.recorder = recorder
+        self.name = name
+        self.args = args
+    
+    def set(self, **args):
+        self.args.update(args)
+    
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.recorder.add(self.name, self.start, time.perf_counter_ns(), self.args)
+        return False
+
+class NullSpan:
+    """The span a disabled TraceRecorder hands out: entering, leaving and set() do nothing"""
+    __slots__ = ()
+    
+    def set(self, **args):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+
+NULL_SPAN = NullSpan()
+
+class TraceRecorder:
+    """Time named phases with their row counts and byte sizes, for Chrome's trace viewer"""
+    def __init__(self, enabled=True, limit=100000):
+        self.enabled = enabled
+        self.events = deque(maxlen=limit)
+        self.latest = {}
+        self.threads = {}
+        self.thread_ids = {}
+        self.origin = time.perf_counter_ns()
+    
+    def __getstate__(self):
+        # Thread objects don't pickle; a worker process numbers its own threads
+        return dict(self.__dict__, thread_ids={})
+    
+    def span(self, name, **args):
+        return TraceSpan(self, name, args) if self.enabled else NULL_SPAN
+    
+    def add(self, name, start, end, args):
+        thread = threading.current_thread()
+        tid = self.thread_ids.get(thread)
+        if tid is None:
+            tid = self.thread_ids[thread] = len(self.thread_ids) + 1
+            self.threads[os.getpid(), tid] = thread.name
+        event = {'name': name, 'ph': 'X', 'ts': (start - self.origin) / 1000, 'dur': (end - start) / 1000,
+                 'pid': os.getpid(), 'tid': tid, 'args': args}
+        self.events.append(event)
+        self.latest[name] = event
+    
+    def drain(self):
+        """Remove and return the spans recorded so far, with their thread names (for a worker to send back)"""
+        events, self.events = list(self.events), deque(maxlen=self.events.maxlen)
+        threads, self.threads = self.threads, {}
+        self.thread_ids = {}
+        return events, threads
+    
+    def extend(self, drained):
+        events, threads = drained
+        self.events.extend(events)
+        self.threads.update(threads)
+        for event in events:
+            self.latest[event['name']] = event
+    
+    @staticmethod
+    def describe(event):
+        """A span as 'read_sheet Employees 120 ms (12,463 rows, 3.4 MB)'"""
+        args = event['args']
+        counts = [f"{args['rows']:,} rows"] if 'rows' in args else []
+        if 'bytes' in args:
+            counts.append(f"{args['bytes'] / 1e6:,.1f} MB")
+        text = f"{event['name']}{' ' + str(args['sheet']) if 'sheet' in args else ''} {event['dur'] / 1000:,.0f} ms"
+        return text + (f" ({', '.join(counts)})" if counts else '')
+    
+    def totals(self):
+        """{name: {'count', 'ms', 'rows', 'bytes'}} summed over the recorded spans, per format where given"""
+        totals = {}
+        for event in self.events:
+            key = f"{event['name']} {event['args']['format']}" if 'format' in event['args'] else event['name']
+            total = totals.setdefault(key, {'count': 0, 'ms': 0.0, 'rows': 0, 'bytes': 0})
+            total['count'] += 1
+            total['ms'] += event['dur'] / 1000
+            total['rows'] += event['args'].get('rows', 0)
+            total['bytes'] += event['args'].get('bytes', 0)
+        return totals
+    
+    def to_json(self):
+        names = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                 for (pid, tid), name in self.threads.items()]
+        return {'traceEvents': names + list(self.events), 'displayTimeUnit': 'ms'}
+    
+    def export(self, path):
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(self.to_json(), handle, default=str)
+            handle.write('\n')
+
+# What instrumented code times with when no recorder is given
+NO_TRACE = TraceRecorder(enabled=False)
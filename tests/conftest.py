@@ -0,0 +1,84 @@
+import importlib.util
+import os
+import shutil
+import sys
+from datetime import date
+
+import openpyxl
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The scripts import ems_common and ems_trace from next to them
+sys.path.insert(0, ROOT)
+
+
+def load_script(module_name, file_name):
+    """A hyphenated script loaded as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(ROOT, file_name))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+ems_gen = load_script("ems_gen", "ems-gen.py")
+ems_gen_up = load_script("ems_gen_up", "ems-gen-up.py")
+
+
+@pytest.fixture(scope="session")
+def generated(tmp_path_factory):
+    """A small seeded workbook from the generator, written once per test session"""
+    path = str(tmp_path_factory.mktemp("generated") / "ems.xlsx")
+    ems_gen.EmployeeManagementSystemGenerator(path, scale=3, seed=11, as_of=date(2025, 6, 30), chunk_size=25)
+    return path
+
+
+@pytest.fixture
+def workbook(generated, tmp_path):
+    """A private copy of the generated workbook, free to patch"""
+    path = str(tmp_path / "ems.xlsx")
+    shutil.copyfile(generated, path)
+    return path
+
+
+def openpyxl_rows(path, sheet_name):
+    """A sheet's rows as openpyxl reads them, trailing blanks removed"""
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    try:
+        return [trim(list(row)) for row in workbook[sheet_name].iter_rows(values_only=True)]
+    finally:
+        workbook.close()
+
+
+def trim(row):
+    while row and row[-1] is None:
+        row.pop()
+    return row
+
+
+def read_model(path, sheet_name, use_store=False, trace=None):
+    """A sheet's SheetModel read the way the updater reads it, by a WorkbookLoader"""
+    loader = ems_gen_up.WorkbookLoader(path, use_store=use_store, trace=trace or ems_gen_up.NO_TRACE)
+    loader.start()
+    try:
+        message = loader.messages.get(timeout=60)
+        assert message[0] == "sheets", message
+        loader.request(sheet_name)
+        model = None
+        while True:
+            message = loader.messages.get(timeout=60)
+            assert message[0] in ("rows", "sheet_done"), message
+            if message[0] == "sheet_done":
+                break
+            model = model or ems_gen_up.SheetModel(message[2])
+            model.extend(message[3])
+        model.finish()
+        return model
+    finally:
+        loader.close()
+        loader.join()
+
+
+def model_rows(model):
+    """A model's sheet as it should be saved: the header row, then its rows in order"""
+    return [trim(list(model.headers))] + [trim(row) for row in model.iter_rows()]
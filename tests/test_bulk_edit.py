@@ -0,0 +1,96 @@
+from datetime import datetime
+
+import pytest
+
+from conftest import ems_gen_up
+
+BulkEdit = ems_gen_up.BulkEdit
+HEADERS = ["Record_ID", "Training_Status", "Progress_Percentage", "Start_Date", "Notes"]
+
+
+def training():
+    model = ems_gen_up.SheetModel(HEADERS)
+    model.extend([
+        [1, "Completed", 80, datetime(2025, 1, 6), "On track"],
+        [2, "In Progress", 35, datetime(2025, 2, 3), None],
+        [3, "Completed", 100, None, "Quick learner, on track"],
+        [4, "Planned", 0, datetime(2025, 4, 1), "Needs 'support'"],
+    ])
+    model.finish()
+    return model
+
+
+def test_parse_assignments_and_conditions():
+    model = training()
+    edit = BulkEdit.parse(model, "progress_percentage = 100, Notes = 'Done, signed off' "
+                                 "where Training_Status == Completed and Start_Date < 2025-02-01")
+
+    assert edit.assignments == [(2, 100), (4, "Done, signed off")]
+    assert edit.conditions == [(1, "==", "Completed"), (3, "<", datetime(2025, 2, 1))]
+    assert edit.updates(model.order) == {0: {2: 100, 4: "Done, signed off"}}
+
+
+@pytest.mark.parametrize("text, assignments, conditions", [
+    ("Notes = ''", [(4, None)], []),
+    ('Notes = "say \\"hi\\""', [(4, 'say "hi"')], []),
+    ("Notes='x' WHERE Record_ID>=3 AND Notes != ''", [(4, "x")], [(0, ">=", 3), (4, "!=", None)]),
+    ("Training_Status = 'On Hold' where Notes == 'Needs \\'support\\''", [(1, "On Hold")],
+     [(4, "==", "Needs 'support'")]),
+])
+def test_parse_values_are_typed_for_their_column(text, assignments, conditions):
+    edit = BulkEdit.parse(training(), text)
+    assert (edit.assignments, edit.conditions) == (assignments, conditions)
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "Progress_Percentage",
+    "Progress_Percentage =",
+    "Progress_Percentage = lots",
+    "Grade = A",
+    "Notes = x where",
+    "Notes = x where Record_ID = 3",
+    "Notes = x where Record_ID == 3 or Record_ID == 4",
+    "Notes = x, where Record_ID == 3",
+    "Notes = 'unterminated",
+    "Notes = x y",
+    "= 5",
+])
+def test_parse_rejects_malformed_expressions(text):
+    with pytest.raises(ValueError):
+        BulkEdit.parse(training(), text)
+
+
+def test_updates_only_change_cells_that_differ():
+    model = training()
+    # Row 3 already has 100
+    edit = BulkEdit.parse(model, "Progress_Percentage = 100 where Training_Status == 'Completed'")
+    updates = edit.updates(model.order)
+    assert updates == {0: {2: 100}}
+
+    model.edit(updates)
+    assert model.columns[2] == [100, 35, 100, 0]
+    model.undo()
+    assert model.columns[2] == [80, 35, 100, 0]
+
+
+def test_conditions_on_blanks_and_ranges():
+    model = training()
+    assert BulkEdit.parse(model, "Notes = x where Start_Date == ''").updates(model.order) == {2: {4: "x"}}
+    assert set(BulkEdit.parse(model, "Notes = x where Progress_Percentage > 35").updates(model.order)) == {0, 2}
+    assert set(BulkEdit.parse(model, "Notes = x where Progress_Percentage <= 35").updates([1, 2, 3])) == {1, 3}
+    with pytest.raises(ValueError):
+        BulkEdit.parse(model, "Notes = x where Start_Date < ''").updates(model.order)
+
+
+def test_find_replace_and_unique_keys():
+    model = training()
+    edit = BulkEdit.find_replace(model, 4, "on track", "ahead")
+    assert edit.updates(model.order) == {2: {4: "Quick learner, ahead"}}
+
+    with pytest.raises(ValueError):
+        BulkEdit.find_replace(model, 4, "", "anything")
+    # Setting every selected row's ID to one value would repeat it
+    with pytest.raises(ValueError):
+        BulkEdit.set_value(model, 0, "9").updates([0, 1])
+    assert BulkEdit.set_value(model, 0, "9").updates([1]) == {1: {0: 9}}
@@ -0,0 +1,212 @@
+import csv
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+from collections import Counter
+from datetime import date, datetime
+
+import openpyxl
+import pytest
+
+from conftest import ems_gen
+
+AS_OF = date(2025, 6, 30)
+
+
+def generate(directory, formats=("xlsx",), **options):
+    """Generate a seeded dataset into directory; returns the generator"""
+    options = dict(dict(scale=2, seed=5, as_of=AS_OF, chunk_size=10), **options)
+    return ems_gen.EmployeeManagementSystemGenerator(os.path.join(directory, "ems.xlsx"), formats=formats, **options)
+
+
+def output_files(directory):
+    """{relative path: bytes} of every file generated under directory"""
+    files = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            with open(path, "rb") as handle:
+                files[os.path.relpath(path, directory)] = handle.read()
+    return files
+
+
+@pytest.mark.parametrize("chunk_size", [7, 40])
+def test_the_same_seed_gives_the_same_bytes_on_any_worker_count(tmp_path, chunk_size):
+    outputs = []
+    for workers in (1, 3):
+        directory = str(tmp_path / f"workers{workers}")
+        generate(directory, formats=("xlsx", "csv"), chunk_size=chunk_size, workers=workers)
+        outputs.append(output_files(directory))
+
+    assert sorted(outputs[0]) == sorted(["ems.xlsx", "ems_summary.json"] + [
+        os.path.join("ems", name + ".csv") for name in ems_gen.PRIMARY_KEYS])
+    assert outputs[0] == outputs[1]
+
+
+def test_another_seed_gives_other_data(tmp_path):
+    generate(str(tmp_path / "a"), formats=("csv",))
+    generate(str(tmp_path / "b"), formats=("csv",), seed=6)
+    first, second = output_files(str(tmp_path / "a")), output_files(str(tmp_path / "b"))
+
+    assert first.keys() == second.keys()
+    assert first[os.path.join("ems", "Employees.csv")] != second[os.path.join("ems", "Employees.csv")]
+
+
+def cell(value):
+    """A cell as comparable across formats: numbers as floats, dates as ISO text, blanks as None"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool) or value in ("True", "False"):
+        return float(value in (True, "True"))
+    text = value.isoformat() if isinstance(value, datetime) else str(value)
+    if re.fullmatch(r"\d{4}-\d\d-\d\d", text):
+        text += "T00:00:00"
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def test_every_format_of_one_pass_holds_the_same_rows(tmp_path):
+    directory = str(tmp_path)
+    generate(directory, formats=("xlsx", "csv", "sqlite"))
+    workbook = openpyxl.load_workbook(os.path.join(directory, "ems.xlsx"), read_only=True)
+    database = sqlite3.connect(os.path.join(directory, "ems.sqlite"))
+    try:
+        for sheet_name in ems_gen.PRIMARY_KEYS:
+            xlsx_rows = [[cell(value) for value in row] for row in workbook[sheet_name].iter_rows(values_only=True)]
+            with open(os.path.join(directory, "ems", sheet_name + ".csv"), newline="", encoding="utf-8") as handle:
+                csv_rows = [[cell(value) for value in row] for row in csv.reader(handle)]
+            query = database.execute(f'SELECT * FROM "{sheet_name}"')
+            sqlite_rows = [[column[0] for column in query.description]] + [[cell(value) for value in row] for row in query]
+
+            assert len(xlsx_rows) > 1, sheet_name
+            assert csv_rows == xlsx_rows, sheet_name
+            assert sqlite_rows == xlsx_rows, sheet_name
+        # The SQLite copy declares its keys and records what an incremental run needs
+        assert database.execute("PRAGMA foreign_key_check").fetchall() == []
+        assert dict(database.execute('SELECT * FROM "Dataset_Info"'))["seed"] == "5"
+    finally:
+        workbook.close()
+        database.close()
+
+
+def csv_sheet(directory, sheet_name):
+    with open(os.path.join(directory, "ems", sheet_name + ".csv"), newline="", encoding="utf-8") as handle:
+        return list(csv.DictReader(handle))
+
+
+@pytest.mark.parametrize("skew", [0.0, 1.0, 1.1])
+def test_child_rows_reference_real_parents_under_skew(tmp_path, skew):
+    # Past 400 employees names carry the employee number, so manager names stay unique
+    directory = str(tmp_path)
+    generate(directory, formats=("csv",), scale=25, chunk_size=200, skew=skew, workers=2)
+    employees = csv_sheet(directory, "Employees")
+    keys = {"Employees": {row["Employee_ID"] for row in employees},
+            "Training_Processes": {row["Process_ID"] for row in csv_sheet(directory, "Training_Processes")}}
+    names = {row["Employee_Name"] for row in employees}
+    assert len(keys["Employees"]) == len(names) == 500
+
+    for sheet_name, references in ems_gen.FOREIGN_KEYS.items():
+        rows = csv_sheet(directory, sheet_name)
+        for column, parent in references:
+            assert {row[column] for row in rows} <= keys[parent], (sheet_name, column)
+        for column in ems_gen.KeyRegistry.MANAGER_COLUMNS:
+            if column in rows[0]:
+                assert {row[column] for row in rows} <= names, (sheet_name, column)
+
+    # Skew piles child rows onto a few hot employees
+    counts = sorted(Counter(row["Employee_ID"] for row in csv_sheet(directory, "Training_Status")).values())
+    hottest = counts[-1] / (1250 / 500)
+    assert hottest > 20 if skew else hottest < 5
+
+
+def test_tables_bring_their_foreign_key_parents(tmp_path):
+    assert ems_gen.EmployeeManagementSystemGenerator.tables_with_parents(["Training_Status", "Lookup_Values"]) == [
+        "Employees", "Training_Processes", "Training_Status", "Lookup_Values"]
+    with pytest.raises(ValueError):
+        ems_gen.EmployeeManagementSystemGenerator.tables_with_parents(["Payroll"])
+
+    generate(str(tmp_path / "all"), formats=("csv",))
+    generate(str(tmp_path / "some"), formats=("csv",), tables=["Projects"])
+    everything, subset = output_files(str(tmp_path / "all")), output_files(str(tmp_path / "some"))
+
+    assert sorted(name for name in subset if name.endswith(".csv")) == [
+        os.path.join("ems", "Employees.csv"), os.path.join("ems", "Projects.csv")]
+    # Each sheet draws from its own streams, so a subset holds the same rows as the full dataset
+    for name in ("Employees.csv", "Projects.csv"):
+        assert subset[os.path.join("ems", name)] == everything[os.path.join("ems", name)]
+
+
+def test_help_starts_without_numpy_or_pandas():
+    script = os.path.join(os.path.dirname(ems_gen.__file__), "ems-gen.py")
+    code = ("import runpy, sys\n"
+            f"sys.argv = [{script!r}, '--help']\n"
+            "try:\n"
+            f"    runpy.run_path({script!r}, run_name='__main__')\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "print(sorted({'numpy', 'pandas'} & set(sys.modules)))\n")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert "--tables" in result.stdout
+    assert result.stdout.splitlines()[-1] == "[]"
+
+
+def day(text):
+    return date.fromisoformat(text[:10]) if text else None
+
+
+def test_timeline_snapshots_agree_with_their_events(tmp_path):
+    directory = str(tmp_path)
+    generate(directory, formats=("csv",), scale=3, chunk_size=25, timeline=True)
+    with open(os.path.join(directory, "ems_events.csv"), newline="", encoding="utf-8") as handle:
+        events = list(csv.DictReader(handle))
+    last = {}
+    for event in events:
+        assert day(event["Event_Date"]) <= AS_OF
+        key = (event["Record_Type"], event["Record_ID"])
+        assert key not in last or day(last[key]["Event_Date"]) <= day(event["Event_Date"]), key
+        last[key] = event
+
+    training = csv_sheet(directory, "Training_Status")
+    assert len(training) == sum(record_type == "Training" for record_type, _ in last)
+    for row in training:
+        status, start, done = row["Training_Status"], day(row["Start_Date"]), day(row["Completion_Date"])
+        assert last["Training", row["Record_ID"]]["Status"] == status
+        assert (done is not None) == (status == "Completed") == (row["Progress_Percentage"] == "100"), row
+        assert (start is None) == (status == "Planned"), row
+        assert done is None or start <= done <= AS_OF
+
+    tasks = csv_sheet(directory, "Onboarding_Tasks")
+    assert len(tasks) == sum(record_type == "Onboarding" for record_type, _ in last)
+    for row in tasks:
+        status, due, done = row["Status"], day(row["Due_Date"]), day(row["Completion_Date"])
+        assert last["Onboarding", row["Task_ID"]]["Status"] == status
+        assert (done is not None) == (status == "Completed"), row
+        assert done is None or done <= AS_OF
+        # Open tasks are overdue exactly when their due date has passed
+        if status != "Completed":
+            assert (status == "Overdue") == (due < AS_OF), row
+
+
+@pytest.mark.parametrize("failing", ["Projects", "close"])
+def test_a_failed_run_leaves_no_partial_outputs(tmp_path, monkeypatch, failing):
+    directory = str(tmp_path)
+    os.makedirs(os.path.join(directory, "ems"))
+    # Files that were there before the run are not the run's to remove
+    with open(os.path.join(directory, "ems", "notes.txt"), "w") as handle:
+        handle.write("keep me")
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("disk full")
+    if failing == "close":
+        monkeypatch.setattr(ems_gen.SqliteWriter, "close", fail)
+    else:
+        monkeypatch.setattr(ems_gen.EmployeeManagementSystemGenerator, "create_projects_table", fail)
+    with pytest.raises(RuntimeError):
+        generate(directory, formats=("csv", "xlsx", "sqlite"), timeline=True)
+
+    assert sorted(output_files(directory)) == [os.path.join("ems", "notes.txt")]
@@ -0,0 +1,85 @@
+from datetime import datetime
+
+from conftest import ems_gen_up
+
+
+def sheet(headers, rows):
+    model = ems_gen_up.SheetModel(headers)
+    model.extend([list(row) for row in rows])
+    model.finish()
+    return model
+
+
+def employees():
+    return sheet(["Employee_ID", "Employee_Name", "Department", "Hire_Date"], [
+        ["EMP001", "John Smith", "IT", datetime(2020, 1, 6)],
+        ["EMP002", "Sarah Johnson", "HR", datetime(2021, 3, 1)],
+        ["EMP003", "Mike Brown", None, datetime(2022, 7, 18)],
+    ])
+
+
+def processes():
+    return sheet(["Process_ID", "Process_Name"], [["PROC001", "Safety training"], ["PROC002", "Code review"]])
+
+
+def training():
+    return sheet(["Record_ID", "Employee_ID", "Process_ID", "Progress_Percentage"], [
+        [1, "EMP002", "PROC001", 40],
+        [2, "EMP009", "PROC002", 100],
+        [3, "EMP001", None, 0],
+    ])
+
+
+def test_joined_columns_follow_their_foreign_keys():
+    model = training()
+    joins = ems_gen_up.SheetJoins(model)
+
+    assert joins.headers() == ["Record_ID", "Employee_ID", "Employee_Name (Employees)", "Department (Employees)",
+                               "Process_ID", "Process_Name (Training_Processes)", "Progress_Percentage"]
+    assert joins.parents == {"Employees", "Training_Processes"}
+    assert [joins.model_column(column) for column in range(len(joins.columns))] == [0, 1, None, None, 2, None, 3]
+
+
+def test_a_sheet_keyed_by_its_foreign_key_column_joins_nothing_to_it():
+    joins = ems_gen_up.SheetJoins(employees())
+    assert joins.headers() == ["Employee_ID", "Employee_Name", "Department", "Hire_Date"]
+
+
+def test_joined_rows_look_up_their_parents():
+    model = training()
+    rows = ems_gen_up.JoinedRows(model, ems_gen_up.SheetJoins(model),
+                                 {"Employees": employees(), "Training_Processes": processes()})
+
+    assert [rows[index] for index in range(len(rows))] == [
+        ["1", "EMP002", "Sarah Johnson", "HR", "PROC001", "Safety training", "40"],
+        # No such employee, and no process: the joined cells are blank
+        ["2", "EMP009", "", "", "PROC002", "Code review", "100"],
+        ["3", "EMP001", "John Smith", "IT", "", "", "0"],
+    ]
+
+
+def test_joined_rows_while_parents_load_or_are_missing():
+    model = training()
+    joins = ems_gen_up.SheetJoins(model)
+
+    loading = ems_gen_up.JoinedRows(model, joins, {"Employees": None})
+    assert loading[0] == ["1", "EMP002", "…", "…", "PROC001", "", "40"]
+
+
+def test_joined_rows_follow_edits_to_either_sheet():
+    model, parent = training(), employees()
+    rows = ems_gen_up.JoinedRows(model, ems_gen_up.SheetJoins(model),
+                                 {"Employees": parent, "Training_Processes": processes()}, row_ids=[2, 0])
+    name, department = 1, 2
+
+    # The parent's key index follows a renamed ID, an edited name and an inserted employee
+    parent.edit({1: {0: "EMP020", department: "Legal"}, 2: {name: "Michael Brown"}},
+                inserts=[["EMP009", "Emma Davis", "Sales", None]])
+    model.edit({0: {1: "EMP003"}})
+    assert rows[0][:4] == ["3", "EMP001", "John Smith", "IT"]
+    assert rows[1][:4] == ["1", "EMP003", "Michael Brown", ""]
+    assert ems_gen_up.JoinedRows(model, rows.joins, rows.parents)[1][:4] == ["2", "EMP009", "Emma Davis", "Sales"]
+
+    parent.undo()
+    model.undo()
+    assert rows[1][:4] == ["1", "EMP002", "Sarah Johnson", "HR"]
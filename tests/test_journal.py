@@ -0,0 +1,71 @@
+import os
+from datetime import datetime, time, timedelta
+
+from conftest import ems_gen_up, model_rows, openpyxl_rows, read_model
+
+EditJournal = ems_gen_up.EditJournal
+
+
+def column(model, name):
+    return model.headers.index(name)
+
+
+def test_journal_replay_rebuilds_the_edits_and_undo_history(workbook):
+    journal = EditJournal(workbook)
+    journal.rewrite(ems_gen_up.WorkbookParts.read(workbook))
+    model = read_model(workbook, "Onboarding_Tasks")
+    journal.attach("Onboarding_Tasks", model)
+    first, second, third = model.order[:3]
+    model.edit({first: {column(model, "Status"): "Completed", column(model, "Completion_Date"): datetime(2025, 6, 1)}})
+    # Values JSON has no type for are tagged in the journal
+    model.edit({second: {column(model, "Notes"): time(9, 30), column(model, "Estimated_Hours"): timedelta(hours=3)}})
+    model.edit(inserts=[["TASK99999"] + model.row(first)[1:]], deletes=[third])
+    model.edit({first: {column(model, "Priority"): "Low"}})
+    model.undo()
+    journal.close()
+
+    parts, sheets = EditJournal(workbook).read()
+    assert parts.matches(os.stat(workbook))
+    recovered = read_model(workbook, "Onboarding_Tasks")
+    EditJournal.replay(recovered, sheets["Onboarding_Tasks"])
+
+    assert model_rows(recovered) == model_rows(model)
+    assert len(recovered.undo_stack) == 3 and len(recovered.redo_stack) == 1
+    assert recovered.changes() == model.changes()
+    recovered.redo()
+    model.redo()
+    assert model_rows(recovered) == model_rows(model)
+
+
+def test_journal_replay_then_save_matches_openpyxl(workbook):
+    journal = EditJournal(workbook)
+    journal.rewrite(ems_gen_up.WorkbookParts.read(workbook))
+    model = read_model(workbook, "Projects")
+    journal.attach("Projects", model)
+    model.edit({model.order[1]: {column(model, "Budget"): 125000.5}}, deletes=[model.order[0]])
+    journal.close()
+
+    _, sheets = EditJournal(workbook).read()
+    recovered = read_model(workbook, "Projects")
+    EditJournal.replay(recovered, sheets["Projects"])
+    ems_gen_up.save_workbook(workbook, {"Projects": recovered.changes()})
+
+    assert openpyxl_rows(workbook, "Projects") == model_rows(model)
+
+
+def test_journal_ignores_a_torn_last_record(workbook):
+    journal = EditJournal(workbook)
+    journal.rewrite(ems_gen_up.WorkbookParts.read(workbook))
+    model = read_model(workbook, "Projects")
+    journal.attach("Projects", model)
+    model.edit({model.order[0]: {column(model, "Status"): "Awaiting sign-off"}})
+    journal.close()
+    expected = model_rows(model)
+    with open(journal.path, "ab") as handle:
+        handle.write(b'["do","Projects",[["set",1')
+
+    _, sheets = EditJournal(workbook).read()
+    recovered = read_model(workbook, "Projects")
+    EditJournal.replay(recovered, sheets["Projects"])
+
+    assert model_rows(recovered) == expected
@@ -0,0 +1,78 @@
+import openpyxl
+
+from conftest import ems_gen_up, model_rows, openpyxl_rows, read_model, trim
+
+SheetMerge = ems_gen_up.SheetMerge
+
+
+def column(model, name):
+    return model.headers.index(name)
+
+
+def edit_on_disk(path, sheet_name, edit):
+    """Change a sheet on disk the way another updater would: a diff save of its own edits"""
+    model = read_model(path, sheet_name)
+    edit(model)
+    ems_gen_up.save_workbook(path, {sheet_name: model.changes()})
+    return model
+
+
+def test_sheet_merge_keeps_both_sides_and_saves_like_openpyxl(workbook):
+    local = read_model(workbook, "Projects")
+    status, priority = column(local, "Status"), column(local, "Priority")
+    first, second, third = local.order[:3]
+    local.edit({first: {status: "Completed"}, second: {priority: "Low"}},
+               inserts=[["PROJ9001"] + local.row(first)[1:]])
+
+    def theirs(model):
+        model.edit({model.order[2]: {priority: "Critical"}}, deletes=[model.order[-1]])
+    disk = edit_on_disk(workbook, "Projects", theirs)
+
+    incoming = read_model(workbook, "Projects")
+    merge = SheetMerge(local, incoming)
+    assert merge.conflicts == []
+    merge.apply()
+    ems_gen_up.save_workbook(workbook, {"Projects": incoming.changes()})
+
+    rows = openpyxl_rows(workbook, "Projects")
+    assert rows == model_rows(incoming)
+    by_key = {row[0]: row for row in rows[1:]}
+    assert by_key[local.columns[0][first]][status] == "Completed"
+    assert by_key[local.columns[0][second]][priority] == "Low"
+    assert by_key[local.columns[0][third]][priority] == "Critical"
+    assert by_key["PROJ9001"] == trim(local.row(local.order[-1]))
+    assert len(rows) == len(model_rows(disk)) + 1
+
+
+def test_sheet_merge_reports_a_cell_changed_on_both_sides(workbook):
+    local = read_model(workbook, "Projects")
+    status = column(local, "Status")
+    key = local.columns[0][local.order[0]]
+    local.edit({local.order[0]: {status: "Signed off"}})
+    edit_on_disk(workbook, "Projects", lambda model: model.edit({model.order[0]: {status: "Cancelled on disk"}}))
+
+    incoming = read_model(workbook, "Projects")
+    merge = SheetMerge(local, incoming)
+    assert len(merge.keepable) == 1 and key in merge.conflicts[0][0]
+    merge.apply(keep_local=True)
+    ems_gen_up.save_workbook(workbook, {"Projects": incoming.changes()})
+
+    assert openpyxl_rows(workbook, "Projects")[1][status] == "Signed off"
+    assert openpyxl_rows(workbook, "Projects") == model_rows(incoming)
+
+
+def test_sheet_merge_after_an_openpyxl_save(workbook):
+    local = read_model(workbook, "Training_Status")
+    progress = column(local, "Progress_Percentage")
+    local.edit({local.order[5]: {progress: 42}})
+    edited = openpyxl.load_workbook(workbook)
+    edited["Training_Status"].delete_rows(2)
+    edited.save(workbook)
+
+    incoming = read_model(workbook, "Training_Status")
+    SheetMerge(local, incoming).apply()
+    ems_gen_up.save_workbook(workbook, {"Training_Status": incoming.changes()})
+
+    rows = openpyxl_rows(workbook, "Training_Status")
+    assert rows == model_rows(incoming)
+    assert rows[5][progress] == 42
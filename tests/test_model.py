@@ -0,0 +1,87 @@
+from datetime import date, datetime, time, timedelta
+
+import openpyxl
+import pytest
+
+from conftest import ems_gen_up, read_model
+
+SheetModel = ems_gen_up.SheetModel
+
+
+def shifts():
+    model = SheetModel(["Shift_ID", "Start", "Length", "Day", "Note"])
+    model.extend([
+        [1, time(8, 0), timedelta(hours=8), date(2025, 3, 3), "early"],
+        [2, time(14, 30), timedelta(hours=7, minutes=30), datetime(2025, 3, 3, 12, 0), None],
+        [3, None, timedelta(days=1, hours=6), None, time(9, 0)],
+        [4, time(22, 0), None, date(2025, 3, 4), 4],
+    ])
+    model.finish()
+    return model
+
+
+def test_infer_type_gives_each_kind_of_column_its_type():
+    assert shifts().types == ["int", "time", "duration", "datetime", "text"]
+    assert SheetModel.infer_type([None, 1.5, 2]) == "float"
+    assert SheetModel.infer_type([True, None]) == "bool"
+    assert SheetModel.infer_type([None, None]) == "text"
+    assert SheetModel.infer_type([time(1, 0), timedelta(hours=1)]) == "text"
+
+
+@pytest.mark.parametrize("value", [
+    time(8, 0), time(23, 59, 59), time(6, 5, 4, 500000),
+    timedelta(hours=8), timedelta(days=1, hours=6), timedelta(days=-1, hours=23), timedelta(seconds=1.5),
+    timedelta(days=3),
+])
+def test_coerce_reads_back_what_a_cell_shows(value):
+    model = shifts()
+    column = 1 if isinstance(value, time) else 2
+    assert model.coerce(column, ems_gen_up.format_value(value)) == value
+
+
+@pytest.mark.parametrize("column, text, expected", [
+    (1, "9:05", time(9, 5)),
+    (1, " 17:45:30 ", time(17, 45, 30)),
+    (2, "31:00", timedelta(hours=31)),
+    (2, "0:45", timedelta(minutes=45)),
+    (2, "", None),
+])
+def test_coerce_takes_hours_and_minutes(column, text, expected):
+    assert shifts().coerce(column, text) == expected
+
+
+@pytest.mark.parametrize("column, text", [(1, "25:00"), (1, "8am"), (2, "8 hours"), (2, "1:5"), (2, "2 days")])
+def test_coerce_rejects_text_that_is_not_a_time_or_duration(column, text):
+    with pytest.raises(ValueError, match="must be a (time of day|duration)"):
+        shifts().coerce(column, text)
+
+
+def test_time_and_duration_columns_filter_and_sort_as_values():
+    model = shifts()
+    query = ems_gen_up.SheetQuery()
+    query.set_filter(1, "8:00..15:00")
+    assert query.row_ids(model) == [0, 1]
+
+    query = ems_gen_up.SheetQuery()
+    query.set_filter(2, "7:45..")
+    query.toggle_sort(2, extend=True)
+    assert query.row_ids(model) == [0, 2]
+    assert ems_gen_up.BulkEdit.parse(model, "Note = long where Length > 24:00").updates(model.order) == {2: {4: "long"}}
+
+
+def test_times_and_durations_read_from_a_workbook_are_typed(tmp_path):
+    path = str(tmp_path / "times.xlsx")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "Shifts"
+    sheet.append(["Shift_ID", "Start", "Length"])
+    for number in range(1, 4):
+        sheet.append([number, time(8, number), timedelta(hours=8 * number)])
+        sheet.cell(number + 1, 2).number_format = "h:mm:ss"
+        sheet.cell(number + 1, 3).number_format = "[h]:mm:ss"
+    workbook.save(path)
+
+    model = read_model(path, "Shifts")
+
+    assert model.types == ["int", "time", "duration"]
+    assert model.columns[2][2] == model.coerce(2, "24:00:00")
@@ -0,0 +1,67 @@
+from datetime import date, datetime, timedelta
+
+import openpyxl
+import pytest
+
+from conftest import ems_gen_up
+
+OpenpyxlInternals = ems_gen_up.OpenpyxlInternals
+CHANGED = ("openpyxl {} no longer has what OpenpyxlInternals reads ({}); check the private attributes it uses "
+           "and update OpenpyxlInternals.TESTED_RELEASE and the README").format(openpyxl.__version__, "{}")
+
+
+@pytest.fixture
+def package(tmp_path):
+    path = str(tmp_path / "styles.xlsx")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "Styles"
+    sheet.append(["Day", "Length", "Amount", "Name"])
+    sheet.append([date(2025, 3, 3), timedelta(hours=31), 12.5, "Ada"])
+    sheet.cell(2, 2).number_format = "[h]:mm:ss"
+    sheet.cell(2, 3).number_format = "0.000"
+    workbook.save(path)
+
+    package = ems_gen_up.XlsxPackage(path)
+    yield package
+    package.close()
+
+
+def test_the_installed_openpyxl_is_a_tested_release():
+    release = ".".join(openpyxl.__version__.split(".")[:2])
+    assert release == OpenpyxlInternals.TESTED_RELEASE, CHANGED.format("untested release")
+
+
+def test_style_sets_pick_out_dates_and_durations(package):
+    try:
+        date_styles = OpenpyxlInternals.date_styles(package.workbook)
+        timedelta_styles = OpenpyxlInternals.timedelta_styles(package.workbook)
+    except AttributeError as error:
+        pytest.fail(CHANGED.format(error))
+
+    assert all(isinstance(style, int) for style in date_styles | timedelta_styles), CHANGED.format("style indexes")
+    assert timedelta_styles and timedelta_styles < date_styles, CHANGED.format("duration styles")
+
+
+def test_worksheet_parser_yields_typed_cells(package):
+    with package.archive.open(package.sheet_parts["Styles"]) as source:
+        try:
+            rows = list(OpenpyxlInternals.worksheet_parser(package.workbook, source, package.shared_strings).parse())
+        except (AttributeError, TypeError) as error:
+            pytest.fail(CHANGED.format(error))
+
+    assert [index for index, _ in rows] == [1, 2], CHANGED.format("row numbers")
+    assert [(cell["column"], cell["value"]) for cell in rows[1][1]] == [
+        (1, datetime(2025, 3, 3)), (2, timedelta(hours=31)), (3, 12.5), (4, "Ada")], CHANGED.format("cell values")
+
+
+def test_number_format_reads_builtin_and_custom_formats(package):
+    workbook = package.workbook
+    with package.archive.open(package.sheet_parts["Styles"]) as source:
+        cells = list(OpenpyxlInternals.worksheet_parser(workbook, source, package.shared_strings).parse())[1][1]
+    try:
+        formats = [OpenpyxlInternals.number_format(workbook, cell["style_id"]) for cell in cells]
+    except (AttributeError, IndexError, KeyError) as error:
+        pytest.fail(CHANGED.format(error))
+
+    assert formats == ["yyyy-mm-dd", "[h]:mm:ss", "0.000", "General"], CHANGED.format("number formats")
@@ -0,0 +1,137 @@
+import json
+
+from conftest import ems_gen_up, openpyxl_rows
+
+BatchPatcher = ems_gen_up.BatchPatcher
+
+
+def write_patch(tmp_path, name, records):
+    """A patch file of records: JSON Lines (objects or raw lines), a JSON array or CSV rows"""
+    path = tmp_path / name
+    if name.endswith(".json"):
+        path.write_text(json.dumps(records))
+    elif name.endswith(".csv"):
+        path.write_text("\n".join(records) + "\n")
+    else:
+        path.write_text("\n".join(record if isinstance(record, str) else json.dumps(record) for record in records) + "\n")
+    return str(path)
+
+
+def patch(workbook, patch_path):
+    patcher = BatchPatcher(workbook)
+    try:
+        patcher.apply_file(patch_path)
+    finally:
+        patcher.close()
+    return patcher
+
+
+def rows_by_id(workbook, sheet_name):
+    """A sheet's headers and its rows by ID, padded to the headers' width"""
+    rows = openpyxl_rows(workbook, sheet_name)
+    width = len(rows[0])
+    return rows[0], {row[0]: row + [None] * (width - len(row)) for row in rows[1:]}
+
+
+def test_read_records_numbers_lines_and_array_records(tmp_path):
+    jsonl = write_patch(tmp_path, "p.jsonl", [{"op": "delete"}, "", {"op": "upsert"}])
+    array = write_patch(tmp_path, "p.json", [{"op": "delete"}, {"op": "upsert"}])
+    table = write_patch(tmp_path, "p.csv", ["op,sheet,Status", "upsert,Projects,", "delete,Projects,Done"])
+
+    assert [(line, json.loads(text)) for line, text in BatchPatcher.read_records(jsonl)] == [
+        (1, {"op": "delete"}), (3, {"op": "upsert"})]
+    assert list(BatchPatcher.read_records(array)) == [(1, {"op": "delete"}), (2, {"op": "upsert"})]
+    # An empty CSV cell leaves the column as it is
+    assert list(BatchPatcher.read_records(table)) == [
+        (2, {"op": "upsert", "sheet": "Projects"}), (3, {"op": "delete", "sheet": "Projects", "Status": "Done"})]
+
+
+def test_a_json_patch_must_be_an_array(tmp_path):
+    path = write_patch(tmp_path, "p.json", {"op": "delete"})
+    try:
+        list(BatchPatcher.read_records(path))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("a .json object was read as a patch")
+
+
+def test_malformed_records_are_conflicts_at_their_line(workbook, tmp_path):
+    path = write_patch(tmp_path, "p.jsonl", [
+        {"op": "upsert", "sheet": "Projects", "Project_ID": "PROJ001", "Status": "On Hold"},
+        "{not json",
+        "[1, 2]",
+        {"op": "upsert", "sheet": ["Projects"], "Project_ID": "PROJ002"},
+        {"op": "upsert", "sheet": "Projects", "Project_ID": "PROJ002", "Status": ["On Hold"]},
+        {"op": "rename", "sheet": "Projects", "Project_ID": "PROJ002"},
+        {"op": "upsert", "sheet": "Projects", "Project_ID": "PROJ003", "Project_Name": "=1+1"},
+        {"op": "upsert", "sheet": "Projects", "Project_ID": "PROJ004", "Status": "Cancelled"},
+    ])
+
+    patcher = patch(workbook, path)
+    patcher.save()
+
+    assert [conflict["line"] for conflict in patcher.conflicts] == [2, 3, 4, 5, 6, 7]
+    assert patcher.counts["Projects"]["updated"] + patcher.counts["Projects"]["unchanged"] == 2
+    headers, projects = rows_by_id(workbook, "Projects")
+    status = headers.index("Status")
+    assert projects["PROJ001"][status] == "On Hold" and projects["PROJ004"][status] == "Cancelled"
+    assert projects["PROJ003"][headers.index("Project_Name")] != "=1+1"
+
+
+def test_lookup_columns_take_only_their_category(workbook, tmp_path):
+    path = write_patch(tmp_path, "p.jsonl", [
+        {"op": "upsert", "sheet": "Projects", "Project_ID": "PROJ001", "Status": "Planned"},
+        {"op": "upsert", "sheet": "Projects", "Project_ID": "PROJ002", "Status": "Cancelled"},
+        {"op": "upsert", "sheet": "Training_Status", "Record_ID": 1, "Training_Status": "Cancelled"},
+        {"op": "upsert", "sheet": "Employees", "Employee_ID": "EMP001", "Department": "Legal"},
+        # Onboarding task statuses have no category, and "All" is already a task department
+        {"op": "upsert", "sheet": "Onboarding_Tasks", "Task_ID": "TASK0001", "Status": "Blocked", "Department": "All"},
+    ])
+
+    patcher = patch(workbook, path)
+
+    assert [(conflict["line"], conflict["sheet"]) for conflict in patcher.conflicts] == [
+        (1, "Projects"), (3, "Training_Status")]
+    assert "Project_Status" in patcher.conflicts[0]["message"]
+
+
+def test_delete_then_upsert_of_the_same_id_adds_a_new_row(workbook, tmp_path):
+    headers, before = rows_by_id(workbook, "Projects")
+    status, budget = headers.index("Status"), headers.index("Budget")
+    path = write_patch(tmp_path, "p.jsonl", [
+        {"op": "delete", "sheet": "Projects", "Project_ID": "PROJ001"},
+        {"op": "upsert", "sheet": "Projects", "Project_ID": "PROJ001", "Status": "Planning"},
+        {"op": "upsert", "sheet": "Projects", "Project_ID": "PROJ002", "Budget": 1000},
+        {"op": "delete", "sheet": "Projects", "Project_ID": "PROJ002"},
+    ])
+
+    patcher = patch(workbook, path)
+    patcher.save()
+
+    assert patcher.conflicts == []
+    assert patcher.counts["Projects"] == {"updated": 1, "inserted": 1, "deleted": 2, "unchanged": 0}
+    _, after = rows_by_id(workbook, "Projects")
+    assert "PROJ002" not in after
+    # The re-added row holds only what the upsert gave it
+    assert after["PROJ001"][status] == "Planning" and after["PROJ001"][budget] is None
+    assert len(after) == len(before) - 1
+
+
+def test_strict_saves_nothing_when_a_record_conflicts(workbook, tmp_path):
+    headers, projects = rows_by_id(workbook, "Projects")
+    status = headers.index("Status")
+    new_status = "Planning" if projects["PROJ001"][status] != "Planning" else "On Hold"
+    path = write_patch(tmp_path, "p.jsonl", [
+        {"op": "upsert", "sheet": "Projects", "Project_ID": "PROJ001", "Status": new_status},
+        {"op": "delete", "sheet": "Projects", "Project_ID": "PROJ999"},
+    ])
+    before = openpyxl_rows(workbook, "Projects")
+
+    assert ems_gen_up.run_patch(workbook, path, strict=True) == 1
+    assert openpyxl_rows(workbook, "Projects") == before
+
+    # Without --strict the record that applies is saved
+    assert ems_gen_up.run_patch(workbook, path) == 1
+    _, projects = rows_by_id(workbook, "Projects")
+    assert projects["PROJ001"][status] == new_status
@@ -0,0 +1,108 @@
+from datetime import datetime
+
+import pytest
+
+from conftest import ems_gen_up
+
+HEADERS = ["Project_ID", "Project_Name", "Status", "Budget", "Start_Date", "Billable"]
+ROWS = [
+    ["PROJ001", "Payroll migration", "In Progress", 125000.0, datetime(2025, 1, 2, 9, 30), True],
+    ["PROJ002", "Intranet refresh", "Completed", 48000.0, datetime(2025, 1, 2), False],
+    ["PROJ003", "payroll audit", "Planning", 90000.5, datetime(2025, 3, 15), True],
+    ["PROJ004", "Office move", "In Progress", None, None, False],
+    ["PROJ005", "Data warehouse", "On Hold", 310000.0, datetime(2024, 11, 30), True],
+    ["PROJ006", "Payroll", "Completed", 90000.5, datetime(2025, 1, 1, 23, 59), None],
+]
+
+
+def projects():
+    model = ems_gen_up.SheetModel(HEADERS)
+    model.extend([list(row) for row in ROWS])
+    model.finish()
+    return model
+
+
+def shown(model, query):
+    """Project_IDs of the rows the query shows, in view order"""
+    row_ids = query.row_ids(model)
+    return [model.columns[0][row_id] for row_id in (model.order if row_ids is None else row_ids)]
+
+
+def query(**filters):
+    result = ems_gen_up.SheetQuery()
+    for header, text in filters.items():
+        result.set_filter(HEADERS.index(header), text)
+    return result
+
+
+def test_model_types_pick_the_indexes():
+    model = projects()
+    assert model.types == ["text", "text", "text", "float", "datetime", "bool"]
+    assert isinstance(model.column_index(3), ems_gen_up.SortedIndex)
+    assert isinstance(model.column_index(2), ems_gen_up.HashIndex)
+
+
+@pytest.mark.parametrize("filters, expected", [
+    # Text: a case-insensitive substring, or the exact value after "="
+    ({"Project_Name": "PAYROLL"}, ["PROJ001", "PROJ003", "PROJ006"]),
+    ({"Project_Name": "=Payroll"}, ["PROJ006"]),
+    ({"Status": "=in progress"}, []),
+    # Numbers: a value or a range with either end open
+    ({"Budget": "90000.5"}, ["PROJ003", "PROJ006"]),
+    ({"Budget": "50000..125000"}, ["PROJ001", "PROJ003", "PROJ006"]),
+    ({"Budget": "..50000"}, ["PROJ002"]),
+    ({"Budget": "300000.."}, ["PROJ005"]),
+    # A date without a time covers the whole day
+    ({"Start_Date": "2025-01-02"}, ["PROJ001", "PROJ002"]),
+    ({"Start_Date": "2025-01-01..2025-01-02"}, ["PROJ001", "PROJ002", "PROJ006"]),
+    ({"Start_Date": "2025-01-01T12:00..2025-01-02T09:30"}, ["PROJ001", "PROJ002", "PROJ006"]),
+    ({"Billable": "yes"}, ["PROJ001", "PROJ003", "PROJ005"]),
+    # Filters on several columns all have to match
+    ({"Project_Name": "payroll", "Status": "completed"}, ["PROJ006"]),
+    ({"Status": "progress", "Budget": "100000.."}, ["PROJ001"]),
+])
+def test_filters(filters, expected):
+    assert shown(projects(), query(**filters)) == expected
+
+
+@pytest.mark.parametrize("filters", [{"Budget": "lots"}, {"Start_Date": "next week"}, {"Billable": "maybe"}])
+def test_a_filter_that_does_not_fit_its_column_is_an_error(filters):
+    with pytest.raises(ValueError):
+        query(**filters).row_ids(projects())
+
+
+def test_sort_keys_cycle_and_combine():
+    model = projects()
+    sort = ems_gen_up.SheetQuery()
+    assert sort.row_ids(model) is None
+
+    sort.toggle_sort(HEADERS.index("Budget"))
+    # Blanks sort first, equal values keep file order
+    assert shown(model, sort) == ["PROJ004", "PROJ002", "PROJ003", "PROJ006", "PROJ001", "PROJ005"]
+    sort.toggle_sort(HEADERS.index("Budget"))
+    assert shown(model, sort) == ["PROJ005", "PROJ001", "PROJ003", "PROJ006", "PROJ002", "PROJ004"]
+
+    # Status ascending, then Budget descending within each status
+    sort.toggle_sort(HEADERS.index("Status"))
+    assert sort.sort_keys == [(HEADERS.index("Status"), False)]
+    sort.toggle_sort(HEADERS.index("Budget"), extend=True)
+    sort.toggle_sort(HEADERS.index("Budget"), extend=True)
+    assert shown(model, sort) == ["PROJ006", "PROJ002", "PROJ001", "PROJ004", "PROJ005", "PROJ003"]
+    sort.toggle_sort(HEADERS.index("Budget"), extend=True)
+    assert sort.sort_keys == [(HEADERS.index("Status"), False)]
+
+
+def test_filters_and_sorts_follow_edits_and_undo():
+    model = projects()
+    status, budget = HEADERS.index("Status"), HEADERS.index("Budget")
+    completed = query(Status="=Completed")
+    completed.toggle_sort(budget)
+    assert shown(model, completed) == ["PROJ002", "PROJ006"]
+
+    model.edit({0: {status: "Completed", budget: 1000.0}}, deletes=[5])
+    model.edit(inserts=[["PROJ007", "Vendor review", "Completed", 75000.0, None, True]])
+    assert shown(model, completed) == ["PROJ001", "PROJ002", "PROJ007"]
+
+    model.undo()
+    model.undo()
+    assert shown(model, completed) == ["PROJ002", "PROJ006"]
@@ -0,0 +1,30 @@
+import openpyxl
+
+from conftest import ems_gen_up, model_rows, openpyxl_rows, read_model
+from test_xlsx import edit_training_status
+
+
+def test_store_follows_the_saved_workbook(workbook):
+    # The first read imports the sheet into the store; a save then updates the store in place
+    model = read_model(workbook, "Training_Status", use_store=True)
+    edit_training_status(model)
+    ems_gen_up.save_workbook(workbook, {"Training_Status": model.changes()})
+
+    trace = ems_gen_up.TraceRecorder()
+    stored = read_model(workbook, "Training_Status", use_store=True, trace=trace)
+
+    assert trace.latest["read_sheet"]["args"]["source"] == "store"
+    assert model_rows(stored) == openpyxl_rows(workbook, "Training_Status")
+
+
+def test_store_reimports_a_sheet_changed_on_disk(workbook):
+    read_model(workbook, "Projects", use_store=True)
+    edited = openpyxl.load_workbook(workbook)
+    edited["Projects"]["B2"] = "EMP999"
+    edited.save(workbook)
+
+    trace = ems_gen_up.TraceRecorder()
+    model = read_model(workbook, "Projects", use_store=True, trace=trace)
+
+    assert trace.latest["read_sheet"]["args"]["source"] == "xlsx"
+    assert model_rows(model) == openpyxl_rows(workbook, "Projects")
@@ -0,0 +1,102 @@
+import json
+import os
+from datetime import date, datetime
+
+import pandas as pd
+
+from conftest import openpyxl_rows
+from ems_common import SUMMARY_METRICS, Mean, Overdue, SheetSummary, SumBy
+
+AS_OF = datetime(2025, 6, 30)
+
+
+def sheet_rows(path, sheet_name):
+    """A sheet's headers and its rows padded to the headers' width"""
+    rows = openpyxl_rows(path, sheet_name)
+    width = len(rows[0])
+    return rows[0], [row + [None] * (width - len(row)) for row in rows[1:]]
+
+
+def summary_of(sheet_name, headers, rows):
+    summary = SheetSummary(sheet_name, headers, AS_OF)
+    summary.add_rows(rows)
+    return summary.result()
+
+
+def test_add_rows_matches_the_generator_summary(generated):
+    with open(os.path.splitext(generated)[0] + "_summary.json", encoding="utf-8") as handle:
+        expected = json.load(handle)["sheets"]
+    for sheet_name in SUMMARY_METRICS:
+        headers, rows = sheet_rows(generated, sheet_name)
+        assert summary_of(sheet_name, headers, rows) == expected[sheet_name], sheet_name
+
+
+def test_add_frame_matches_add_rows(generated):
+    for sheet_name in SUMMARY_METRICS:
+        headers, rows = sheet_rows(generated, sheet_name)
+        summary = SheetSummary(sheet_name, headers, AS_OF)
+        # In chunks, as the generator adds them
+        for start in range(0, len(rows), 7):
+            summary.add_frame(pd.DataFrame(rows[start:start + 7], columns=headers))
+        assert summary.result() == summary_of(sheet_name, headers, rows), sheet_name
+
+
+def test_add_and_remove_keep_the_summary_current(generated):
+    changes = {"Employees": {"Department": "Legal", "Employment_Status": None},
+               "Training_Status": {"Training_Status": "Completed", "Progress_Percentage": 100},
+               "Projects": {"Department": "Sales", "Budget": 1234.5, "Status": "Cancelled"},
+               "Onboarding_Tasks": {"Status": "Completed", "Due_Date": datetime(2020, 1, 1)}}
+    for sheet_name, change in changes.items():
+        headers, rows = sheet_rows(generated, sheet_name)
+        summary = SheetSummary(sheet_name, headers, AS_OF)
+        summary.add_rows(rows)
+        # An edit is the old row removed and the new one added; then a delete and an insert
+        for index in range(0, len(rows), 3):
+            summary.remove(rows[index])
+            rows[index] = [change.get(header, value) for header, value in zip(headers, rows[index])]
+            summary.add(rows[index])
+        summary.remove(rows.pop(1))
+        summary.add(list(rows[0]))
+        rows.append(list(rows[0]))
+
+        assert summary.result() == summary_of(sheet_name, headers, rows), sheet_name
+
+
+def test_removing_every_row_leaves_an_empty_summary(generated):
+    headers, rows = sheet_rows(generated, "Projects")
+    summary = SheetSummary("Projects", headers, AS_OF)
+    summary.add_rows(rows)
+    for row in rows:
+        summary.remove(row)
+
+    assert summary.result() == {"rows": 0, "Status": {}, "Priority": {}, "Budget by Department": {}}
+
+
+def test_mean_and_sum_by_skip_values_that_are_not_numbers():
+    mean = Mean("Progress")
+    mean.add_many([10, "40", None, True, "n/a", float("nan")])
+    assert mean.result() == 25
+    mean.add(10, -1)
+    mean.add("40", -1)
+    assert mean.result() is None
+
+    total = SumBy("Department", "Budget")
+    total.add_many(["IT", "IT", "HR", None], [100, "50.5", "unknown", 7])
+    total.add("IT", 100, -1)
+    assert total.result() == {"(blank)": 7, "IT": 50.5}
+
+
+def test_overdue_counts_open_rows_marked_overdue_or_past_due():
+    overdue = Overdue("Due_Date", "Status", AS_OF)
+    dues = [datetime(2025, 6, 1), date(2025, 6, 29), datetime(2025, 7, 1), datetime(2025, 7, 1), date(2025, 1, 1), None]
+    statuses = ["Pending", "In Progress", "Pending", "Overdue", "Completed", "Overdue"]
+    overdue.add_many(dues, statuses)
+    assert overdue.result() == 4
+
+    overdue.add(date(2025, 6, 30), "Pending")
+    overdue.add(datetime(2025, 6, 1), "Pending", -1)
+    assert overdue.result() == 3
+
+    frame = Overdue("Due_Date", "Status", AS_OF)
+    frame.add_frame(pd.DataFrame({"Due_Date": dues, "Status": statuses}))
+    assert frame.result() == 4
@@ -0,0 +1,124 @@
+from datetime import datetime, time, timedelta
+
+import openpyxl
+
+from conftest import ems_gen_up, model_rows, openpyxl_rows, read_model, trim
+
+SHEETS = ["Employees", "Training_Status", "Projects", "Onboarding_Tasks", "Lookup_Values"]
+
+
+def package_rows(path, sheet_name):
+    package = ems_gen_up.XlsxPackage(path)
+    try:
+        return [trim(list(row)) for row in package.iter_rows(sheet_name)]
+    finally:
+        package.close()
+
+
+def edit_training_status(model):
+    """Cell updates of several types, two deletes and two inserts as separate steps"""
+    headers = model.headers
+    status, progress, start = (headers.index(name) for name in ("Training_Status", "Progress_Percentage", "Start_Date"))
+    first, second, third, fourth = model.order[:4]
+    model.edit({first: {status: "Completed", progress: 100}, third: {start: datetime(2025, 1, 2)}})
+    model.edit({second: {headers.index("Notes"): "Needs <review> & sign-off"}})
+    model.edit(deletes=[fourth, model.order[-1]])
+    template = model.row(first)
+    model.edit(inserts=[[900001] + template[1:], [900002] + template[1:progress] + [None] * (len(headers) - progress)])
+
+
+def test_iter_rows_matches_openpyxl(generated):
+    for sheet_name in SHEETS:
+        assert package_rows(generated, sheet_name) == openpyxl_rows(generated, sheet_name), sheet_name
+
+
+def test_iter_rows_matches_openpyxl_for_openpyxl_files(generated, tmp_path):
+    # openpyxl's own output uses shared strings, and a formula sends the rest of the sheet to its parser
+    path = str(tmp_path / "resaved.xlsx")
+    workbook = openpyxl.load_workbook(generated)
+    workbook["Projects"]["J5"] = "=SUM(1, 2)"
+    workbook.save(path)
+    for sheet_name in SHEETS:
+        assert package_rows(path, sheet_name) == openpyxl_rows(path, sheet_name), sheet_name
+
+
+def test_save_workbook_matches_openpyxl(workbook):
+    model = read_model(workbook, "Training_Status")
+    edit_training_status(model)
+    expected = model_rows(model)
+    untouched = openpyxl_rows(workbook, "Projects")
+
+    stats = ems_gen_up.save_workbook(workbook, {"Training_Status": model.changes()})
+
+    assert stats == {"updated": 3, "deleted": 2, "inserted": 2}
+    assert openpyxl_rows(workbook, "Training_Status") == expected
+    assert package_rows(workbook, "Training_Status") == expected
+    assert openpyxl_rows(workbook, "Projects") == untouched
+
+
+def test_save_workbook_matches_openpyxl_for_openpyxl_files(workbook):
+    # Shared strings and a <dimension> record, which the generator's write-only workbooks don't have
+    openpyxl.load_workbook(workbook).save(workbook)
+    model = read_model(workbook, "Training_Status")
+    edit_training_status(model)
+    expected = model_rows(model)
+
+    ems_gen_up.save_workbook(workbook, {"Training_Status": model.changes()})
+
+    assert openpyxl_rows(workbook, "Training_Status") == expected
+    assert package_rows(workbook, "Training_Status") == expected
+    resaved = openpyxl.load_workbook(workbook, read_only=True)
+    assert resaved["Training_Status"].max_row == len(expected)
+    resaved.close()
+
+
+def test_save_workbook_matches_openpyxl_after_a_second_save(workbook):
+    model = read_model(workbook, "Training_Status")
+    edit_training_status(model)
+    ems_gen_up.save_workbook(workbook, {"Training_Status": model.changes()})
+
+    model = read_model(workbook, "Training_Status")
+    model.edit({model.order[-1]: {model.headers.index("Priority"): "Low"}}, deletes=[model.order[0]])
+    expected = model_rows(model)
+    ems_gen_up.save_workbook(workbook, {"Training_Status": model.changes()})
+
+    assert openpyxl_rows(workbook, "Training_Status") == expected
+
+
+def test_save_workbook_rejects_a_file_changed_on_disk(workbook):
+    parts = ems_gen_up.WorkbookParts.read(workbook)
+    model = read_model(workbook, "Projects")
+    model.edit({model.order[0]: {model.headers.index("Status"): "On Hold"}})
+    openpyxl.load_workbook(workbook).save(workbook)
+    before = openpyxl_rows(workbook, "Projects")
+
+    try:
+        ems_gen_up.save_workbook(workbook, {"Projects": model.changes()}, expected=parts)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("save_workbook overwrote a workbook changed on disk")
+    assert openpyxl_rows(workbook, "Projects") == before
+
+
+def test_save_workbook_writes_times_and_durations_as_serials(tmp_path):
+    path = str(tmp_path / "times.xlsx")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "Shifts"
+    sheet.append(["Shift_ID", "Start", "Length", "Break"])
+    for number in range(1, 4):
+        sheet.append([number, time(8, number), timedelta(hours=8, minutes=number)])
+        sheet.cell(number + 1, 2).number_format = "h:mm:ss"
+        sheet.cell(number + 1, 3).number_format = "[h]:mm:ss"
+    workbook.save(path)
+    model = read_model(path, "Shifts")
+    model.edit({0: {1: time(17, 45), 2: timedelta(hours=30)}}, inserts=[[4, time(6, 0), timedelta(minutes=90), None]])
+    # A cell without a style of its own gets the workbook's time style
+    model.edit({1: {3: time(12, 0)}})
+    expected = model_rows(model)
+
+    ems_gen_up.save_workbook(path, {"Shifts": model.changes()})
+
+    assert openpyxl_rows(path, "Shifts") == expected
+    assert package_rows(path, "Shifts") == expected